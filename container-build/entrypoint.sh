@@ -11,6 +11,26 @@ if [ ! -f "$CONFIG" ]; then
   exit 1
 fi
 
+# UDP intake settings, read by the syslog input (inputs/00-syslog-input.conf)
+export SYSLOG_UDP_WORKERS="${SYSLOG_UDP_WORKERS:-2}"
+export SYSLOG_UDP_QUEUE_SIZE="${SYSLOG_UDP_QUEUE_SIZE:-2000}"
+export SYSLOG_UDP_RECEIVE_BUFFER_BYTES="${SYSLOG_UDP_RECEIVE_BUFFER_BYTES:-212992}"
+
+for var in SYSLOG_UDP_WORKERS SYSLOG_UDP_QUEUE_SIZE SYSLOG_UDP_RECEIVE_BUFFER_BYTES; do
+  if ! [[ "${!var}" =~ ^[1-9][0-9]*$ ]]; then
+    echo "ERROR: $var must be a positive integer, got '${!var}'"
+    exit 1
+  fi
+done
+
+# The kernel silently caps SO_RCVBUF at net.core.rmem_max (a host setting)
+RMEM_MAX=$(cat /proc/sys/net/core/rmem_max 2>/dev/null || echo 0)
+if [ "$RMEM_MAX" -gt 0 ] && [ "$SYSLOG_UDP_RECEIVE_BUFFER_BYTES" -gt "$RMEM_MAX" ]; then
+  echo "WARNING: SYSLOG_UDP_RECEIVE_BUFFER_BYTES=$SYSLOG_UDP_RECEIVE_BUFFER_BYTES is above net.core.rmem_max=$RMEM_MAX"
+  echo "The receive buffer is capped at $RMEM_MAX. Raise net.core.rmem_max on the host to use the full size."
+fi
+
 echo "Starting Logstash with output type: $OUTPUT_TYPE"
+echo "UDP intake: workers=$SYSLOG_UDP_WORKERS queue_size=$SYSLOG_UDP_QUEUE_SIZE receive_buffer_bytes=$SYSLOG_UDP_RECEIVE_BUFFER_BYTES"
 cp "$CONFIG" /usr/share/logstash/pipeline/logstash.conf
 exec /usr/share/logstash/bin/logstash
@@ -79,6 +79,7 @@ resource "azurerm_container_group" "logstash" {
       "azure_dcr_gw_sys_stats_id"  = azurerm_monitor_data_collection_rule.aviatrix_gw_sys_stats.immutable_id
       "azure_dcr_cmd_id"           = azurerm_monitor_data_collection_rule.aviatrix_cmd.immutable_id
       "azure_dcr_tunnel_status_id" = azurerm_monitor_data_collection_rule.aviatrix_tunnel_status.immutable_id
+      "azure_dcr_sampling_id"      = azurerm_monitor_data_collection_rule.aviatrix_sampling.immutable_id
       # Stream names (must match DCR stream definitions)
       "azure_stream_netsession"    = "Custom-AviatrixNetworkSession_CL"
       "azure_stream_websession"    = "Custom-AviatrixWebSession_CL"
@@ -87,6 +88,7 @@ resource "azurerm_container_group" "logstash" {
       "azure_stream_gw_sys_stats"  = "Custom-AviatrixGwSysStats_CL"
       "azure_stream_cmd"           = "Custom-AviatrixCmd_CL"
       "azure_stream_tunnel_status" = "Custom-AviatrixTunnelStatus_CL"
+      "azure_stream_sampling"      = "Custom-AviatrixSampling_CL"
       # Authentication and endpoint (computed or from variables)
       "data_collection_endpoint"   = azurerm_monitor_data_collection_endpoint.dce.logs_ingestion_endpoint
       "client_app_id"              = var.use_existing_spn ? var.client_app_id : azuread_application.logstash_app[0].client_id
@@ -94,6 +96,8 @@ resource "azurerm_container_group" "logstash" {
       "tenant_id"                  = var.use_existing_spn ? var.tenant_id : data.azuread_client_config.current[0].tenant_id
       # Azure cloud environment — plugin expects AzureCloud, AzureChinaCloud, or AzureUSGovernment
       "azure_cloud"                = var.azure_cloud
+      # Suricata fields on the event top level for the ASIM mapping
+      "SURICATA_FIELDS"            = "top"
     })
 
     volume {
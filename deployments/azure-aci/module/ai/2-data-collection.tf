@@ -181,6 +181,10 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_netsession" {
       name = "session_id"
       type = "long"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
@@ -334,6 +338,10 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_websession" {
       name = "mitm_decrypted_by"
       type = "string"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
@@ -551,6 +559,10 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_ids" {
       name = "tx_id"
       type = "int"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
@@ -651,6 +663,10 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_gw_net_stats" {
       name = "public_ip"
       type = "string"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
@@ -659,26 +675,62 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_gw_net_stats" {
       name = "total_rx_cum"
       type = "string"
     }
+    column {
+      name = "total_rx_cum_bytes"
+      type = "long"
+    }
     column {
       name = "total_rx_rate"
       type = "int"
     }
+    column {
+      name = "total_rx_rate_bits"
+      type = "real"
+    }
+    column {
+      name = "total_rx_rate_bytes"
+      type = "real"
+    }
     column {
       name = "total_rx_tx_cum"
       type = "string"
     }
+    column {
+      name = "total_rx_tx_cum_bytes"
+      type = "long"
+    }
     column {
       name = "total_rx_tx_rate"
       type = "int"
     }
+    column {
+      name = "total_rx_tx_rate_bits"
+      type = "real"
+    }
+    column {
+      name = "total_rx_tx_rate_bytes"
+      type = "real"
+    }
     column {
       name = "total_tx_cum"
       type = "string"
     }
+    column {
+      name = "total_tx_cum_bytes"
+      type = "long"
+    }
     column {
       name = "total_tx_rate"
       type = "int"
     }
+    column {
+      name = "total_tx_rate_bits"
+      type = "real"
+    }
+    column {
+      name = "total_tx_rate_bytes"
+      type = "real"
+    }
     column {
       name = "unix_time"
       type = "long"
@@ -775,6 +827,10 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_gw_sys_stats" {
       name = "memory_total"
       type = "int"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
@@ -843,6 +899,10 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_cmd" {
       name = "result"
       type = "string"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
@@ -907,6 +967,82 @@ resource "azurerm_monitor_data_collection_rule" "aviatrix_tunnel_status" {
       name = "src_gw"
       type = "string"
     }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
+    column {
+      name = "tags"
+      type = "dynamic"
+    }
+    column {
+      name = "unix_time"
+      type = "long"
+    }
+  }
+}
+
+## Data Collection Rule for connector sampling summaries (SAMPLING=true)
+resource "azurerm_monitor_data_collection_rule" "aviatrix_sampling" {
+  name                        = "aviatrix-sampling-dcr"
+  location                    = azurerm_resource_group.aci_rg.location
+  resource_group_name         = azurerm_resource_group.aci_rg.name
+  data_collection_endpoint_id = azurerm_monitor_data_collection_endpoint.dce.id
+
+  depends_on = [azapi_resource.table_sampling]
+
+  data_flow {
+    streams       = ["Custom-AviatrixSampling_CL"]
+    destinations  = ["loganalytics-destination"]
+    output_stream = "Custom-AviatrixSampling_CL"
+    transform_kql = "source"
+  }
+
+  destinations {
+    log_analytics {
+      workspace_resource_id = var.log_analytics_workspace.id
+      name                  = "loganalytics-destination"
+    }
+  }
+
+  stream_declaration {
+    stream_name = "Custom-AviatrixSampling_CL"
+    column {
+      name = "TimeGenerated"
+      type = "datetime"
+    }
+    column {
+      name = "events_in"
+      type = "long"
+    }
+    column {
+      name = "events_kept"
+      type = "long"
+    }
+    column {
+      name = "events_shed"
+      type = "long"
+    }
+    column {
+      name = "gateway"
+      type = "string"
+    }
+    column {
+      name = "interval"
+      type = "long"
+    }
+    column {
+      name = "log_type"
+      type = "string"
+    }
+    column {
+      name = "message"
+      type = "string"
+    }
+    column {
+      name = "sample_weight"
+      type = "long"
+    }
     column {
       name = "tags"
       type = "dynamic"
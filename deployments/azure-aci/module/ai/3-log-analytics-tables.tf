@@ -64,6 +64,7 @@ resource "azapi_resource" "table_netsession" {
           { name = "session_byte_cnt", type = "long" },
           { name = "session_dur", type = "long" },
           { name = "session_id", type = "long" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "unix_time", type = "long" },
         ]
@@ -117,6 +118,7 @@ resource "azapi_resource" "table_websession" {
           { name = "mitm_sni_hostname", type = "string" },
           { name = "mitm_url_parts", type = "string" },
           { name = "mitm_decrypted_by", type = "string" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "unix_time", type = "long" },
         ]
@@ -186,6 +188,7 @@ resource "azapi_resource" "table_ids" {
           { name = "direction", type = "string" },
           { name = "pkt_src", type = "string" },
           { name = "tx_id", type = "int" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "unix_time", type = "long" },
           { name = "timestamp", type = "string" },
@@ -222,13 +225,23 @@ resource "azapi_resource" "table_gw_net_stats" {
           { name = "pps_limit_exceeded", type = "int" },
           { name = "private_ip", type = "string" },
           { name = "public_ip", type = "string" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "total_rx_cum", type = "string" },
+          { name = "total_rx_cum_bytes", type = "long" },
           { name = "total_rx_rate", type = "int" },
+          { name = "total_rx_rate_bits", type = "real" },
+          { name = "total_rx_rate_bytes", type = "real" },
           { name = "total_rx_tx_cum", type = "string" },
+          { name = "total_rx_tx_cum_bytes", type = "long" },
           { name = "total_rx_tx_rate", type = "int" },
+          { name = "total_rx_tx_rate_bits", type = "real" },
+          { name = "total_rx_tx_rate_bytes", type = "real" },
           { name = "total_tx_cum", type = "string" },
+          { name = "total_tx_cum_bytes", type = "long" },
           { name = "total_tx_rate", type = "int" },
+          { name = "total_tx_rate_bits", type = "real" },
+          { name = "total_tx_rate_bytes", type = "real" },
           { name = "unix_time", type = "long" },
         ]
       }
@@ -264,6 +277,7 @@ resource "azapi_resource" "table_gw_sys_stats" {
           { name = "memory_available", type = "int" },
           { name = "memory_free", type = "int" },
           { name = "memory_total", type = "int" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "unix_time", type = "long" },
         ]
@@ -292,6 +306,7 @@ resource "azapi_resource" "table_cmd" {
           { name = "ls_timestamp", type = "string" },
           { name = "reason", type = "string" },
           { name = "result", type = "string" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "unix_time", type = "long" },
           { name = "username", type = "string" },
@@ -319,6 +334,36 @@ resource "azapi_resource" "table_tunnel_status" {
           { name = "new_state", type = "string" },
           { name = "old_state", type = "string" },
           { name = "src_gw", type = "string" },
+          { name = "sample_weight", type = "long" },
+          { name = "tags", type = "dynamic" },
+          { name = "unix_time", type = "long" },
+        ]
+      }
+      retentionInDays      = 30
+      totalRetentionInDays = 30
+    }
+  }
+}
+
+resource "azapi_resource" "table_sampling" {
+  type      = "Microsoft.OperationalInsights/workspaces/tables@2022-10-01"
+  name      = "AviatrixSampling_CL"
+  parent_id = var.log_analytics_workspace.id
+
+  body = {
+    properties = {
+      schema = {
+        name = "AviatrixSampling_CL"
+        columns = [
+          { name = "TimeGenerated", type = "datetime" },
+          { name = "events_in", type = "long" },
+          { name = "events_kept", type = "long" },
+          { name = "events_shed", type = "long" },
+          { name = "gateway", type = "string" },
+          { name = "interval", type = "long" },
+          { name = "log_type", type = "string" },
+          { name = "message", type = "string" },
+          { name = "sample_weight", type = "long" },
           { name = "tags", type = "dynamic" },
           { name = "unix_time", type = "long" },
         ]
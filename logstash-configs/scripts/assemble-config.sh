@@ -3,8 +3,12 @@
 # Combines input, filter, and output modules into a single deployable config file
 #
 # Usage: ./assemble-config.sh <output-type> [destination]
+#        ./assemble-config.sh <output-type> --pipelines [--config-dir DIR] [destination-dir]
+#        ./assemble-config.sh <output-type>,<output-type>[,...] [--config-dir DIR] [destination-dir]
 # Example: ./assemble-config.sh splunk-hec
 # Example: ./assemble-config.sh azure-log-ingestion ./custom-output.conf
+# Example: ./assemble-config.sh splunk-hec --pipelines
+# Example: ./assemble-config.sh splunk-hec,dynatrace
 #
 # Available output types:
 #   splunk-hec          - Splunk HTTP Event Collector
@@ -13,6 +17,33 @@
 #   dynatrace-logs      - Dynatrace Logs Ingest (JSON)
 #   dynatrace           - Dynatrace Combined (metrics + logs)
 #   zabbix              - Zabbix Trapper (Dependent Items pattern)
+#
+# With --pipelines, writes a pipelines.yml layout instead of one file:
+#   intake.conf    - inputs, filters 05-09 (classify, sampling) and lane routing
+#   security.conf  - filters 10+ and the output, for the security log types
+#   telemetry.conf - filters 10+ and the output, for everything else
+#   pipelines.yml  - the three pipelines; path.config points into --config-dir
+#                    (default: /usr/share/logstash/pipeline, as in the Docker image)
+# The destination defaults to assembled/<output-type>-pipelines/.
+#
+# With several output types (fan-out), writes a pipelines.yml layout that
+# parses once and sends a copy of every event to each output:
+#   parse.conf     - inputs and the filters all outputs share
+#   <type>.conf    - the filters only <type> uses and its output, one per type
+#   pipelines.yml  - the pipelines, each output with its own queue
+# The destination defaults to assembled/<type>+<type>-pipelines/.
+#
+# A filter whose header has "# Outputs: <type> ..." (a payload builder) is only
+# assembled for those output types.
+#
+# With --profile all|security|networking (any mode), LOG_PROFILE is fixed at
+# assembly instead of checked per event: filters whose "# Tags:" header names
+# no tag the output forwards under the profile are left out, as are the
+# output's blocks for those tags (scripts/prune-profile.py), and events of
+# other log types are dropped right after 05-classify.conf. A manifest of what
+# was kept and pruned is printed and appended to the config (or pipelines.yml).
+# The destination defaults to assembled/<output-type>-<profile>-full.conf
+# (or -pipelines/).
 
 set -e
 
@@ -20,7 +51,20 @@ SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 CONFIG_DIR="$(dirname "$SCRIPT_DIR")"
 
 OUTPUT_TYPE="${1:-}"
-DEST="${2:-}"
+DEST=""
+PIPELINES=false
+PIPELINE_CONFIG_DIR="/usr/share/logstash/pipeline"
+PROFILE=""
+shift || true
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --pipelines) PIPELINES=true ;;
+        --config-dir) PIPELINE_CONFIG_DIR="${2:?--config-dir needs a directory}"; shift ;;
+        --profile) PROFILE="${2:?--profile needs all, security or networking}"; shift ;;
+        *) DEST="$1" ;;
+    esac
+    shift
+done
 
 # Color output helpers
 RED='\033[0;31m'
@@ -30,6 +74,9 @@ NC='\033[0m' # No Color
 
 print_usage() {
     echo "Usage: $0 <output-type> [destination]"
+    echo "       $0 <output-type> --pipelines [--config-dir DIR] [destination-dir]"
+    echo "       $0 <output-type>,<output-type>[,...] [--config-dir DIR] [destination-dir]"
+    echo "       (any of these with --profile all|security|networking)"
     echo ""
     echo "Available output types:"
     echo "  splunk-hec          - Splunk HTTP Event Collector"
@@ -43,6 +90,9 @@ print_usage() {
     echo "  $0 splunk-hec"
     echo "  $0 dynatrace"
     echo "  $0 azure-log-ingestion ./custom-output.conf"
+    echo "  $0 splunk-hec --pipelines"
+    echo "  $0 splunk-hec,dynatrace"
+    echo "  $0 zabbix --profile networking"
 }
 
 if [[ -z "$OUTPUT_TYPE" ]]; then
@@ -51,83 +101,391 @@ if [[ -z "$OUTPUT_TYPE" ]]; then
     exit 1
 fi
 
-# Validate output type exists
-if [[ ! -d "$CONFIG_DIR/outputs/$OUTPUT_TYPE" ]]; then
-    echo -e "${RED}Error: Unknown output type '$OUTPUT_TYPE'${NC}"
-    echo "Available types:"
-    ls -1 "$CONFIG_DIR/outputs/" 2>/dev/null || echo "  (none found)"
-    exit 1
-fi
+IFS=',' read -r -a OUTPUT_TYPES <<< "$OUTPUT_TYPE"
 
-if [[ ! -f "$CONFIG_DIR/outputs/$OUTPUT_TYPE/output.conf" ]]; then
-    echo -e "${RED}Error: Output config not found at $CONFIG_DIR/outputs/$OUTPUT_TYPE/output.conf${NC}"
+for output_type in "${OUTPUT_TYPES[@]}"; do
+    # Validate output type exists
+    if [[ ! -d "$CONFIG_DIR/outputs/$output_type" ]]; then
+        echo -e "${RED}Error: Unknown output type '$output_type'${NC}"
+        echo "Available types:"
+        ls -1 "$CONFIG_DIR/outputs/" 2>/dev/null || echo "  (none found)"
+        exit 1
+    fi
+
+    if [[ ! -f "$CONFIG_DIR/outputs/$output_type/output.conf" ]]; then
+        echo -e "${RED}Error: Output config not found at $CONFIG_DIR/outputs/$output_type/output.conf${NC}"
+        exit 1
+    fi
+done
+
+if [[ ${#OUTPUT_TYPES[@]} -gt 1 && "$PIPELINES" == "true" ]]; then
+    echo -e "${RED}Error: --pipelines takes one output type; several output types already assemble a pipelines layout${NC}"
     exit 1
 fi
 
-# Set default destination if not provided
-if [[ -z "$DEST" ]]; then
-    mkdir -p "$CONFIG_DIR/assembled"
-    DEST="$CONFIG_DIR/assembled/${OUTPUT_TYPE}-full.conf"
+# Tags each LOG_PROFILE forwards, as in the outputs' conditionals
+PROFILE_TAGS_security="microseg mitm suricata fqdn cmd vpn_session"
+PROFILE_TAGS_networking="gw_net_stats gw_sys_stats tunnel_status"
+
+LIVE_TAGS=""
+DEAD_TAGS=""
+MANIFEST=""
+if [[ -n "$PROFILE" ]]; then
+    case "$PROFILE" in
+        all) profile_tags="$PROFILE_TAGS_security $PROFILE_TAGS_networking" ;;
+        security) profile_tags="$PROFILE_TAGS_security" ;;
+        networking) profile_tags="$PROFILE_TAGS_networking" ;;
+        *)
+            echo -e "${RED}Error: Unknown profile '$PROFILE' (all, security or networking)${NC}"
+            exit 1
+            ;;
+    esac
+
+    # Tags the outputs forward under the profile: those an output names, or
+    # all of them for an output that names none (ci-test forwards everything)
+    for tag in $PROFILE_TAGS_security $PROFILE_TAGS_networking; do
+        live=false
+        for output_type in "${OUTPUT_TYPES[@]}"; do
+            output_conf="$CONFIG_DIR/outputs/$output_type/output.conf"
+            if [[ " $profile_tags " == *" $tag "* ]] &&
+               { grep -q "\"$tag\"" "$output_conf" || ! grep -qE "\"($(echo $PROFILE_TAGS_security $PROFILE_TAGS_networking | tr ' ' '|'))\"" "$output_conf"; }; then
+                live=true
+            fi
+        done
+        if [[ "$live" == "true" ]]; then
+            LIVE_TAGS="$LIVE_TAGS $tag"
+        else
+            DEAD_TAGS="$DEAD_TAGS $tag"
+        fi
+    done
+    LIVE_TAGS="${LIVE_TAGS# }"
+    DEAD_TAGS="${DEAD_TAGS# }"
+    if [[ -z "$LIVE_TAGS" ]]; then
+        echo -e "${RED}Error: '$OUTPUT_TYPE' forwards no log type under LOG_PROFILE=$PROFILE${NC}"
+        exit 1
+    fi
+
+    MANIFEST="$(mktemp)"
+    trap 'rm -f "$MANIFEST"' EXIT
+    {
+        echo "LOG_PROFILE=$PROFILE (fixed at assembly; the LOG_PROFILE variable has no effect)"
+        echo "Forwarded tags: ${LIVE_TAGS:-(none)}"
+        echo "Pruned tags: ${DEAD_TAGS:-(none)}"
+    } > "$MANIFEST"
 fi
 
-echo -e "${YELLOW}Assembling Logstash config for: $OUTPUT_TYPE${NC}"
-echo "Output file: $DEST"
-echo ""
+# Module content, with LOG_PROFILE resolved under --profile: $1 file, $2 name
+emit() {
+    if [[ -n "$PROFILE" ]]; then
+        python3 "$SCRIPT_DIR/prune-profile.py" --profile "$PROFILE" --dead-tags "$DEAD_TAGS" \
+            --source "$2" --manifest "$MANIFEST" < "$1"
+    else
+        cat "$1"
+    fi
+}
 
-# Create/clear the output file with a header
-cat > "$DEST" << EOF
+# Drop events of log types without an output, before any parsing: $1 file
+append_profile_drop() {
+    local types=""
+    for tag in $LIVE_TAGS; do
+        types="$types, \"$tag\""
+        # AviatrixAPI lines are tagged cmd too
+        [[ "$tag" == "cmd" ]] && types="$types, \"cmd_api\""
+    done
+    # A one-element list is compared as a string, so use == for one type
+    local condition="[@metadata][log_type] not in [${types#, }]"
+    [[ "$types" == *,*,* ]] || condition="[@metadata][log_type] != ${types#, }"
+    echo "  + (drop of other log types, LOG_PROFILE=$PROFILE)"
+    cat >> "$1" << EOF
+# LOG_PROFILE=$PROFILE (assemble-config.sh --profile): drop unclassified events
+# and log types that no output here forwards, before they are parsed
+filter {
+    if [type] == "syslog" and $condition {
+        drop { id => "profile-drop" }
+    }
+}
+
+EOF
+}
+
+# Header of a generated config: $1 file, $2 output type(s) it covers,
+# $3 suffix for the output type line, $4 extra arguments for the regenerate line
+write_header() {
+    cat > "$1" << EOF
 # Aviatrix SIEM Connector - Assembled Configuration
-# Output Type: $OUTPUT_TYPE
+# Output Type: $2$3$([[ -n "$PROFILE" ]] && echo " (LOG_PROFILE=$PROFILE)")
 # Generated: $(date -u +"%Y-%m-%d %H:%M:%S UTC")
 #
 # This file was automatically generated by assemble-config.sh
 # Do not edit directly - modify the source modules instead:
 #   - logstash-configs/inputs/
 #   - logstash-configs/filters/
-#   - logstash-configs/outputs/$OUTPUT_TYPE/
+#   - logstash-configs/outputs/$2/
 #
-# To regenerate: ./scripts/assemble-config.sh $OUTPUT_TYPE
+# To regenerate: ./scripts/assemble-config.sh $OUTPUT_TYPE$4$([[ -n "$PROFILE" ]] && echo " --profile $PROFILE")
 
 EOF
+}
 
-# Assemble inputs
-echo -e "${GREEN}Adding inputs...${NC}"
-echo "# ============================================================================" >> "$DEST"
-echo "# INPUT CONFIGURATION" >> "$DEST"
-echo "# ============================================================================" >> "$DEST"
-echo "" >> "$DEST"
-
-for input_file in "$CONFIG_DIR/inputs/"*.conf; do
-    if [[ -f "$input_file" ]]; then
-        echo "  - $(basename "$input_file")"
-        cat "$input_file" >> "$DEST"
-        echo "" >> "$DEST"
+# $1 file, $2 section title
+write_section() {
+    echo "# ============================================================================" >> "$1"
+    echo "# $2" >> "$1"
+    echo "# ============================================================================" >> "$1"
+    echo "" >> "$1"
+}
+
+# $1 file
+append_inputs() {
+    echo -e "${GREEN}Adding inputs...${NC}"
+    write_section "$1" "INPUT CONFIGURATION"
+
+    for input_file in "$CONFIG_DIR/inputs/"*.conf; do
+        if [[ -f "$input_file" ]]; then
+            echo "  - $(basename "$input_file")"
+            cat "$input_file" >> "$1"
+            echo "" >> "$1"
+        fi
+    done
+}
+
+# Filters in sorted order: $1 file, $2 which ones:
+#   all            - every filter $OUTPUT_TYPE uses (single file)
+#   intake, lane   - of those, 05-09 or 10+ (--pipelines)
+#   parse          - the filters every output uses (fan-out)
+#   output:<type>  - the filters only listed outputs use, for <type> (fan-out)
+append_filters() {
+    echo -e "${GREEN}Adding filters...${NC}"
+    write_section "$1" "FILTER CONFIGURATION"
+
+    for filter_file in $(ls "$CONFIG_DIR/filters/"*.conf 2>/dev/null | sort); do
+        if [[ -f "$filter_file" ]]; then
+            only=" $(sed -n 's/^# Outputs: //p' "$filter_file" | head -1) "
+            # "# Tags: a b" - the tags a filter parses; left out if none is forwarded
+            tags="$(sed -n 's/^# Tags: //p' "$filter_file" | head -1)"
+            if [[ -n "$PROFILE" && -n "$tags" ]] && ! echo " $LIVE_TAGS " | grep -qE " ($(echo $tags | tr ' ' '|')) "; then
+                echo "  - $(basename "$filter_file") (tags: $tags)" >> "$MANIFEST"
+                continue
+            fi
+            case "$2" in
+                parse) [[ "$only" == "  " ]] || continue ;;
+                output:*) [[ "$only" == *" ${2#output:} "* ]] || continue ;;
+                *)
+                    [[ "$only" == "  " || "$only" == *" $OUTPUT_TYPE "* ]] || continue
+                    case "$2:$(basename "$filter_file")" in
+                        all:*|intake:0[0-9]-*|lane:[1-9][0-9]-*) ;;
+                        *) continue ;;
+                    esac
+                    ;;
+            esac
+            echo "  - $(basename "$filter_file")"
+            emit "$filter_file" "$(basename "$filter_file")" >> "$1"
+            echo "" >> "$1"
+            [[ -n "$PROFILE" ]] && echo "  + $(basename "$filter_file")" >> "$MANIFEST"
+            if [[ -n "$PROFILE" && "$(basename "$filter_file")" == "05-classify.conf" ]]; then
+                append_profile_drop "$1"
+                echo "  + (drop of other log types after 05-classify.conf)" >> "$MANIFEST"
+            fi
+        fi
+    done
+}
+
+# $1 file, $2 output type
+append_output() {
+    echo -e "${GREEN}Adding output ($2)...${NC}"
+    write_section "$1" "OUTPUT CONFIGURATION ($2)"
+
+    emit "$CONFIG_DIR/outputs/$2/output.conf" "outputs/$2/output.conf" >> "$1"
+}
+
+# Print the --profile manifest and append it to $1 as comments
+finish_manifest() {
+    [[ -n "$PROFILE" ]] || return 0
+    echo ""
+    echo -e "${YELLOW}Manifest:${NC}"
+    # Lanes and fan-out assemble modules more than once
+    awk '!seen[$0]++' "$MANIFEST" | tee "$MANIFEST.unique"
+    {
+        echo ""
+        echo "# ============================================================================"
+        echo "# ASSEMBLY MANIFEST"
+        echo "# ============================================================================"
+        sed 's/^/# /' "$MANIFEST.unique"
+    } >> "$1"
+    rm -f "$MANIFEST.unique"
+}
+
+# Input of a downstream pipeline: $1 file, $2 address, $3 section title
+append_pipeline_input() {
+    write_section "$1" "$3"
+    cat >> "$1" << EOF
+input {
+    pipeline {
+        id => "$2-in"
+        address => "$2"
+    }
+}
+
+EOF
+}
+
+# Start of pipelines.yml: $1 file, $2 description (comment lines)
+write_pipelines_header() {
+    {
+        cat << EOF
+# Aviatrix SIEM Connector - Pipelines Layout
+# Output Type: $OUTPUT_TYPE$([[ -n "$PROFILE" ]] && echo " (LOG_PROFILE=$PROFILE)")
+# Generated: $(date -u +"%Y-%m-%d %H:%M:%S UTC")
+#
+# To regenerate: ./scripts/assemble-config.sh ${OUTPUT_TYPE}$([[ "$PIPELINES" == "true" ]] && echo " --pipelines")$([[ -n "$PROFILE" ]] && echo " --profile $PROFILE")
+#
+EOF
+        echo "$2"
+    } > "$1"
+}
+
+# One pipelines.yml entry, read from PIPELINE_<$2>_* at startup: $1 pipeline id
+# (and config file name), $3 workers, $4 batch size, $5 queue type, $6 queue
+# max bytes ("" for a fixed queue type)
+append_pipeline_entry() {
+    local file="$1" id="$2" prefix="PIPELINE_$3"
+    {
+        echo ""
+        echo "- pipeline.id: $id"
+        echo "  path.config: \"$PIPELINE_CONFIG_DIR/$id.conf\""
+        echo "  pipeline.workers: \${${prefix}_WORKERS:$4}"
+        echo "  pipeline.batch.size: \${${prefix}_BATCH_SIZE:$5}"
+        if [[ -z "$7" ]]; then
+            echo "  queue.type: $6"
+        else
+            echo "  queue.type: \${${prefix}_QUEUE_TYPE:$6}"
+            echo "  queue.max_bytes: \${${prefix}_QUEUE_MAX_BYTES:$7}"
+        fi
+    } >> "$file"
+}
+
+if [[ ${#OUTPUT_TYPES[@]} -gt 1 ]]; then
+    if [[ -z "$DEST" ]]; then
+        DEST="$CONFIG_DIR/assembled/${OUTPUT_TYPE//,/+}${PROFILE:+-$PROFILE}-pipelines"
     fi
-done
+    mkdir -p "$DEST"
 
-# Assemble filters (in sorted order)
-echo -e "${GREEN}Adding filters...${NC}"
-echo "# ============================================================================" >> "$DEST"
-echo "# FILTER CONFIGURATION" >> "$DEST"
-echo "# ============================================================================" >> "$DEST"
-echo "" >> "$DEST"
-
-for filter_file in $(ls "$CONFIG_DIR/filters/"*.conf 2>/dev/null | sort); do
-    if [[ -f "$filter_file" ]]; then
-        echo "  - $(basename "$filter_file")"
-        cat "$filter_file" >> "$DEST"
-        echo "" >> "$DEST"
+    echo -e "${YELLOW}Assembling Logstash fan-out pipelines for: $OUTPUT_TYPE${NC}"
+    echo "Output directory: $DEST"
+    echo ""
+
+    write_header "$DEST/parse.conf" "{$OUTPUT_TYPE}" " (parse)"
+    append_inputs "$DEST/parse.conf"
+    append_filters "$DEST/parse.conf" parse
+    echo -e "${GREEN}Adding fan-out...${NC}"
+    write_section "$DEST/parse.conf" "FAN-OUT (a copy of every event to each output)"
+    {
+        echo "output {"
+        echo "    pipeline {"
+        echo "        id => \"fan-out\""
+        echo "        send_to => [$(printf '"%s", ' "${OUTPUT_TYPES[@]}" | sed 's/, $//')]"
+        echo "    }"
+        echo "}"
+    } >> "$DEST/parse.conf"
+
+    for output_type in "${OUTPUT_TYPES[@]}"; do
+        echo -e "${YELLOW}Output: $output_type${NC}"
+        write_header "$DEST/$output_type.conf" "$output_type" " (fan-out)"
+        append_pipeline_input "$DEST/$output_type.conf" "$output_type" "INPUT CONFIGURATION (from parse)"
+        append_filters "$DEST/$output_type.conf" "output:$output_type"
+        append_output "$DEST/$output_type.conf" "$output_type"
+    done
+
+    write_pipelines_header "$DEST/pipelines.yml" "$(cat << 'EOF'
+# parse receives, classifies and parses every event once, then hands a copy to
+# each output's pipeline. Each output has its own workers, batch size and
+# queue, so a slow destination backs up in its own queue, not in the others.
+# The ${VAR:default} values are read from the environment when Logstash starts.
+EOF
+)"
+    append_pipeline_entry "$DEST/pipelines.yml" parse PARSE 4 250 memory ""
+    for output_type in "${OUTPUT_TYPES[@]}"; do
+        append_pipeline_entry "$DEST/pipelines.yml" "$output_type" "$(echo "$output_type" | tr 'a-z-' 'A-Z_')" 1 250 persisted 2gb
+    done
+
+    finish_manifest "$DEST/pipelines.yml"
+
+    echo ""
+    echo -e "${GREEN}Assembly complete!${NC}"
+    echo "Output written to: $DEST"
+    echo ""
+    wc -l "$DEST/"*.conf "$DEST/pipelines.yml"
+    exit 0
+fi
+
+if [[ "$PIPELINES" == "true" ]]; then
+    if [[ -z "$DEST" ]]; then
+        DEST="$CONFIG_DIR/assembled/${OUTPUT_TYPE}${PROFILE:+-$PROFILE}-pipelines"
     fi
-done
+    mkdir -p "$DEST"
 
-# Assemble output
-echo -e "${GREEN}Adding output ($OUTPUT_TYPE)...${NC}"
-echo "# ============================================================================" >> "$DEST"
-echo "# OUTPUT CONFIGURATION ($OUTPUT_TYPE)" >> "$DEST"
-echo "# ============================================================================" >> "$DEST"
-echo "" >> "$DEST"
+    echo -e "${YELLOW}Assembling Logstash pipelines for: $OUTPUT_TYPE${NC}"
+    echo "Output directory: $DEST"
+    echo ""
 
-cat "$CONFIG_DIR/outputs/$OUTPUT_TYPE/output.conf" >> "$DEST"
+    write_header "$DEST/intake.conf" "$OUTPUT_TYPE" " (intake)" " --pipelines"
+    append_inputs "$DEST/intake.conf"
+    append_filters "$DEST/intake.conf" intake
+    echo -e "${GREEN}Adding lane routing...${NC}"
+    write_section "$DEST/intake.conf" "LANE ROUTING"
+    cat "$CONFIG_DIR/pipelines/intake-route.conf" >> "$DEST/intake.conf"
+
+    for lane in security telemetry; do
+        echo -e "${YELLOW}Lane: $lane${NC}"
+        write_header "$DEST/$lane.conf" "$OUTPUT_TYPE" " ($lane lane)" " --pipelines"
+        append_pipeline_input "$DEST/$lane.conf" "$lane" "INPUT CONFIGURATION ($lane lane, from intake)"
+        append_filters "$DEST/$lane.conf" lane
+        append_output "$DEST/$lane.conf" "$OUTPUT_TYPE"
+    done
+
+    write_pipelines_header "$DEST/pipelines.yml" "$(cat << 'EOF'
+# intake classifies (and with SAMPLING=true, sheds) events and hands them to
+# the security or telemetry lane, so a backlog of stats cannot delay IDS alerts
+# and audit events. Each lane has its own workers, batch size and queue; the
+# ${VAR:default} values are read from the environment when Logstash starts.
+EOF
+)"
+    append_pipeline_entry "$DEST/pipelines.yml" intake INTAKE 2 250 memory ""
+    append_pipeline_entry "$DEST/pipelines.yml" security SECURITY 1 125 persisted 1gb
+    append_pipeline_entry "$DEST/pipelines.yml" telemetry TELEMETRY 2 500 persisted 4gb
+
+    finish_manifest "$DEST/pipelines.yml"
+
+    echo ""
+    echo -e "${GREEN}Assembly complete!${NC}"
+    echo "Output written to: $DEST"
+    echo ""
+    wc -l "$DEST/"*.conf "$DEST/pipelines.yml"
+    exit 0
+fi
+
+# Set default destination if not provided
+if [[ -z "$DEST" ]]; then
+    mkdir -p "$CONFIG_DIR/assembled"
+    DEST="$CONFIG_DIR/assembled/${OUTPUT_TYPE}${PROFILE:+-$PROFILE}-full.conf"
+fi
+
+echo -e "${YELLOW}Assembling Logstash config for: $OUTPUT_TYPE${NC}"
+echo "Output file: $DEST"
+echo ""
+
+# Create/clear the output file with a header
+write_header "$DEST" "$OUTPUT_TYPE"
+
+# Assemble inputs
+append_inputs "$DEST"
+
+# Assemble filters (in sorted order)
+append_filters "$DEST" all
+
+# Assemble output
+append_output "$DEST" "$OUTPUT_TYPE"
+finish_manifest "$DEST"
 
 # Copy docker_run.tftpl to assembled directory (needed by Terraform deployments)
 DEST_DIR="$(dirname "$DEST")"
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Resolve LOG_PROFILE in one config module at assembly time.
+
+Used by assemble-config.sh --profile. Reads a filter or output module on
+stdin and writes it to stdout with:
+
+- blocks headed by `if "<tag>" in [tags] ...` (or `else if`) removed when
+  the tag has no output under the profile, or when the block's
+  `("${LOG_PROFILE:all}" == "all" or "${LOG_PROFILE:all}" == "<p>")` clause
+  is false for it. An `else if` left first in its chain becomes `if`.
+- that clause dropped from the blocks that stay, since it is always true.
+- any other "${LOG_PROFILE:all}" and ENV.fetch("LOG_PROFILE", "all")
+  replaced by the profile, so the environment no longer changes it.
+
+Each removed block is appended to the --manifest file as
+"<source>:<line> <condition>".
+
+Usage:
+    prune-profile.py --profile networking --dead-tags "suricata mitm" \
+        --source output.conf --manifest /tmp/manifest < in.conf > out.conf
+"""
+
+import argparse
+import re
+import sys
+
+CLAUSE = r'\("\$\{LOG_PROFILE:all\}" == "all" or "\$\{LOG_PROFILE:all\}" == "([a-z]+)"\)'
+HEAD_RE = re.compile(r'^(\s*)(else )?if "([A-Za-z0-9_.]+)" in \[tags\](?: and ' + CLAUSE + r')? \{\s*$')
+CLAUSE_RE = re.compile(r' and ' + CLAUSE)
+
+
+def prune(lines, profile, dead_tags, source):
+    """Returns (pruned lines, [(line number, condition) removed])."""
+    out = []
+    removed = []
+    pending = []    # comments and blank lines before the next statement
+    promote = None  # indent of a chain whose `if` was removed
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            pending.append(line)
+            i += 1
+            continue
+
+        m = HEAD_RE.match(line)
+        if m:
+            indent, is_else, tag, clause_profile = m.groups()
+            dead = tag in dead_tags or (
+                clause_profile is not None and profile not in ('all', clause_profile))
+            if dead:
+                # The block ends at the first "}" back at its indent (ruby
+                # code inside has unbalanced braces in strings)
+                end = indent + '}'
+                j = i + 1
+                while j < len(lines) and lines[j].rstrip() != end:
+                    if lines[j].strip() and not lines[j].startswith(indent + ' '):
+                        sys.exit('%s:%d: block at line %d is not closed at its indent' % (source, j + 1, i + 1))
+                    j += 1
+                if j == len(lines):
+                    sys.exit('%s:%d: cannot find the end of this block' % (source, i + 1))
+                j += 1
+                removed.append((i + 1, stripped.rstrip(' {')))
+                # The comments above the block describe it, and the blank
+                # line after it separates it from the next
+                pending = []
+                if not out or not out[-1].strip():
+                    while j < len(lines) and not lines[j].strip():
+                        j += 1
+                if not is_else:
+                    promote = indent
+                i = j
+                continue
+            if is_else and promote == indent:
+                line = indent + line.lstrip()[len('else '):]
+            line = CLAUSE_RE.sub('', line)
+        elif promote is not None and line.startswith(promote + 'else'):
+            sys.exit('%s:%d: "else" left without its "if"' % (source, i + 1))
+        promote = None
+
+        out.extend(pending)
+        pending = []
+        out.append(line.replace('${LOG_PROFILE:all}', profile)
+                   .replace('ENV.fetch("LOG_PROFILE", "all")', '"%s"' % profile))
+        i += 1
+    out.extend(pending)
+    return out, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve LOG_PROFILE in a config module')
+    parser.add_argument('--profile', required=True, help='all, security or networking')
+    parser.add_argument('--dead-tags', default='', help='Space-separated tags without an output')
+    parser.add_argument('--source', default='<stdin>', help='Module name for the manifest and errors')
+    parser.add_argument('--manifest', help='File to append removed blocks to')
+    args = parser.parse_args()
+
+    lines = sys.stdin.read().split('\n')
+    out, removed = prune(lines, args.profile, set(args.dead_tags.split()), args.source)
+    sys.stdout.write('\n'.join(out))
+    if args.manifest and removed:
+        with open(args.manifest, 'a') as f:
+            for number, condition in removed:
+                f.write('  - %s:%d %s\n' % (args.source, number, condition))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+#!/bin/sh
+set -e
+
+# The exporter reads /proc/net/udp and /proc/net/snmp of its own network
+# namespace, so run it in the Logstash container's: same ECS task (awsvpc),
+# docker --network container:<logstash>, or host networking for both
+exec python3 /exporter.py
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Metrics Exporter - Prometheus scrape endpoint for the SIEM connector.
+
+Runs next to Logstash in the same network namespace (ECS task, docker
+--network container:<logstash>, or host networking) and serves /metrics with:
+
+    logstash_*        pipeline events in/out/filtered, queue depth, worker
+                      utilization, per-plugin events and durations by `id`,
+                      plugin counters (grok failures, Zabbix batch retries, ...)
+                      from the Logstash API (_node/stats)
+    connector_udp_*   kernel UDP counters: per-socket receive queue and drops
+                      for the syslog port(s) from /proc/net/udp{,6}, and the
+                      namespace's receive buffer errors from /proc/net/snmp{,6}
+
+The UDP input drops silently in the kernel when the workers fall behind;
+connector_udp_socket_drops_total and connector_udp_rcvbuf_errors_total count
+those datagrams. Every scrape reads fresh values; the kernel counters are
+exported even when Logstash does not answer (logstash_up 0).
+
+Settings (environment):
+    EXPORTER_PORT       Listen port (default: 9198)
+    EXPORTER_ADDRESS    Listen address (default: 0.0.0.0)
+    LOGSTASH_API        Logstash API URL (default: http://127.0.0.1:9600)
+    EXPORTER_UDP_PORTS  Comma-separated UDP ports to watch (default: 5000)
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOGSTASH_TIMEOUT = 5
+
+# /proc/net/snmp Udp counters -> metric name
+UDP_SNMP = {
+    "InDatagrams": "connector_udp_in_datagrams_total",
+    "NoPorts": "connector_udp_no_ports_total",
+    "InErrors": "connector_udp_in_errors_total",
+    "RcvbufErrors": "connector_udp_rcvbuf_errors_total",
+    "InCsumErrors": "connector_udp_in_csum_errors_total",
+}
+
+# Current value of these pipeline flow metrics (Logstash 8.5+)
+PIPELINE_FLOWS = ("worker_utilization", "queue_backpressure", "input_throughput", "filter_throughput",
+                  "output_throughput")
+PLUGIN_FLOWS = ("worker_utilization", "worker_millis_per_event")
+
+HELP = {
+    "logstash_up": ("gauge", "1 if the Logstash API answered the last scrape"),
+    "logstash_pipeline_events_in_total": ("counter", "Events the pipeline's inputs pushed to its queue"),
+    "logstash_pipeline_events_filtered_total": ("counter", "Events that went through the filters"),
+    "logstash_pipeline_events_out_total": ("counter", "Events that went through the outputs"),
+    "logstash_pipeline_events_duration_seconds_total": ("counter", "Worker time spent on events"),
+    "logstash_pipeline_queue_push_duration_seconds_total": ("counter", "Time inputs waited to push to the queue (backpressure)"),
+    "logstash_pipeline_queue_events": ("gauge", "Events in the persisted queue (0 for memory queues)"),
+    "logstash_pipeline_queue_size_bytes": ("gauge", "Persisted queue size on disk"),
+    "logstash_pipeline_queue_max_size_bytes": ("gauge", "Persisted queue size limit"),
+    "logstash_pipeline_flow": ("gauge", "Current value of a pipeline flow metric"),
+    "logstash_pipeline_reloads_failures_total": ("counter", "Failed config reloads"),
+    "logstash_plugin_events_in_total": ("counter", "Events the plugin received"),
+    "logstash_plugin_events_out_total": ("counter", "Events the plugin passed on"),
+    "logstash_plugin_duration_seconds_total": ("counter", "Time spent in the plugin"),
+    "logstash_plugin_flow": ("gauge", "Current value of a plugin flow metric"),
+    "logstash_plugin_counter": ("gauge", "Other numeric metrics a plugin reports (failures, retries, ...)"),
+    "logstash_jvm_heap_used_bytes": ("gauge", "JVM heap in use"),
+    "logstash_jvm_heap_max_bytes": ("gauge", "JVM heap limit"),
+    "logstash_process_cpu_seconds_total": ("counter", "CPU time of the Logstash process"),
+    "connector_udp_socket_receive_queue_bytes": ("gauge", "Bytes waiting in the socket's kernel receive buffer"),
+    "connector_udp_socket_drops_total": ("counter", "Datagrams the kernel dropped for the socket (buffer full)"),
+    "connector_udp_in_datagrams_total": ("counter", "UDP datagrams delivered to sockets (network namespace)"),
+    "connector_udp_no_ports_total": ("counter", "UDP datagrams to a port without a socket"),
+    "connector_udp_in_errors_total": ("counter", "UDP datagrams that could not be delivered"),
+    "connector_udp_rcvbuf_errors_total": ("counter", "UDP datagrams dropped because a receive buffer was full"),
+    "connector_udp_in_csum_errors_total": ("counter", "UDP datagrams with a bad checksum"),
+    "connector_exporter_scrape_duration_seconds": ("gauge", "Time this scrape took"),
+}
+
+
+class Metrics:
+    """Samples of one scrape, written out in the Prometheus text format."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, name: str, value, **labels):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        self.samples.setdefault(name, []).append((labels, value))
+
+    def render(self) -> str:
+        lines = []
+        for name, samples in self.samples.items():
+            kind, text = HELP[name]
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{escape(str(v))}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def collect_logstash(metrics: Metrics, api: str):
+    try:
+        with urllib.request.urlopen(f"{api}/_node/stats", timeout=LOGSTASH_TIMEOUT) as resp:
+            stats = json.load(resp)
+    except (urllib.error.URLError, OSError, ValueError):
+        metrics.add("logstash_up", 0)
+        return
+    metrics.add("logstash_up", 1)
+
+    mem = (stats.get("jvm") or {}).get("mem") or {}
+    metrics.add("logstash_jvm_heap_used_bytes", mem.get("heap_used_in_bytes"))
+    metrics.add("logstash_jvm_heap_max_bytes", mem.get("heap_max_in_bytes"))
+    cpu_ms = ((stats.get("process") or {}).get("cpu") or {}).get("total_in_millis")
+    if cpu_ms is not None:
+        metrics.add("logstash_process_cpu_seconds_total", cpu_ms / 1000)
+
+    for pipeline, p in (stats.get("pipelines") or {}).items():
+        events = p.get("events") or {}
+        metrics.add("logstash_pipeline_events_in_total", events.get("in"), pipeline=pipeline)
+        metrics.add("logstash_pipeline_events_filtered_total", events.get("filtered"), pipeline=pipeline)
+        metrics.add("logstash_pipeline_events_out_total", events.get("out"), pipeline=pipeline)
+        for key, name in (("duration_in_millis", "logstash_pipeline_events_duration_seconds_total"),
+                          ("queue_push_duration_in_millis", "logstash_pipeline_queue_push_duration_seconds_total")):
+            if events.get(key) is not None:
+                metrics.add(name, events[key] / 1000, pipeline=pipeline)
+
+        queue = p.get("queue") or {}
+        capacity = queue.get("capacity") or {}
+        qtype = queue.get("type", "memory")
+        metrics.add("logstash_pipeline_queue_events", queue.get("events_count", queue.get("events", 0)),
+                    pipeline=pipeline, type=qtype)
+        if qtype == "persisted":
+            metrics.add("logstash_pipeline_queue_size_bytes",
+                        capacity.get("queue_size_in_bytes", queue.get("queue_size_in_bytes")), pipeline=pipeline)
+            metrics.add("logstash_pipeline_queue_max_size_bytes",
+                        capacity.get("max_queue_size_in_bytes", queue.get("max_queue_size_in_bytes")), pipeline=pipeline)
+
+        for flow in PIPELINE_FLOWS:
+            metrics.add("logstash_pipeline_flow", ((p.get("flow") or {}).get(flow) or {}).get("current"),
+                        pipeline=pipeline, flow=flow)
+        metrics.add("logstash_pipeline_reloads_failures_total", (p.get("reloads") or {}).get("failures"),
+                    pipeline=pipeline)
+
+        for kind, plugins in (p.get("plugins") or {}).items():
+            if kind == "codecs":
+                continue
+            for plugin in plugins or []:
+                collect_plugin(metrics, pipeline, kind[:-1], plugin)
+
+
+def collect_plugin(metrics: Metrics, pipeline: str, kind: str, plugin: dict):
+    labels = {"pipeline": pipeline, "kind": kind, "plugin": plugin.get("name", ""), "id": plugin.get("id", "")}
+    events = plugin.get("events") or {}
+    metrics.add("logstash_plugin_events_in_total", events.get("in"), **labels)
+    metrics.add("logstash_plugin_events_out_total", events.get("out"), **labels)
+    if events.get("duration_in_millis") is not None:
+        metrics.add("logstash_plugin_duration_seconds_total", events["duration_in_millis"] / 1000, **labels)
+    for flow in PLUGIN_FLOWS:
+        metrics.add("logstash_plugin_flow", ((plugin.get("flow") or {}).get(flow) or {}).get("current"),
+                    flow=flow, **labels)
+
+    # Everything else numeric: grok matches/failures, ruby filter counters
+    # (metric.increment in the .conf files), output plugin request counters
+    def walk(prefix: str, value):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                walk(f"{prefix}_{k}" if prefix else k, v)
+        else:
+            metrics.add("logstash_plugin_counter", value, counter=prefix, **labels)
+
+    for key, value in plugin.items():
+        if key not in ("id", "name", "events", "flow"):
+            walk(key, value)
+
+
+def proc_address(hex_address: str) -> str:
+    """Address of a /proc/net/udp{,6} entry (32-bit words in host byte order, x86/arm little-endian)."""
+    raw = b"".join(bytes.fromhex(hex_address[i:i + 8])[::-1] for i in range(0, len(hex_address), 8))
+    return socket.inet_ntop(socket.AF_INET if len(raw) == 4 else socket.AF_INET6, raw)
+
+
+def udp_sockets(path: str, ports: set):
+    """(local address, port, rx_queue bytes, drops) of the sockets bound to the ports."""
+    try:
+        with open(path) as f:
+            lines = f.readlines()[1:]
+    except OSError:
+        return
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 13:
+            continue
+        address, _, port = fields[1].rpartition(":")
+        port = int(port, 16)
+        if port in ports:
+            rx_queue = int(fields[4].split(":")[1], 16)
+            yield proc_address(address), port, rx_queue, int(fields[12])
+
+
+def snmp_udp(path: str, prefix: str) -> dict:
+    """Udp counters of /proc/net/snmp (two "Udp:" lines) or /proc/net/snmp6 ("Udp6Name value" lines)."""
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return {}
+    if prefix == "Udp":
+        rows = [line.split()[1:] for line in lines if line.startswith("Udp: ")]
+        return {k: int(v) for k, v in zip(*rows)} if len(rows) == 2 else {}
+    return {k[len(prefix):]: int(v) for k, v in (line.split() for line in lines if line.startswith(prefix)
+                                                if len(line.split()) == 2)}
+
+
+def collect_udp(metrics: Metrics, ports: set):
+    for family, path in (("ipv4", "/proc/net/udp"), ("ipv6", "/proc/net/udp6")):
+        for address, port, rx_queue, drops in udp_sockets(path, ports):
+            labels = {"family": family, "address": address, "port": str(port)}
+            metrics.add("connector_udp_socket_receive_queue_bytes", rx_queue, **labels)
+            metrics.add("connector_udp_socket_drops_total", drops, **labels)
+    for family, path, prefix in (("ipv4", "/proc/net/snmp", "Udp"), ("ipv6", "/proc/net/snmp6", "Udp6")):
+        counters = snmp_udp(path, prefix)
+        for key, name in UDP_SNMP.items():
+            metrics.add(name, counters.get(key), family=family)
+
+
+class Handler(BaseHTTPRequestHandler):
+    api = ""
+    ports = set()
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            body = b'<a href="/metrics">/metrics</a>\n' if self.path == "/" else b"Not Found\n"
+            self.reply(200 if self.path == "/" else 404, body, "text/html" if self.path == "/" else "text/plain")
+            return
+        started = time.monotonic()
+        metrics = Metrics()
+        collect_logstash(metrics, self.api)
+        collect_udp(metrics, self.ports)
+        metrics.add("connector_exporter_scrape_duration_seconds", round(time.monotonic() - started, 6))
+        self.reply(200, metrics.render().encode(), "text/plain; version=0.0.4; charset=utf-8")
+
+    def reply(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    address = os.environ.get("EXPORTER_ADDRESS", "0.0.0.0")
+    port = int(os.environ.get("EXPORTER_PORT", "9198"))
+    Handler.api = os.environ.get("LOGSTASH_API", "http://127.0.0.1:9600").rstrip("/")
+    try:
+        Handler.ports = {int(p) for p in os.environ.get("EXPORTER_UDP_PORTS", "5000").split(",") if p.strip()}
+    except ValueError:
+        sys.exit("Error: EXPORTER_UDP_PORTS must be comma-separated port numbers")
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    print(f"exporter: serving http://{address}:{port}/metrics (Logstash API {Handler.api}, "
+          f"UDP ports {','.join(map(str, sorted(Handler.ports)))})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Benchmark Matrix - throughput of every output type under every LOG_PROFILE.
+
+For each cell (output type x profile) the matrix assembles the config, starts
+a SIEM sink (../siem-sink) and Logstash in Docker pointed at it, and drives it
+with stream-logs.py's seeded synthetic corpus (all log types at log_generator's
+DEFAULT_MIX ratios) at a fixed offered rate. After a warm-up it measures:
+
+    eps           events/s Logstash took in (node stats events.in); below the
+                  offered rate, the cell is saturated and this is its capacity
+    out_eps       events/s the sink received
+    cpu_ms_per_1k Logstash process CPU per 1000 events taken in
+    heap_mb_max   highest JVM heap use seen
+    p99_ms        send-to-sink latency of traced events (outputs that forward
+                  the raw message only; null for metrics-only outputs)
+
+Results can be saved as a versioned baseline JSON and later runs compared
+against one: a cell whose eps fell or cpu_ms_per_1k rose by more than
+--threshold percent fails the run (exit 1).
+
+Usage:
+    ./benchmark-matrix.py --dry-run
+    ./benchmark-matrix.py --save-baseline baselines/$(git describe --tags --always).json
+    ./benchmark-matrix.py --types splunk-hec,zabbix --profiles all --baseline baselines/v1.4.0.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shlex
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CONFIG_DIR = ROOT / "logstash-configs"
+ASSEMBLE = CONFIG_DIR / "scripts" / "assemble-config.sh"
+SINK = ROOT / "test-tools" / "siem-sink" / "siem-sink.py"
+STREAM = ROOT / "test-tools" / "sample-logs" / "stream-logs.py"
+
+sys.path.insert(0, str(STREAM.parent))
+from log_generator import DEFAULT_MIX  # noqa: E402
+
+SCHEMA_VERSION = 1
+DEFAULT_IMAGE = "docker.elastic.co/logstash/logstash:8.16.2"
+DEFAULT_TYPES = "splunk-hec,dynatrace,dynatrace-logs,dynatrace-metrics,zabbix"
+PROFILES = ("all", "security", "networking")
+SYSLOG_PORT = 5000  # inputs/00-syslog-input.conf
+
+
+def output_env(output_type: str, sink: str, http_port: int, zabbix_port: int, tls: bool) -> dict:
+    """Settings that point an output at the sink (dummy credentials, as test-tools/ci/output-env-vars.sh)."""
+    scheme = "https" if tls else "http"
+    base = f"{scheme}://{sink}:{http_port}"
+    if output_type == "splunk-hec":
+        return {"SPLUNK_ADDRESS": f"{scheme}://{sink}", "SPLUNK_PORT": str(http_port), "SPLUNK_HEC_AUTH": "bench"}
+    if output_type.startswith("dynatrace"):
+        return {"DT_METRICS_URL": f"{base}/api/v2/metrics/ingest", "DT_API_TOKEN": "bench",
+                "DT_LOGS_URL": f"{base}/api/v2/logs/ingest", "DT_LOGS_TOKEN": "bench"}
+    if output_type == "zabbix":
+        return {"ZABBIX_SERVER": sink, "ZABBIX_PORT": str(zabbix_port)}
+    if output_type == "azure-log-ingestion":
+        env = {"client_app_id": "bench", "client_app_secret": "bench", "tenant_id": "bench",
+               "data_collection_endpoint": base, "azure_cloud": "AzureCloud"}
+        for i, kind in enumerate(("netsession", "websession", "ids", "gw_net_stats", "gw_sys_stats", "cmd", "tunnel_status")):
+            env[f"azure_dcr_{kind}_id"] = f"dcr-bench{i}"
+            env[f"azure_stream_{kind}"] = f"Custom-Bench{i}_CL"
+        return env
+    sys.exit(f"Error: no sink settings for output type '{output_type}'")
+
+
+def http_json(url: str, method: str = "GET", timeout: float = 5.0):
+    req = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    # The sink's certificate in Azure cells is the caller's own, usually self-signed
+    context = ssl._create_unverified_context() if url.startswith("https:") else None
+    with urllib.request.urlopen(req, timeout=timeout, context=context) as resp:
+        return json.load(resp)
+
+
+def git_version() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--tags", "--always", "--dirty"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Cell:
+    def __init__(self, output_type: str, profile: str):
+        self.output_type = output_type
+        self.profile = profile
+        self.key = f"{output_type}/{profile}"
+
+
+def assemble(cell: Cell, workdir: Path, fixed: bool) -> Path:
+    """Assemble the cell's config into workdir; None if the profile forwards nothing for the output."""
+    dest = workdir / f"{cell.output_type}-{cell.profile}.conf"
+    # --profile also tells whether the output forwards anything under the profile
+    cmd = [str(ASSEMBLE), cell.output_type, "--profile", cell.profile, str(dest)]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        if "forwards no log type" in result.stdout + result.stderr:
+            return None
+        sys.exit(f"Error: {' '.join(cmd)} failed:\n{result.stdout}{result.stderr}")
+    if not fixed:
+        subprocess.run([str(ASSEMBLE), cell.output_type, str(dest)], capture_output=True, check=True)
+    return dest
+
+
+def run_cell(cell: Cell, conf: Path, args, index: int) -> dict:
+    tls = cell.output_type == "azure-log-ingestion"
+    sink_cmd = [sys.executable, str(SINK), "--trace", "--host", "127.0.0.1", "--http-port", str(args.sink_port),
+                "--zabbix-port", str(args.zabbix_port), "--report-interval", "0"]
+    if tls:
+        sink_cmd += ["--tls-cert", args.sink_tls_cert, "--tls-key", args.sink_tls_key]
+    env = output_env(cell.output_type, "127.0.0.1", args.sink_port, args.zabbix_port, tls)
+    env.update({
+        "XPACK_MONITORING_ENABLED": "false",
+        "API_HTTP_HOST": "127.0.0.1",
+        "API_HTTP_PORT": str(args.api_port),
+        "LS_JAVA_OPTS": f"-Xms{args.heap} -Xmx{args.heap}",
+    })
+    if not args.fixed_profile:
+        env["LOG_PROFILE"] = cell.profile
+    if args.pipeline_workers:
+        env["PIPELINE_WORKERS"] = str(args.pipeline_workers)
+    name = f"avx-bench-{os.getpid()}-{index}"
+    docker_cmd = ["docker", "run", "-d", "--rm", "--name", name, "--network", "host",
+                  "-v", f"{conf.parent}:/config:ro",
+                  "-v", f"{CONFIG_DIR / 'patterns'}:/usr/share/logstash/patterns:ro"]
+    if tls:
+        docker_cmd += ["--add-host", "login.microsoftonline.com:127.0.0.1"]
+    for k, v in env.items():
+        docker_cmd += ["-e", f"{k}={v}"]
+    docker_cmd += [args.image, "logstash", "-f", f"/config/{conf.name}"]
+    stream_cmd = [sys.executable, str(STREAM), "--source", "synthetic", "--target", "127.0.0.1",
+                  "--port", str(SYSLOG_PORT), "--rate", str(args.rate), "--seed", str(args.seed), "--trace",
+                  "--duration", str(args.warmup + args.measure + 5)]
+    if args.senders:
+        stream_cmd += ["--senders", str(args.senders)]
+
+    if args.dry_run:
+        for cmd in (sink_cmd, docker_cmd, stream_cmd):
+            print("  " + shlex.join(cmd))
+        return None
+
+    api = f"http://127.0.0.1:{args.api_port}"
+    sink_api = f"{'https' if tls else 'http'}://127.0.0.1:{args.sink_port}"
+    sink = subprocess.Popen(sink_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stream = None
+    try:
+        subprocess.run(docker_cmd, check=True, capture_output=True)
+        wait_ready(api, name, args.startup_timeout)
+        stream = subprocess.Popen(stream_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        time.sleep(args.warmup)
+
+        http_json(f"{sink_api}/sink/reset", "POST")
+        first = http_json(f"{api}/_node/stats")
+        started = time.monotonic()
+        heap_max = 0
+        while time.monotonic() - started < args.measure:
+            time.sleep(min(2.0, args.measure))
+            heap_max = max(heap_max, http_json(f"{api}/_node/stats/jvm")["jvm"]["mem"]["heap_used_in_bytes"])
+        last = http_json(f"{api}/_node/stats")
+        seconds = time.monotonic() - started
+        sink_stats = http_json(f"{sink_api}/sink/stats")
+    finally:
+        if stream:
+            stream.terminate()
+            stream.wait()
+        subprocess.run(["docker", "rm", "-f", name], capture_output=True)
+        sink.terminate()
+        sink.wait()
+
+    events_in = pipeline_events(last) - pipeline_events(first)
+    cpu_ms = last["process"]["cpu"]["total_in_millis"] - first["process"]["cpu"]["total_in_millis"]
+    latency = [e["latency_ms"] for e in sink_stats["endpoints"].values() if "latency_ms" in e]
+    eps = events_in / seconds
+    return {
+        "offered_eps": args.rate,
+        "eps": round(eps),
+        "saturated": eps < 0.98 * args.rate,
+        "out_eps": round(sum(e["events"] for e in sink_stats["endpoints"].values()) / sink_stats["uptime_s"]),
+        "cpu_ms_per_1k": round(1000.0 * cpu_ms / events_in, 2) if events_in else None,
+        "heap_mb_max": round(max(heap_max, last["jvm"]["mem"]["heap_used_in_bytes"]) / 2**20),
+        "heap_mb_limit": round(last["jvm"]["mem"]["heap_max_in_bytes"] / 2**20),
+        "p99_ms": max(l["p99"] for l in latency) if latency else None,
+        "latency_samples": sum(l["samples"] for l in latency),
+    }
+
+
+def pipeline_events(stats: dict) -> int:
+    return sum(p["events"]["in"] for p in stats["pipelines"].values())
+
+
+def wait_ready(api: str, container: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if http_json(f"{api}/_node/stats/pipelines").get("pipelines"):
+                return
+        except (urllib.error.URLError, OSError, ValueError):
+            pass
+        running = subprocess.run(["docker", "ps", "-q", "-f", f"name={container}"], capture_output=True, text=True)
+        if not running.stdout.strip():
+            raise RuntimeError(f"Logstash container {container} exited during startup")
+        time.sleep(2)
+    logs = subprocess.run(["docker", "logs", "--tail", "20", container], capture_output=True, text=True)
+    raise RuntimeError(f"Logstash did not start within {timeout:g}s:\n{logs.stdout}{logs.stderr}")
+
+
+def print_results(results: dict):
+    print()
+    print("=" * 60)
+    print("Benchmark Matrix")
+    print("=" * 60)
+    print(f"{'cell':<32} {'eps':>8} {'':3} {'out/s':>8} {'CPU ms/1k':>10} {'heap MB':>8} {'p99 ms':>8}")
+    for key, r in results.items():
+        if r is None:
+            print(f"{key:<32} {'(profile forwards nothing)':>40}")
+            continue
+        p99 = f"{r['p99_ms']:.1f}" if r["p99_ms"] is not None else "-"
+        cpu = f"{r['cpu_ms_per_1k']:.2f}" if r["cpu_ms_per_1k"] is not None else "-"
+        print(f"{key:<32} {r['eps']:>8d} {'sat' if r['saturated'] else '':3} {r['out_eps']:>8d} "
+              f"{cpu:>10} {r['heap_mb_max']:>8d} {p99:>8}")
+    print("\nsat: Logstash took in less than the offered rate, so eps is its capacity.")
+
+
+def compare(results: dict, baseline: dict, run: dict, threshold: float) -> list[str]:
+    """Regression messages; prints the comparison."""
+    if baseline.get("schema") != SCHEMA_VERSION:
+        sys.exit(f"Error: baseline schema {baseline.get('schema')}, expected {SCHEMA_VERSION}")
+    for section in ("host", "load"):
+        changed = {k for k in set(run[section]) | set(baseline.get(section, {}))
+                   if run[section].get(k) != baseline.get(section, {}).get(k)}
+        if changed:
+            print(f"Warning: {section} differs from the baseline ({', '.join(sorted(changed))}); "
+                  "the numbers may not be comparable")
+    print()
+    print(f"Baseline: {baseline.get('connector_version', '?')} ({baseline.get('created', '?')}), threshold {threshold:g}%")
+    print(f"{'cell':<32} {'eps':>17} {'CPU ms/1k':>19} {'p99 ms':>17}")
+    regressions = []
+    for key, r in results.items():
+        b = (baseline.get("cells") or {}).get(key)
+        if r is None or b is None:
+            continue
+
+        def change(metric):
+            if r.get(metric) is None or not b.get(metric):
+                return None
+            return 100.0 * (r[metric] - b[metric]) / b[metric]
+
+        eps, cpu, p99 = change("eps"), change("cpu_ms_per_1k"), change("p99_ms")
+        fmt = lambda metric, c: f"{b[metric]}->{r[metric]} ({c:+.0f}%)" if c is not None else "-"
+        flags = []
+        # eps only drops when Logstash was the limit in either run
+        if eps is not None and eps < -threshold and (r["saturated"] or b.get("saturated")):
+            flags.append(f"eps {b['eps']} -> {r['eps']} ({eps:+.1f}%)")
+        if cpu is not None and cpu > threshold:
+            flags.append(f"CPU/1k {b['cpu_ms_per_1k']} -> {r['cpu_ms_per_1k']} ({cpu:+.1f}%)")
+        print(f"{key:<32} {fmt('eps', eps):>17} {fmt('cpu_ms_per_1k', cpu):>19} {fmt('p99_ms', p99):>17}"
+              + ("  REGRESSION" if flags else ""))
+        regressions += [f"{key}: {f}" for f in flags]
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Throughput, CPU, heap and latency of each output type under each LOG_PROFILE, with baselines")
+    parser.add_argument("--types", default=DEFAULT_TYPES,
+                        help=f"Comma-separated output types (default: {DEFAULT_TYPES}; azure-log-ingestion needs "
+                             "--image with the Sentinel plugin and --sink-tls-cert/--sink-tls-key)")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Comma-separated profiles (default: all three)")
+    parser.add_argument("--fixed-profile", action="store_true",
+                        help="Assemble with assemble-config.sh --profile instead of setting LOG_PROFILE")
+    parser.add_argument("--rate", type=int, default=20000, help="Offered events/s (default: 20000)")
+    parser.add_argument("--warmup", type=float, default=30.0, help="Seconds of load before measuring (default: 30)")
+    parser.add_argument("--measure", type=float, default=60.0, help="Seconds measured per cell (default: 60)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic corpus seed (default: 0)")
+    parser.add_argument("--senders", type=int, help="stream-logs.py --senders (default: its own)")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help=f"Logstash image (default: {DEFAULT_IMAGE})")
+    parser.add_argument("--heap", default="1g", help="JVM heap, -Xms and -Xmx (default: 1g)")
+    parser.add_argument("--pipeline-workers", type=int, help="PIPELINE_WORKERS (default: Logstash's, one per CPU)")
+    parser.add_argument("--api-port", type=int, default=9600, help="Logstash API port (default: 9600)")
+    parser.add_argument("--sink-port", type=int, default=8088, help="Sink HTTP port (default: 8088)")
+    parser.add_argument("--zabbix-port", type=int, default=10051, help="Sink Zabbix trapper port (default: 10051)")
+    parser.add_argument("--sink-tls-cert", help="Certificate for the sink in Azure cells (the JVM must trust it)")
+    parser.add_argument("--sink-tls-key", help="Key for --sink-tls-cert")
+    parser.add_argument("--startup-timeout", type=float, default=300.0, help="Seconds to wait for Logstash (default: 300)")
+    parser.add_argument("--save-baseline", type=Path, metavar="FILE", help="Write the results as a baseline")
+    parser.add_argument("--baseline", type=Path, metavar="FILE", help="Compare against a baseline; regressions exit 1")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent drop in eps or rise in CPU per 1k events that fails (default: 10)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the commands of each cell and exit")
+    args = parser.parse_args()
+
+    types = [t for t in args.types.split(",") if t]
+    profiles = [p for p in args.profiles.split(",") if p]
+    unknown = [p for p in profiles if p not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s) {', '.join(unknown)} (valid: {', '.join(PROFILES)})")
+    if "azure-log-ingestion" in types and not (args.sink_tls_cert and args.sink_tls_key):
+        parser.error("azure-log-ingestion needs --sink-tls-cert and --sink-tls-key (the plugin only talks HTTPS)")
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            sys.exit(f"Error: cannot read {args.baseline}: {e}")
+
+    run = {
+        "host": {"cpus": os.cpu_count(), "kernel": platform.release(), "image": args.image, "heap": args.heap,
+                 "pipeline_workers": args.pipeline_workers},
+        "load": {"rate": args.rate, "warmup_s": args.warmup, "measure_s": args.measure, "seed": args.seed,
+                 "source": "synthetic", "transport": "udp", "mix": DEFAULT_MIX,
+                 "assembly": "fixed" if args.fixed_profile else "runtime"},
+    }
+    cells = [Cell(t, p) for t in types for p in profiles]
+    print(f"{len(cells)} cells, about {len(cells) * (args.warmup + args.measure + 30) / 60:.0f} minutes "
+          f"({args.rate} events/s offered, {args.warmup:g}s warm-up, {args.measure:g}s measured)", flush=True)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="avx-bench-") as tmp:
+        os.chmod(tmp, 0o755)  # Logstash runs as uid 1000 in the container
+        for index, cell in enumerate(cells):
+            print(f"[{index + 1}/{len(cells)}] {cell.key}", flush=True)
+            conf = assemble(cell, Path(tmp), args.fixed_profile)
+            if conf is None:
+                print("  skipped: the profile forwards nothing for this output")
+                results[cell.key] = None
+                continue
+            try:
+                results[cell.key] = run_cell(cell, conf, args, index)
+            except (RuntimeError, subprocess.CalledProcessError, urllib.error.URLError, OSError) as e:
+                detail = e.stderr.decode(errors="replace") if isinstance(e, subprocess.CalledProcessError) and e.stderr else ""
+                sys.exit(f"Error: cell {cell.key}: {e}\n{detail}")
+    if args.dry_run:
+        return
+
+    print_results(results)
+
+    if args.save_baseline:
+        document = dict(run, schema=SCHEMA_VERSION, connector_version=git_version(),
+                        created=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                        cells={k: v for k, v in results.items() if v is not None})
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare(results, baseline, run, args.threshold)
+        print()
+        sys.stdout.flush()
+        for r in regressions:
+            print(f"FAIL {r}", file=sys.stderr)
+        print(f"Regressions: {len(regressions)}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env ruby
+# Classify Bench - per-event cost of routing a syslog line to its parsing filter.
+#
+# Before: every parsing filter (10-18) ran its own `"Token" in [message]`
+# condition, so each event was searched once per filter (10 distinct tokens).
+# After: filters/05-classify.conf finds the type in one leftmost regex scan and
+# the filters compare [@metadata][log_type] (string equality checks).
+#
+# Both variants are run over the same corpus and must route every line the
+# same way; any difference is reported and fails the run. The differential
+# check runs the shipped ruby filter on stand-in events; the timings measure
+# condition evaluation on the already-resolved [message] and log_type values,
+# since field access costs in Logstash are Java-side and the same for both.
+#
+# Usage:
+#   ./classify-bench.rb                                   # test-samples.log
+#   ../sample-logs/log_generator.py -n 200000 > /tmp/corpus.log
+#   ./classify-bench.rb /tmp/corpus.log --seconds 3
+
+require "optparse"
+require_relative "filter_snippet"
+
+ROOT = File.expand_path("../..", __dir__)
+CLASSIFY_CONF = File.join(ROOT, "logstash-configs/filters/05-classify.conf")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+
+# The conditions filters 10-18 used before the classifier, in pipeline order.
+# cmd_api also required !("cmd" in [tags]); that check only ran after a hit.
+LEGACY_CONDITIONS = [
+  ["microseg", "AviatrixGwMicrosegPacket"],
+  ["mitm", "traffic_server["],
+  ["suricata", "suricata["],
+  ["fqdn", "AviatrixFQDNRule"],
+  ["cmd", "AviatrixCMD"],
+  ["cmd_api", "AviatrixAPI"],
+  ["gw_net_stats", "AviatrixGwNetStats:"],
+  ["gw_sys_stats", "AviatrixGwSysStats:"],
+  ["tunnel_status", "AviatrixTunnelStatusChange"],
+  ["vpn_session", "AviatrixVPNSession"]
+].freeze
+LOG_TYPES = LEGACY_CONDITIONS.map(&:first).freeze
+
+def legacy_route(event)
+  routed = nil
+  LEGACY_CONDITIONS.each do |log_type, token|
+    next unless event.get("type") == "syslog" && event.get("message").include?(token)
+    next if log_type == "cmd_api" && routed == "cmd"
+    routed ||= log_type
+  end
+  routed
+end
+
+def classified_route(classifier, event)
+  classifier.call(event) if event.get("type") == "syslog"
+  log_type = event.get("[@metadata][log_type]")
+  LOG_TYPES.find { |t| t == log_type }
+end
+
+# Condition cost only: 10 substring scans (cmd_api's tag check is not reached
+# unless AviatrixAPI matched)
+def legacy_conditions(message)
+  hits = 0
+  LEGACY_CONDITIONS.each { |_, token| hits += 1 if message.include?(token) }
+  hits
+end
+
+# Condition cost only: the classifier's scan and lookup, then one equality
+# check per parsing filter
+def classified_conditions(regex, types, message)
+  token = message[regex]
+  log_type = token && types[token]
+  hits = 0
+  LOG_TYPES.each { |t| hits += 1 if log_type == t }
+  hits
+end
+
+# Best ns/event over repeated passes lasting at least `seconds` in total
+def measure(events, seconds)
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + seconds
+  loop do
+    t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+    events.each { |e| yield e }
+    elapsed = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0
+    best = [best, elapsed.to_f / events.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  best
+end
+
+options = { seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: classify-bench.rb [corpus.log ...] [--seconds N]"
+  opts.on("--seconds N", Float, "Minimum time per variant (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path).map(&:chomp).reject { |l| l.empty? || l.start_with?("#") }
+end
+if lines.empty?
+  warn "Error: corpus has no log lines"
+  exit 1
+end
+
+classifier = FilterSnippet.load(CLASSIFY_CONF, "classify-log-type")
+fresh = -> { lines.map { |l| BenchEvent.new("type" => "syslog", "message" => l) } }
+
+# Differential check first: both variants must route identically
+mismatches = 0
+by_type = Hash.new(0)
+fresh.call.each do |event|
+  before = legacy_route(event)
+  after = classified_route(classifier, event)
+  by_type[after || "(none)"] += 1
+  next if before == after
+  mismatches += 1
+  warn "MISMATCH legacy=#{before.inspect} classified=#{after.inspect}: #{event.get("message")[0, 160]}" if mismatches <= 10
+end
+
+regex = classifier.instance_variable_get(:@log_type_re)
+types = classifier.instance_variable_get(:@log_types)
+legacy_ns = measure(lines, options[:seconds]) { |m| legacy_conditions(m) }
+classified_ns = measure(lines, options[:seconds]) { |m| classified_conditions(regex, types, m) }
+
+avg_len = lines.sum(&:bytesize).to_f / lines.size
+puts "=" * 60
+puts "Classifier Benchmark"
+puts "=" * 60
+puts "Corpus:           #{lines.size} lines, #{avg_len.round} bytes average (#{corpus.join(", ")})"
+puts "Routing:          #{by_type.sort_by { |_, n| -n }.map { |t, n| "#{t}=#{n}" }.join(" ")}"
+puts "Before (10 substring scans):    #{format("%8.0f", legacy_ns)} ns/event"
+puts "After (1 scan + 10 equality):   #{format("%8.0f", classified_ns)} ns/event"
+puts "Speedup:          #{format("%.2f", legacy_ns / classified_ns)}x"
+puts "Mismatches:       #{mismatches}"
+exit(mismatches.zero? ? 0 : 1)
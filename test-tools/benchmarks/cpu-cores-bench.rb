@@ -0,0 +1,280 @@
+#!/usr/bin/env ruby
+# CPU Cores Bench - cost of parsing the protobuf-text cpu_cores value of
+# AviatrixGwSysStats lines, by core count.
+#
+# Before: the tokenizer tested `raw[i..] =~ /\A.../` at every character. Each
+# test copied the rest of the string, so cost grew with the square of the
+# value length. Each core then ran a gsub and a scan.
+# After: filters/17-cpu-cores-parse.conf tokenizes in one StringScanner pass
+# and reads each busy block's stats in a second pass over that block.
+#
+# The previous code is kept below verbatim as the reference. Both are run on
+# generated values for every core count from 2 to --max-cores, in name-first
+# and busy-first layouts, with full and max-only stats, plus the sample file
+# and --fuzz random fragment soups (unclosed braces, stray tokens). Any
+# difference in the fields set on the event fails the run.
+#
+# Usage:
+#   ./cpu-cores-bench.rb
+#   ./cpu-cores-bench.rb --max-cores 192 --fuzz 20000 --seconds 1
+
+require "optparse"
+require_relative "filter_snippet"
+
+ROOT = File.expand_path("../..", __dir__)
+CPU_CORES_CONF = File.join(ROOT, "logstash-configs/filters/17-cpu-cores-parse.conf")
+SAMPLES = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+TIMED_CORE_COUNTS = [2, 8, 32, 64, 96, 192].freeze
+
+LEGACY_CODE = <<~'RUBY'
+    raw = event.get("cpu_cores")
+    next unless raw.is_a?(String) && raw.length > 2
+
+    # Strip outer brackets
+    raw = raw.strip
+    raw = raw[1..-2] if raw.start_with?("[") && raw.end_with?("]")
+
+    # Tokenize into name:N and busy:{...} tokens with nested brace matching
+    tokens = []
+    i = 0
+    while i < raw.length
+        # Skip whitespace
+        if raw[i] =~ /\s/
+            i += 1
+            next
+        end
+
+        # Match name:N token
+        if raw[i..] =~ /\Aname:(-?\d+)/
+            tokens << { type: :name, value: $1 }
+            i += $~[0].length
+            next
+        end
+
+        # Match busy:{...} token with nested brace matching
+        if raw[i..] =~ /\Abusy:\{/
+            depth = 0
+            start = i + 5  # skip "busy:"
+            j = start
+            while j < raw.length
+                if raw[j] == "{"
+                    depth += 1
+                elsif raw[j] == "}"
+                    depth -= 1
+                    if depth == 0
+                        body = raw[start..j]
+                        tokens << { type: :busy, body: body }
+                        i = j + 1
+                        break
+                    end
+                end
+                j += 1
+            end
+            # If we never closed braces, skip past what we matched
+            i = j + 1 if depth != 0
+            next
+        end
+
+        # Skip any unrecognized character
+        i += 1
+    end
+
+    next if tokens.empty?
+
+    # Extract min/max/avg from a busy block body
+    # Strips out start:{...} and end:{...} sub-blocks first
+    extract_stats = lambda do |body|
+        # Remove nested start:{...} and end:{...} blocks
+        cleaned = body.gsub(/(?:start|end):\{[^}]*\}/, "")
+        stats = {}
+        cleaned.scan(/(min|max|avg):(\d+)/).each do |key, val|
+            stats[key] = val.to_i
+        end
+        stats
+    end
+
+    # Detect format: name-first vs busy-first
+    name_first = tokens[0][:type] == :name
+
+    # Pair tokens into core entries
+    cores = []
+    if name_first
+        pending_name = nil
+        tokens.each do |tok|
+            if tok[:type] == :name
+                pending_name = tok[:value]
+            elsif tok[:type] == :busy
+                stats = extract_stats.call(tok[:body])
+                entry = {}
+                entry["name"] = pending_name if pending_name
+                entry["busy_min"] = stats["min"] if stats["min"]
+                entry["busy_max"] = stats["max"] if stats["max"]
+                entry["busy_avg"] = stats["avg"] if stats["avg"]
+                cores << entry
+                pending_name = nil
+            end
+        end
+    else
+        # busy-first: each busy optionally consumes the following name
+        idx = 0
+        while idx < tokens.length
+            tok = tokens[idx]
+            if tok[:type] == :busy
+                stats = extract_stats.call(tok[:body])
+                entry = {}
+                # Check if next token is a name
+                if idx + 1 < tokens.length && tokens[idx + 1][:type] == :name
+                    entry["name"] = tokens[idx + 1][:value]
+                    idx += 1
+                end
+                entry["busy_min"] = stats["min"] if stats["min"]
+                entry["busy_max"] = stats["max"] if stats["max"]
+                entry["busy_avg"] = stats["avg"] if stats["avg"]
+                cores << entry
+            elsif tok[:type] == :name
+                # Standalone name followed by busy
+                if idx + 1 < tokens.length && tokens[idx + 1][:type] == :busy
+                    stats = extract_stats.call(tokens[idx + 1][:body])
+                    entry = { "name" => tok[:value] }
+                    entry["busy_min"] = stats["min"] if stats["min"]
+                    entry["busy_max"] = stats["max"] if stats["max"]
+                    entry["busy_avg"] = stats["avg"] if stats["avg"]
+                    cores << entry
+                    idx += 1
+                end
+            end
+            idx += 1
+        end
+    end
+
+    next if cores.empty?
+
+    # Set parsed array
+    event.set("cpu_cores_parsed", cores)
+
+    # Extract aggregate (name=-1) and individual core stats
+    aggregate = nil
+    individual_count = 0
+    cores.each do |c|
+        if c["name"] == "-1"
+            aggregate = c
+        elsif c["name"] && c["name"] != "-1"
+            individual_count += 1
+        end
+    end
+
+    if aggregate
+        event.set("cpu_aggregate_busy_min", aggregate["busy_min"]) if aggregate["busy_min"]
+        event.set("cpu_aggregate_busy_max", aggregate["busy_max"]) if aggregate["busy_max"]
+        event.set("cpu_aggregate_busy_avg", aggregate["busy_avg"]) if aggregate["busy_avg"]
+        # cpu_busy: prefer avg, fall back to max
+        if aggregate["busy_avg"]
+            event.set("cpu_busy", aggregate["busy_avg"])
+        elsif aggregate["busy_max"]
+            event.set("cpu_busy", aggregate["busy_max"])
+        end
+    end
+
+    # Fallback: compute cpu_busy from cpu_idle if no aggregate found
+    if !aggregate
+        cpu_idle = event.get("cpu_idle")
+        if cpu_idle
+            idle_val = cpu_idle.is_a?(Numeric) ? cpu_idle : cpu_idle.to_f
+            event.set("cpu_busy", (100 - idle_val).round(1))
+        end
+    end
+
+    event.set("cpu_core_count", individual_count) if individual_count > 0
+RUBY
+
+# Same layout as log_generator.py: N cores plus the -1 aggregate
+def cpu_cores(rng, cores, busy_first:, max_only: false, unnamed: 0)
+  start = 1_772_664_933
+  parts = ([-1] + (1..cores).to_a).map do |name|
+    lo = rng.rand(0..20)
+    stats = max_only ? "max:#{lo + rng.rand(0..60)}" : "min:#{lo}  max:#{lo + rng.rand(0..60)}  avg:#{lo + rng.rand(0..10)}"
+    busy = "busy:{start:{seconds:#{start}  nanos:#{rng.rand(1_000_000_000)}}  " \
+           "end:{seconds:#{start + 40}  nanos:#{rng.rand(1_000_000_000)}}  #{stats}}"
+    busy_first ? "#{busy} name:#{name}" : "name:#{name}  #{busy}"
+  end.shuffle(random: rng)
+  unnamed.times { parts.insert(rng.rand(parts.size + 1), "busy:{max:#{rng.rand(100)}}") }
+  "[#{parts.join(" ")}]"
+end
+
+FRAGMENTS = ["name:", "name:-1", "name:7", "-", "12", " ", "  ", "busy:{", "{", "}", "start:{", "end:{",
+             "seconds:5", "min:", "min:3", "max:40", "avg:9", "x", "[", "]"].freeze
+
+def fuzz_value(rng)
+  Array.new(rng.rand(1..40)) { FRAGMENTS[rng.rand(FRAGMENTS.size)] }.join
+end
+
+def run(filter, value)
+  event = BenchEvent.new("tags" => ["gw_sys_stats"], "cpu_cores" => value, "cpu_idle" => "87.5")
+  filter.call(event)
+  event.data
+end
+
+# Best ns/call over repeated passes lasting at least `seconds` in total
+def measure(values, seconds)
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + seconds
+  loop do
+    t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+    values.each { |v| yield v }
+    elapsed = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0
+    best = [best, elapsed.to_f / values.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  best
+end
+
+options = { max_cores: 192, fuzz: 5000, seconds: 1.0, seed: 1 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: cpu-cores-bench.rb [--max-cores N] [--fuzz N] [--seconds N] [--seed N]"
+  opts.on("--max-cores N", Integer, "Largest generated core count (default: 192)") { |v| options[:max_cores] = v }
+  opts.on("--fuzz N", Integer, "Random fragment values to compare (default: 5000)") { |v| options[:fuzz] = v }
+  opts.on("--seconds N", Float, "Minimum time per variant and core count (default: 1)") { |v| options[:seconds] = v }
+  opts.on("--seed N", Integer, "Random seed (default: 1)") { |v| options[:seed] = v }
+end.parse!
+
+legacy = FilterSnippet.new("cpu-cores-legacy", nil, LEGACY_CODE)
+current = FilterSnippet.load(CPU_CORES_CONF, "cpu-cores-parse")
+rng = Random.new(options[:seed])
+
+values = []
+(2..options[:max_cores]).each do |n|
+  values << cpu_cores(rng, n, busy_first: false)
+  values << cpu_cores(rng, n, busy_first: true)
+  values << cpu_cores(rng, n, busy_first: n.odd?, max_only: true, unnamed: n % 3)
+end
+samples = File.exist?(SAMPLES) ? File.foreach(SAMPLES, encoding: "UTF-8").filter_map { |l| l[/cpu_cores=(.*)$/, 1] } : []
+fuzz = Array.new(options[:fuzz]) { fuzz_value(rng) }
+
+mismatches = 0
+[["generated", values], ["samples", samples], ["fuzz", fuzz]].each do |label, set|
+  set.each do |value|
+    before = run(legacy, value)
+    after = run(current, value)
+    next if before == after
+    mismatches += 1
+    next unless mismatches <= 5
+    diff = (before.keys | after.keys).reject { |k| before[k] == after[k] }
+    warn "MISMATCH (#{label}) #{diff.map { |k| "#{k}: before=#{before[k].inspect} after=#{after[k].inspect}" }.join("; ")}"
+    warn "  #{value[0, 200]}"
+  end
+end
+
+puts "=" * 60
+puts "CPU Cores Parser Benchmark"
+puts "=" * 60
+puts "Compared:   #{values.size} generated (2-#{options[:max_cores]} cores), #{samples.size} sample, #{fuzz.size} fuzz values"
+puts "Mismatches: #{mismatches}"
+puts
+puts format("%6s %8s %12s %12s %8s", "cores", "bytes", "before us", "after us", "speedup")
+TIMED_CORE_COUNTS.select { |n| n <= options[:max_cores] }.each do |n|
+  set = [cpu_cores(rng, n, busy_first: false), cpu_cores(rng, n, busy_first: true)]
+  before_ns = measure(set, options[:seconds]) { |v| run(legacy, v) }
+  after_ns = measure(set, options[:seconds]) { |v| run(current, v) }
+  puts format("%6d %8d %12.1f %12.1f %7.1fx", n, set[0].bytesize, before_ns / 1000, after_ns / 1000, before_ns / after_ns)
+end
+exit(mismatches.zero? ? 0 : 1)
@@ -0,0 +1,213 @@
+#!/usr/bin/env ruby
+# Downsample Bench - what DT_DOWNSAMPLE and ZABBIX_DOWNSAMPLE send for the
+# corpus's gateway net and sys stats, against what they replace.
+#
+# The stats lines go through the shipped parsing, timestamp and normalization
+# stages, then the dynatrace-metrics MINT builders and the Zabbix JSON
+# builders. "dynatrace-downsample" and "zabbix-downsample" fold them with an
+# interval longer than the run; a final tick with the interval at zero
+# flushes them. Checks, any failure exits 1:
+#
+# - Dynatrace: per series (metric key + dimensions) min, max, sum and count
+#   equal those of the per-event lines (sums to 1e-9, the order of float
+#   additions differs), and counters sum their deltas. The flushed lines pass
+#   test-tools/validate-dynatrace-metrics.py --no-timestamp-check (skipped if
+#   python3 is missing; the corpus timestamps are not recent).
+# - Zabbix: per host and item key, every gauge's mean, _min and _max, every
+#   counter's sum and every cumulative value's last value match the
+#   per-event JSON.
+#
+# Usage:
+#   ../sample-logs/log_generator.py -n 50000 --type netstats > /tmp/stats.log
+#   ../sample-logs/log_generator.py -n 10000 --type sysstats >> /tmp/stats.log
+#   ./downsample-bench.rb /tmp/stats.log
+
+require "json"
+require "open3"
+require "optparse"
+require_relative "filter_snippet"
+require_relative "grok"
+
+ROOT = File.expand_path("../..", __dir__)
+CONFIGS = File.join(ROOT, "logstash-configs")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+VALIDATOR = File.join(ROOT, "test-tools/validate-dynatrace-metrics.py")
+DT_CONF = File.join(CONFIGS, "outputs/dynatrace-metrics/output.conf")
+ZABBIX_CONF = File.join(CONFIGS, "outputs/zabbix/output.conf")
+
+options = { seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: downsample-bench.rb [corpus.log ...] [--seconds N]"
+  opts.on("--seconds N", Float, "Minimum time for the timing (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path, encoding: "UTF-8").grep(/AviatrixGw(?:Net|Sys)Stats:/).map(&:chomp)
+end
+
+def snippet(conf, id)
+  FilterSnippet.load(File.join(CONFIGS, conf), id)
+end
+
+# The stages in front of the builders
+net_kv = snippet("filters/15-gateway-stats.conf", "gw_net_stats-kv")
+net_grok = Grok.load(File.join(CONFIGS, "filters/15-gateway-stats.conf"), "gw_net_stats")
+sys_grok = Grok.load(File.join(CONFIGS, "filters/15-gateway-stats.conf"), "gw_sys_stats")
+cpu_cores = snippet("filters/17-cpu-cores-parse.conf", "cpu-cores-parse")
+timestamp = snippet("filters/90-timestamp.conf", "date-to-timestamp")
+normalize = snippet("filters/94-net-stats-normalize.conf", "gw_net_stats-normalize")
+
+events = lines.filter_map do |line|
+  event = BenchEvent.new("message" => line, "@timestamp" => BenchTimestamp.new)
+  if line.include?("AviatrixGwNetStats:")
+    net_kv.call(event)
+    if event.get("[@metadata][grok_fallback]")
+      fields = net_grok.match(line) or next
+      fields.each { |k, v| event.set(k, v) }
+    end
+    event.tag("gw_net_stats")
+    timestamp.call(event)
+    normalize.call(event)
+  else
+    fields = sys_grok.match(line) or next
+    fields.each { |k, v| event.set(k, v) }
+    event.tag("gw_sys_stats")
+    cpu_cores.call(event) if event.get("cpu_cores")
+    timestamp.call(event)
+  end
+  event
+end
+if events.empty?
+  warn "Error: corpus has no gateway stats lines"
+  exit 1
+end
+
+ENV["ZABBIX_SERVER"] = "zabbix.invalid"
+ENV["DT_DOWNSAMPLE_INTERVAL"] = ENV["ZABBIX_DOWNSAMPLE_INTERVAL"] = "3600"
+dt_builders = [FilterSnippet.load(DT_CONF, "dynatrace-build-net-stats-mint"), FilterSnippet.load(DT_CONF, "dynatrace-build-sys-stats-mint")]
+zabbix_builders = [FilterSnippet.load(ZABBIX_CONF, "zabbix-build-net-stats-json"), FilterSnippet.load(ZABBIX_CONF, "zabbix-build-sys-stats-json")]
+built = events.map do |event|
+  tag = event.get("tags").include?("gw_net_stats") ? 0 : 1
+  dt_builders[tag].call(event)
+  zabbix_builders[tag].call(event)
+end
+
+def copy(events)
+  events.map { |e| BenchEvent.new(Marshal.load(Marshal.dump(e.data))) }
+end
+
+# Events after the downsampler, including a final flush
+def run(filter, events, tick)
+  out = []
+  events.each do |event|
+    filter.call(event) { |flushed| out << flushed }
+    out << event unless event.cancelled?
+  end
+  filter.instance_variable_set(:@interval, 0)
+  filter.call(BenchEvent.new("type" => tick)) { |flushed| out << flushed }
+  out
+end
+
+def number(s)
+  s.include?(".") || s.include?("e") ? Float(s) : Integer(s)
+end
+
+puts "=" * 60
+puts "Downsample Benchmark"
+puts "=" * 60
+puts "Corpus: #{events.size} gateway stats events (#{corpus.join(", ")})"
+puts
+
+failures = []
+
+# Dynatrace: reference series from the per-event lines
+dt_in = built.flat_map { |e| e.get("[@metadata][dynatrace_mint_payload]").to_s.split("\n") }
+reference = {}
+dt_in.each do |line|
+  head, _, ts = line.rpartition(" ")
+  series, _, value = head.rpartition(" ")
+  r = (reference[series] ||= { values: [], ts: ts, counter: value.start_with?("count,") })
+  r[:values] << number(value.split("=", 2).last.sub("gauge,", ""))
+  r[:ts] = ts
+end
+dt_out_events = run(FilterSnippet.load(DT_CONF, "dynatrace-downsample"), copy(built), "dt_batch_tick")
+dt_out = dt_out_events.flat_map { |e| e.get("[@metadata][dynatrace_mint_payload]").to_s.split("\n") }
+got = dt_out.to_h do |line|
+  head, _, ts = line.rpartition(" ")
+  series, _, value = head.rpartition(" ")
+  [series, [value.sub(/\A(?:gauge|count),/, "").split(",").to_h { |kv| kv.split("=", 2) }.transform_values { |n| number(n) }, ts]]
+end
+close = ->(a, b) { (a - b).abs <= 1e-9 * [a.abs, b.abs, 1].max }
+reference.each do |series, r|
+  v = r[:values]
+  expected = r[:counter] ? { "delta" => v.sum } : { "min" => v.min, "max" => v.max, "sum" => v.sum, "count" => v.size }
+  value, ts = got[series]
+  next if ts == r[:ts] && value.keys == expected.keys && expected.all? { |k, n| close.call(value[k], n) }
+  failures << "dynatrace #{series}: #{got[series].inspect}, expected #{[expected, r[:ts]].inspect}"
+end
+failures << "dynatrace: #{got.size} series flushed, #{reference.size} expected" unless got.size == reference.size
+
+validated = "skipped (no python3)"
+begin
+  output, status = Open3.capture2e("python3", VALIDATOR, "--no-timestamp-check", stdin_data: dt_out.join("\n") + "\n")
+  validated = status.success? ? "passed" : "FAILED"
+  failures << "validate-dynatrace-metrics.py:\n#{output.lines.last(5).join}" unless status.success?
+rescue Errno::ENOENT
+  nil
+end
+
+# Zabbix: reference values from the per-event JSON
+zb_reference = {}
+built.each do |e|
+  id = [e.get("[@metadata][zabbix_host]"), e.get("[@metadata][zabbix_key]")]
+  JSON.parse(e.get("[@metadata][zabbix_value]")).each { |k, v| ((zb_reference[id] ||= {})[k] ||= []) << v }
+end
+zb_out = run(FilterSnippet.load(ZABBIX_CONF, "zabbix-downsample"), copy(built), "zabbix_batch_tick")
+zb_out.each do |e|
+  id = [e.get("[@metadata][zabbix_host]"), e.get("[@metadata][zabbix_key]")]
+  value = JSON.parse(e.get("[@metadata][zabbix_value]"))
+  (zb_reference.delete(id) || {}).each do |k, vs|
+    expected = if k.end_with?("_limit_exceeded")
+      { k => vs.sum }
+    elsif k.end_with?("_cumulative")
+      { k => vs.last }
+    else
+      mean = vs.inject(:+).to_f / vs.size # the filter adds in arrival order
+      { k => vs.sum.is_a?(Integer) ? mean.round : mean.round(2), "#{k}_min" => vs.min, "#{k}_max" => vs.max }
+    end
+    next if expected.all? { |ek, ev| value[ek] == ev }
+    failures << "zabbix #{id.join(" ")} #{k}: #{value.slice(*expected.keys)}, expected #{expected}"
+  end
+end
+failures << "zabbix: #{zb_reference.size} items not flushed" unless zb_reference.empty?
+
+# Timing: the downsamplers alone
+timing = lambda do |conf, id|
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + options[:seconds] / 2
+  loop do
+    filter = FilterSnippet.load(conf, id)
+    batch = copy(built)
+    GC.start
+    t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+    batch.each { |e| filter.call(e) }
+    best = [best, (Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0).to_f / batch.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  best
+end
+
+puts format("%-28s %10s %10s %10s", "", "events", "lines", "ns/event")
+puts format("%-28s %10d %10d", "per event", built.size, dt_in.size)
+puts format("%-28s %10d %10d %10.0f", "dynatrace-downsample", dt_out_events.size, dt_out.size, timing.call(DT_CONF, "dynatrace-downsample"))
+puts format("%-28s %10d %10s %10.0f", "zabbix-downsample", zb_out.size, "-", timing.call(ZABBIX_CONF, "zabbix-downsample"))
+puts
+puts "MINT validation: #{validated}"
+failures.first(10).each { |f| warn "FAIL #{f}" }
+puts "Failures: #{failures.size}"
+exit(failures.empty? ? 0 : 1)
@@ -0,0 +1,278 @@
+#!/usr/bin/env ruby
+# Filter Profile - per-event cost of every ruby filter on the sample corpus.
+#
+# Each ruby { } filter is loaded from its .conf file through filter_snippet.rb
+# and run on the corpus lines that would reach it in a pipeline. Those inputs
+# are prepared once by running the shipped stages in front of it: the groks
+# (grok.rb) and the earlier ruby filters, 90-timestamp.conf included.
+# Reported per filter:
+#
+#   us/event      best time over repeated passes (fresh copies of the inputs
+#                 every pass, made outside the timed region)
+#   allocs/event  Ruby objects allocated per event over one pass
+#   errors        events whose code raised; Logstash would tag them
+#                 _rubyexception. Any error fails the run.
+#
+# --baseline REF loads the same filters from a git revision (git show) and
+# runs them on the same inputs, so a change to the init/code of a filter
+# shows up as a before/after column. Filters that do not exist at REF are
+# reported without a baseline.
+#
+# The mitm log builders are not profiled: their inputs come from the json,
+# date and mutate filters of 11-l7-dcf.conf.
+#
+# Usage:
+#   ./filter-profile.rb                                   # test-samples.log
+#   ../sample-logs/log_generator.py -n 20000 > /tmp/corpus.log
+#   ./filter-profile.rb /tmp/corpus.log --baseline HEAD~1 --only dynatrace
+
+require "optparse"
+require "open3"
+require_relative "filter_snippet"
+require_relative "grok"
+
+ROOT = File.expand_path("../..", __dir__)
+CONFIGS = File.join(ROOT, "logstash-configs")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+
+TIMESTAMP = [:ruby, "filters/90-timestamp.conf", "date-to-timestamp"].freeze
+
+# Shipped stages in front of the outputs, per [@metadata][log_type]:
+# [:ruby, conf, id], [:grok, conf, id, tags added] or :raw_rates
+# (the [@metadata] copies that --baseline revisions before
+# 94-net-stats-normalize.conf read).
+# A :fallback grok sits behind a key=value parser and only runs on the lines
+# the parser flagged.
+STAGES = {
+  "microseg" => [[:grok, "filters/10-microseg.conf", "microseg", %w[microseg ebpf]], TIMESTAMP],
+  "suricata" => [
+    [:ruby, "filters/12-suricata.conf", "suricata-precheck"],
+    [:grok, "filters/12-suricata.conf", "suricata", %w[suricata]],
+    [:ruby, "filters/12-suricata.conf", "suricata-process"],
+    TIMESTAMP
+  ],
+  "fqdn" => [
+    [:ruby, "filters/13-fqdn.conf", "fqdn-kv"],
+    [:grok, "filters/13-fqdn.conf", "fqdn", %w[fqdn], :fallback],
+    TIMESTAMP
+  ],
+  "cmd" => [
+    [:ruby, "filters/14-cmd.conf", "cmd-v1-kv"],
+    [:grok, "filters/14-cmd.conf", "cmd-v1", %w[cmd V1Api], :fallback],
+    TIMESTAMP
+  ],
+  "cmd_api" => [
+    [:ruby, "filters/14-cmd.conf", "cmd-v2-kv"],
+    [:grok, "filters/14-cmd.conf", "cmd-v2", %w[cmd V2.5API], :fallback],
+    TIMESTAMP
+  ],
+  "gw_net_stats" => [
+    [:ruby, "filters/15-gateway-stats.conf", "gw_net_stats-kv"],
+    [:grok, "filters/15-gateway-stats.conf", "gw_net_stats", %w[gw_net_stats], :fallback],
+    TIMESTAMP,
+    :raw_rates,
+    [:ruby, "filters/94-net-stats-normalize.conf", "gw_net_stats-normalize"]
+  ],
+  "gw_sys_stats" => [
+    [:grok, "filters/15-gateway-stats.conf", "gw_sys_stats", %w[gw_sys_stats]],
+    [:ruby, "filters/17-cpu-cores-parse.conf", "cpu-cores-parse"],
+    TIMESTAMP
+  ],
+  "tunnel_status" => [[:grok, "filters/16-tunnel-status.conf", "tunnel_status", %w[tunnel_status]], TIMESTAMP],
+  "vpn_session" => [[:grok, "filters/18-vpn-session.conf", "vpn-session", %w[vpn_session]], TIMESTAMP]
+}.freeze
+
+RAW_RATES = %w[total_rx_rate total_tx_rate total_rx_tx_rate total_rx_cum total_tx_cum total_rx_tx_cum].freeze
+
+# [conf, ruby filter id, log types, field or tag the filter is gated on].
+# A filter that is one of the STAGES gets the stages before it as its inputs;
+# any other filter gets all of them.
+PROFILES = [
+  ["filters/05-classify.conf", "classify-log-type", :all, nil],
+  ["filters/90-timestamp.conf", "date-to-timestamp", STAGES.keys, nil],
+  ["filters/10-microseg.conf", "microseg-session-enrichment", %w[microseg], "session_event"],
+  ["filters/12-suricata.conf", "suricata-precheck", %w[suricata], nil],
+  ["filters/12-suricata.conf", "suricata-process", %w[suricata], "suricata"],
+  ["filters/13-fqdn.conf", "fqdn-kv", %w[fqdn], nil],
+  ["filters/14-cmd.conf", "cmd-v1-kv", %w[cmd], nil],
+  ["filters/14-cmd.conf", "cmd-v2-kv", %w[cmd_api], nil],
+  ["filters/15-gateway-stats.conf", "gw_net_stats-kv", %w[gw_net_stats], nil],
+  ["filters/17-cpu-cores-parse.conf", "cpu-cores-parse", %w[gw_sys_stats], "cpu_cores"],
+  ["filters/94-net-stats-normalize.conf", "gw_net_stats-normalize", %w[gw_net_stats], "gw_net_stats"],
+  ["filters/96-sys-stats-hec.conf", "sys-stats-hec-payload", %w[gw_sys_stats], "gw_sys_stats"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-sys-stats-mint", %w[gw_sys_stats], "gw_sys_stats"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-net-stats-mint", %w[gw_net_stats], "gw_net_stats"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-tunnel-status-log", %w[tunnel_status], "tunnel_status"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-fqdn-log", %w[fqdn], "fqdn"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-cmd-log", %w[cmd cmd_api], "cmd"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-microseg-log", %w[microseg], "microseg"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-suricata-log", %w[suricata], "suricataDataJson"],
+  ["outputs/dynatrace/output.conf", "dynatrace-build-vpn-session-log", %w[vpn_session], "vpn_session"],
+  ["outputs/dynatrace-metrics/output.conf", "dynatrace-build-sys-stats-mint", %w[gw_sys_stats], "gw_sys_stats"],
+  ["outputs/dynatrace-metrics/output.conf", "dynatrace-build-net-stats-mint", %w[gw_net_stats], "gw_net_stats"],
+  ["outputs/dynatrace-logs/output.conf", "dynatrace-build-tunnel-status-log", %w[tunnel_status], "tunnel_status"],
+  ["outputs/dynatrace-logs/output.conf", "dynatrace-build-fqdn-log", %w[fqdn], "fqdn"],
+  ["outputs/dynatrace-logs/output.conf", "dynatrace-build-cmd-log", %w[cmd cmd_api], "cmd"],
+  ["outputs/dynatrace-logs/output.conf", "dynatrace-build-microseg-log", %w[microseg], "microseg"],
+  ["outputs/dynatrace-logs/output.conf", "dynatrace-build-suricata-log", %w[suricata], "suricataDataJson"],
+  ["outputs/zabbix/output.conf", "zabbix-build-sys-stats-json", %w[gw_sys_stats], "gw_sys_stats"],
+  ["outputs/zabbix/output.conf", "zabbix-build-net-stats-json", %w[gw_net_stats], "gw_net_stats"]
+].freeze
+
+def clock_ns
+  Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+end
+
+def run_stage(stage, event)
+  case stage
+  when :raw_rates
+    RAW_RATES.each { |f| event.set("[@metadata][raw_#{f}]", event.get(f)) if event.get(f) }
+  else
+    kind, conf, id, tags, fallback = stage
+    if kind == :ruby
+      snippet(File.join(CONFIGS, conf), id).call(event)
+    elsif !fallback || event.get("[@metadata][grok_fallback]")
+      fields = grok(File.join(CONFIGS, conf), id).match(event.get("message").to_s)
+      fields&.each { |field, value| event.set(field, value) }
+      tags.each { |t| event.tag(t) } if fields
+    end
+  end
+end
+
+def snippet(path, id)
+  (@snippets ||= {})[[path, id]] ||= FilterSnippet.load(path, id)
+end
+
+def grok(path, id)
+  (@groks ||= {})[[path, id]] ||= Grok.load(path, id)
+end
+
+# Events are plain hashes, strings and numbers (and BenchTimestamp)
+def copy(events)
+  events.map { |e| BenchEvent.new(Marshal.load(Marshal.dump(e.data))) }
+end
+
+def gated?(event, gate)
+  return true unless gate
+  tags = event.get("tags")
+  (tags && tags.include?(gate)) || !event.get(gate).nil?
+end
+
+# [best ns/event, allocations/event, errors] of a filter on these inputs
+def profile(filter, inputs, seconds)
+  errors = 0
+  # Warm up, so first-call work (lazy requires, caches) is not counted
+  copy(inputs.first(1)).each do |e|
+    filter.call(e)
+  rescue StandardError, ScriptError
+    nil
+  end
+  events = copy(inputs)
+  GC.start
+  allocated = GC.stat(:total_allocated_objects)
+  events.each do |e|
+    filter.call(e)
+  rescue StandardError, ScriptError
+    errors += 1
+  end
+  allocs = (GC.stat(:total_allocated_objects) - allocated).to_f / inputs.size
+
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + seconds
+  loop do
+    events = copy(inputs)
+    t0 = clock_ns
+    events.each do |e|
+      filter.call(e)
+    rescue StandardError, ScriptError
+      nil
+    end
+    best = [best, (clock_ns - t0).to_f / inputs.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  [best, allocs, errors]
+end
+
+def baseline_filter(ref, conf, id)
+  text, status = Open3.capture2("git", "-C", ROOT, "show", "#{ref}:logstash-configs/#{conf}", err: File::NULL)
+  return nil unless status.success?
+  FilterSnippet.parse(text.force_encoding("UTF-8"), id, "#{ref}:#{conf}")
+rescue ArgumentError
+  nil
+end
+
+options = { seconds: 0.5 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: filter-profile.rb [corpus.log ...] [--seconds N] [--only REGEX] [--baseline REF]"
+  opts.on("--seconds N", Float, "Minimum timing per filter and variant (default: 0.5)") { |v| options[:seconds] = v }
+  opts.on("--only REGEX", "Profile only filters whose conf/id matches") { |v| options[:only] = Regexp.new(v) }
+  opts.on("--baseline REF", "Also run the filters as of this git revision") { |v| options[:baseline] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path, encoding: "UTF-8").map(&:chomp).reject { |l| l.empty? || l.start_with?("#") }
+end
+
+classifier = snippet(File.join(CONFIGS, "filters/05-classify.conf"), "classify-log-type")
+by_type = Hash.new { |h, k| h[k] = [] }
+lines.each do |l|
+  event = classifier.call(BenchEvent.new("type" => "syslog", "message" => l))
+  by_type[event.get("[@metadata][log_type]")] << l
+end
+
+# Inputs of a filter: run the stages in front of it, keep what reaches it
+inputs_for = lambda do |conf, id, log_types, gate|
+  return lines.map { |l| BenchEvent.new("type" => "syslog", "message" => l) } if log_types == :all
+  log_types.flat_map do |log_type|
+    stages = STAGES.fetch(log_type)
+    at = stages.index { |s| s.is_a?(Array) && s[1] == conf && s[2] == id }
+    stages = stages.first(at) if at
+    by_type[log_type].filter_map do |l|
+      event = classifier.call(BenchEvent.new("type" => "syslog", "message" => l))
+      stages.each do |stage|
+        run_stage(stage, event)
+        break if event.cancelled?
+      end
+      event unless event.cancelled? || !gated?(event, gate)
+    end
+  end
+end
+
+puts "=" * 60
+puts "Filter Profile"
+puts "=" * 60
+puts "Corpus: #{lines.size} lines (#{corpus.join(", ")})"
+puts "Baseline: #{options[:baseline]}" if options[:baseline]
+puts
+header = format("%-52s %7s %9s %9s %6s", "filter", "events", "us/event", "allocs/ev", "errors")
+header += format(" %9s %9s %8s", "base us", "base allc", "speedup") if options[:baseline]
+puts header
+
+failed = false
+PROFILES.each do |conf, id, log_types, gate|
+  name = "#{conf.sub(%r{/output\.conf\z}, "").sub(%r{\A(filters|outputs)/}, "")}/#{id}"
+  next if options[:only] && !options[:only].match?("#{conf}/#{id}")
+
+  inputs = inputs_for.call(conf, id, log_types, gate)
+  next puts(format("%-52s %7d   (not in corpus)", name, 0)) if inputs.empty?
+
+  ns, allocs, errors = profile(snippet(File.join(CONFIGS, conf), id), inputs, options[:seconds])
+  failed ||= errors.positive?
+  row = format("%-52s %7d %9.2f %9.1f %6d", name, inputs.size, ns / 1000.0, allocs, errors)
+  if options[:baseline]
+    base = baseline_filter(options[:baseline], conf, id)
+    if base
+      base_ns, base_allocs, = profile(base, inputs, options[:seconds])
+      row += format(" %9.2f %9.1f %7.2fx", base_ns / 1000.0, base_allocs, base_ns / ns)
+    else
+      row += "   (not at #{options[:baseline]})"
+    end
+  end
+  puts row
+end
+exit(failed ? 1 : 0)
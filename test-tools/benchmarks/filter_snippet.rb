@@ -0,0 +1,146 @@
+# Load a ruby { } filter from a Logstash config file and run it outside Logstash.
+#
+# The init/code strings are read from the .conf file itself, so benchmarks
+# always measure the code that ships. Event is a minimal stand-in for
+# LogStash::Event that supports the field references our filters use
+# ("field", "[a][b]", "[@metadata][x]"), BenchTimestamp stands in for
+# LogStash::Timestamp and BenchLogger for the plugin logger.
+
+# Logstash loads json before any filter, so code may call to_json without
+# requiring it
+require "json"
+
+class BenchEvent
+  attr_reader :data
+
+  def initialize(data = {})
+    @data = data
+    @cancelled = false
+  end
+
+  def get(ref)
+    return @data[ref] unless ref.getbyte(0) == 91  # "["
+    path = self.class.path(ref)
+    if path.size == 2
+      node = @data[path[0]]
+      return node.is_a?(Hash) ? node[path[1]] : nil
+    end
+    path.reduce(@data) { |node, key| node.is_a?(Hash) ? node[key] : nil }
+  end
+
+  def set(ref, value)
+    *parents, leaf = self.class.path(ref)
+    node = parents.reduce(@data) { |n, key| n[key] ||= {} }
+    node[leaf] = value
+  end
+
+  def remove(ref)
+    *parents, leaf = self.class.path(ref)
+    node = parents.reduce(@data) { |n, key| n.is_a?(Hash) ? n[key] : nil }
+    node.delete(leaf) if node.is_a?(Hash)
+  end
+
+  def tag(name)
+    tags = (@data["tags"] ||= [])
+    tags << name unless tags.include?(name)
+  end
+
+  def cancel
+    @cancelled = true
+  end
+
+  def cancelled?
+    @cancelled
+  end
+
+  # Copy of the fields without [@metadata], as LogStash::Event#to_hash
+  def to_hash
+    @data.each_with_object({}) { |(k, v), h| h[k] = v.dup unless k == "@metadata" }
+  end
+
+  PATH_CACHE = {}
+
+  def self.path(ref)
+    PATH_CACHE[ref] ||= (ref.start_with?("[") ? ref.scan(/\[([^\]]+)\]/).flatten : [ref]).freeze
+  end
+end
+
+# Stand-in for LogStash::Timestamp
+class BenchTimestamp
+  def initialize(time = Time.now)
+    @time = time.utc
+  end
+
+  def to_i
+    @time.to_i
+  end
+
+  def to_f
+    @time.to_f
+  end
+
+  def to_iso8601
+    @time.strftime("%Y-%m-%dT%H:%M:%S.%LZ")
+  end
+end
+
+# Filters create events and timestamps with LogStash::Event.new(fields) and
+# LogStash::Timestamp.new(time)
+module LogStash
+  Event = BenchEvent unless const_defined?(:Event)
+  Timestamp = BenchTimestamp unless const_defined?(:Timestamp)
+end
+
+# Stand-in for the plugin logger: logger.info("message", :key => value)
+class BenchLogger
+  attr_reader :lines
+
+  def initialize
+    @lines = []
+  end
+
+  %i[debug info warn error].each do |level|
+    define_method(level) { |message, data = {}| @lines << [level, message, data] }
+  end
+end
+
+class FilterSnippet
+  attr_reader :id
+
+  # Find the ruby filter with the given id in a .conf file
+  def self.load(conf_path, id)
+    parse(File.read(conf_path, encoding: "UTF-8"), id, conf_path)
+  end
+
+  # Same, from the text of a .conf file (init/code in single or double quotes)
+  def self.parse(text, id, origin = "config")
+    start = text.index(/id\s*=>\s*"#{Regexp.escape(id)}"/) or raise ArgumentError, "no ruby filter #{id} in #{origin}"
+    plugin = text[0...start][/(\w+)\s*\{[^{}]*\z/, 1]
+    raise ArgumentError, "#{id} in #{origin} is a #{plugin} filter, not ruby" unless plugin == "ruby"
+    init = text[start..][/\A.*?^\s*init\s*=>\s*(['"])(.*?)\1\s*$/m, 2]
+    code = text[start..][/\A.*?^\s*code\s*=>\s*(['"])(.*?)\1\s*$/m, 2] or raise ArgumentError, "ruby filter #{id} has no code"
+    # Only take init if it belongs to this filter (appears before its code)
+    init = nil if init && text.index(init, start) > text.index(code, start)
+    new(id, init, code)
+  end
+
+  def initialize(id, init, code)
+    @id = id
+    @logger = BenchLogger.new
+    instance_eval(init, "(#{id} init)") if init
+    @code = instance_eval("lambda { |event, &new_event_block| #{code}\n}", "(#{id} code)")
+  end
+
+  def logger
+    @logger
+  end
+
+  def call(event, &block)
+    @code.call(event, &block)
+    event
+  end
+
+  # LogStash::Plugin#close, which an init block's close override calls via super
+  def close
+  end
+end
@@ -0,0 +1,88 @@
+# Compile the grok filters in our .conf files to Ruby regexes.
+#
+# Onigmo (Ruby) and Joni (Logstash grok) are both Oniguruma ports with the
+# same backtracking engine, so the compiled patterns match the same text, make
+# the same captures, and do comparable work per line. Patterns are expanded
+# from the logstash-patterns-core definitions we use plus patterns/avx.conf.
+# IP is IPv4 only here; no sample corpus carries IPv6 addresses.
+
+class Grok
+  CORE_PATTERNS = {
+    "INT" => "(?:[+-]?(?:[0-9]+))",
+    "BASE10NUM" => "(?<![0-9.+-])(?>[+-]?(?:(?:[0-9]+(?:\\.[0-9]+)?)|(?:\\.[0-9]+)))",
+    "NUMBER" => "(?:%{BASE10NUM})",
+    "WORD" => "\\b\\w+\\b",
+    "NOTSPACE" => "\\S+",
+    "SPACE" => "\\s*",
+    "DATA" => ".*?",
+    "GREEDYDATA" => ".*",
+    "IPV4" => "(?<![0-9])(?:(?:[0-1]?[0-9]{1,2}|2[0-4][0-9]|25[0-5])[.](?:[0-1]?[0-9]{1,2}|2[0-4][0-9]|25[0-5])[.](?:[0-1]?[0-9]{1,2}|2[0-4][0-9]|25[0-5])[.](?:[0-1]?[0-9]{1,2}|2[0-4][0-9]|25[0-5]))(?![0-9])",
+    "IP" => "(?:%{IPV4})",
+    "UUID" => "[A-Fa-f0-9]{8}-(?:[A-Fa-f0-9]{4}-){3}[A-Fa-f0-9]{12}",
+    "CISCOMAC" => "(?:(?:[A-Fa-f0-9]{4}\\.){2}[A-Fa-f0-9]{4})",
+    "WINDOWSMAC" => "(?:(?:[A-Fa-f0-9]{2}-){5}[A-Fa-f0-9]{2})",
+    "COMMONMAC" => "(?:(?:[A-Fa-f0-9]{2}:){5}[A-Fa-f0-9]{2})",
+    "MAC" => "(?:%{CISCOMAC}|%{WINDOWSMAC}|%{COMMONMAC})",
+    "HOSTNAME" => "\\b(?:[0-9A-Za-z][0-9A-Za-z-]{0,62})(?:\\.(?:[0-9A-Za-z][0-9A-Za-z-]{0,62}))*(\\.?|\\b)",
+    "MONTH" => "\\b(?:[Jj]an(?:uary|uar)?|[Ff]eb(?:ruary|ruar)?|[Mm](?:a|ä)?r(?:ch|z)?|[Aa]pr(?:il)?|[Mm]a(?:y|i)?|[Jj]un(?:e|i)?|[Jj]ul(?:y)?|[Aa]ug(?:ust)?|[Ss]ep(?:tember)?|[Oo](?:c|k)?t(?:ober)?|[Nn]ov(?:ember)?|[Dd]e(?:c|z)(?:ember)?)\\b",
+    "MONTHNUM" => "(?:0?[1-9]|1[0-2])",
+    "MONTHDAY" => "(?:(?:0[1-9])|(?:[12][0-9])|(?:3[01])|[1-9])",
+    "YEAR" => "(?>\\d\\d){1,2}",
+    "HOUR" => "(?:2[0123]|[01]?[0-9])",
+    "MINUTE" => "(?:[0-5][0-9])",
+    "SECOND" => "(?:(?:[0-5]?[0-9]|60)(?:[:.,][0-9]+)?)",
+    "TIME" => "(?!<[0-9])%{HOUR}:%{MINUTE}(?::%{SECOND})(?![0-9])",
+    "ISO8601_TIMEZONE" => "(?:Z|[+-]%{HOUR}(?::?%{MINUTE}))",
+    "TIMESTAMP_ISO8601" => "%{YEAR}-%{MONTHNUM}-%{MONTHDAY}[T ]%{HOUR}:?%{MINUTE}(?::?%{SECOND})?%{ISO8601_TIMEZONE}?"
+  }.freeze
+
+  ROOT = File.expand_path("../..", __dir__)
+  PATTERNS_DIR = File.join(ROOT, "logstash-configs/patterns")
+
+  def self.patterns
+    @patterns ||= Dir[File.join(PATTERNS_DIR, "*")].sort.each_with_object(CORE_PATTERNS.dup) do |path, table|
+      File.foreach(path) do |line|
+        name, definition = line.strip.split(/\s+/, 2)
+        next if name.nil? || name.start_with?("#") || definition.nil?
+        table[name] = definition
+      end
+    end
+  end
+
+  # The match => { "message" => [...] } list of the grok filter with this id
+  def self.load(conf_path, id)
+    text = File.read(conf_path, encoding: "UTF-8")
+    start = text.index(/id\s*=>\s*"#{Regexp.escape(id)}"/) or raise ArgumentError, "no grok #{id} in #{conf_path}"
+    list = text[start..][/"message"\s*=>\s*\[(.*?)\n\s*\]/m, 1] or raise ArgumentError, "grok #{id} has no message list"
+    sources = list.lines.map(&:strip).reject { |l| l.empty? || l.start_with?("#") }.map { |l| l.sub(/,\z/, "")[1..-2] }
+    new(id, sources)
+  end
+
+  attr_reader :id, :regexes
+
+  def initialize(id, sources)
+    @id = id
+    @regexes = sources.map { |s| Regexp.new(expand(s)) }
+  end
+
+  # break_on_match: the first pattern that matches sets its non-empty captures
+  def match(message)
+    @regexes.each do |re|
+      m = re.match(message) or next
+      return m.named_captures.reject { |_k, v| v.nil? || v.empty? }
+    end
+    nil
+  end
+
+  private
+
+  def expand(source, depth = 0)
+    raise ArgumentError, "grok pattern nests too deep: #{source}" if depth > 20
+    source.gsub(/%\{(\w+)(?::(\w+))?\}/) do
+      name, field = $1, $2
+      body = self.class.patterns.fetch(name) { raise ArgumentError, "unknown grok pattern #{name}" }
+      body = expand(body, depth + 1)
+      field ? "(?<#{field}>#{body})" : "(?:#{body})"
+    end
+  end
+end
@@ -0,0 +1,126 @@
+#!/usr/bin/env ruby
+# KV Parse Bench - per-event parse cost of the net stats, FQDN and CMD filters.
+#
+# Before: each log type was parsed by its grok alone (15-gateway-stats.conf
+# "gw_net_stats", 13-fqdn.conf "fqdn", 14-cmd.conf "cmd-v1" and "cmd-v2").
+# After: a key=value / delimiter parser runs first, and the grok only sees the
+# lines it did not accept that still contain every literal the grok requires.
+#
+# The groks are compiled from the shipped .conf files by grok.rb and the
+# parsers are loaded through filter_snippet.rb. Each line is parsed both ways
+# on fresh events; the resulting fields and tags must be identical, otherwise
+# the run fails. Lines routed by 05-classify.conf decide which filter applies.
+#
+# Usage:
+#   ./kv-parse-bench.rb                                   # test-samples.log
+#   ../sample-logs/log_generator.py -n 200000 > /tmp/corpus.log
+#   ./kv-parse-bench.rb /tmp/corpus.log --seconds 3
+
+require "optparse"
+require_relative "filter_snippet"
+require_relative "grok"
+
+ROOT = File.expand_path("../..", __dir__)
+FILTERS = File.join(ROOT, "logstash-configs/filters")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+
+# [log_type, conf, grok id, parser id, tags the filter adds]
+TARGETS = [
+  ["gw_net_stats", "15-gateway-stats.conf", "gw_net_stats", "gw_net_stats-kv", ["gw_net_stats"]],
+  ["fqdn", "13-fqdn.conf", "fqdn", "fqdn-kv", ["fqdn"]],
+  ["cmd", "14-cmd.conf", "cmd-v1", "cmd-v1-kv", ["cmd", "V1Api"]],
+  ["cmd_api", "14-cmd.conf", "cmd-v2", "cmd-v2-kv", ["cmd", "V2.5API"]]
+].freeze
+
+def grok_filter(grok, tags, event)
+  fields = grok.match(event.get("message")) or return event
+  fields.each { |field, value| event.set(field, value) }
+  tags.each { |t| event.tag(t) }
+  event
+end
+
+# The shipped order: parser, then the grok only if the parser flagged the line
+def fast_filter(parser, grok, tags, event)
+  parser.call(event)
+  return event unless event.get("[@metadata][grok_fallback]")
+  grok_filter(grok, tags, event)
+end
+
+# Best ns/event over repeated passes lasting at least `seconds` in total
+def measure(lines, seconds)
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + seconds
+  loop do
+    t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+    lines.each { |l| yield BenchEvent.new("message" => l) }
+    elapsed = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0
+    best = [best, elapsed.to_f / lines.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  best
+end
+
+options = { seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: kv-parse-bench.rb [corpus.log ...] [--seconds N]"
+  opts.on("--seconds N", Float, "Minimum time per variant and log type (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path).map(&:chomp).reject { |l| l.empty? || l.start_with?("#") }
+end
+
+classifier = FilterSnippet.load(File.join(FILTERS, "05-classify.conf"), "classify-log-type")
+by_type = lines.group_by do |l|
+  classifier.call(BenchEvent.new("type" => "syslog", "message" => l)).get("[@metadata][log_type]")
+end
+if TARGETS.none? { |log_type, *| by_type[log_type] }
+  warn "Error: corpus has no net stats, FQDN or CMD lines"
+  exit 1
+end
+
+puts "=" * 60
+puts "KV Parse Benchmark"
+puts "=" * 60
+puts "Corpus: #{lines.size} lines (#{corpus.join(", ")})"
+puts
+puts format("%-13s %7s %10s %10s %8s %9s %10s", "log_type", "lines", "grok ns", "kv ns", "speedup", "fallback", "mismatch")
+
+failed = false
+TARGETS.each do |log_type, conf, grok_id, parser_id, tags|
+  sample = by_type[log_type]
+  next puts(format("%-13s %7d   (not in corpus)", log_type, 0)) unless sample
+
+  path = File.join(FILTERS, conf)
+  grok = Grok.load(path, grok_id)
+  parser = FilterSnippet.load(path, parser_id)
+
+  # Differential check: identical fields and tags on every line
+  fallbacks = 0
+  mismatches = 0
+  sample.each do |line|
+    before = grok_filter(grok, tags, BenchEvent.new("message" => line)).data
+    probe = parser.call(BenchEvent.new("message" => line))
+    fallbacks += 1 if probe.get("[@metadata][grok_fallback]")
+    after = fast_filter(parser, grok, tags, BenchEvent.new("message" => line)).data
+    after.delete("@metadata")
+    next if before == after
+    mismatches += 1
+    next unless mismatches <= 5
+    diff = (before.keys | after.keys).reject { |k| before[k] == after[k] }
+    warn "MISMATCH #{log_type} #{diff.map { |k| "#{k}: grok=#{before[k].inspect} kv=#{after[k].inspect}" }.join("; ")}"
+    warn "  #{line[0, 200]}"
+  end
+  failed ||= mismatches.positive?
+
+  grok_ns = measure(sample, options[:seconds]) { |e| grok_filter(grok, tags, e) }
+  fast_ns = measure(sample, options[:seconds]) { |e| fast_filter(parser, grok, tags, e) }
+  puts format("%-13s %7d %10.0f %10.0f %7.2fx %9d %10d",
+              log_type, sample.size, grok_ns, fast_ns, grok_ns / fast_ns, fallbacks, mismatches)
+end
+exit(failed ? 1 : 0)
@@ -0,0 +1,186 @@
+#!/usr/bin/env ruby
+# Microseg Aggregate Bench - how many microseg events 92-microseg-aggregate.conf
+# folds into session records, and what it costs per event.
+#
+# The corpus's microseg lines go through the shipped grok, legacy defaults,
+# session enrichment and timestamp stages, then through "microseg-aggregate"
+# with a window longer than the run; a final tick with the window at zero
+# sends what is still open. Three checks, any failure exits 1:
+#
+# - Records: with room for every flow, the records match a plain reference
+#   (group by the same keys, close a session on its end event) in key, event
+#   count, packets, bytes, duration and first/last seen.
+# - Eviction: with --max-flows, every event is still in exactly one record
+#   (the event counts add up) and no more flows were open than allowed.
+# - Restart: closing the filter halfway (open flows saved to the state file)
+#   and loading a new one gives the same records as one uninterrupted run.
+#
+# Usage:
+#   ../sample-logs/log_generator.py -n 200000 --type microseg > /tmp/microseg.log
+#   ./microseg-aggregate-bench.rb /tmp/microseg.log --max-flows 5000
+
+require "optparse"
+require "tmpdir"
+require_relative "filter_snippet"
+require_relative "grok"
+
+ROOT = File.expand_path("../..", __dir__)
+MICROSEG_CONF = File.join(ROOT, "logstash-configs/filters/10-microseg.conf")
+AGGREGATE_CONF = File.join(ROOT, "logstash-configs/filters/92-microseg-aggregate.conf")
+TIMESTAMP_CONF = File.join(ROOT, "logstash-configs/filters/90-timestamp.conf")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+
+FLOW_KEY = %w[gw_hostname src_ip src_port dst_ip dst_port proto uuid].freeze
+LEGACY_DEFAULTS = { "src_ip" => "unknown", "dst_ip" => "unknown", "uuid" => "legacy-format", "enforced" => "unknown" }.freeze
+TICK = { "type" => "microseg_agg_tick" }.freeze
+
+options = { max_flows: 1000, seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: microseg-aggregate-bench.rb [corpus.log ...] [--max-flows N] [--seconds N]"
+  opts.on("--max-flows N", Integer, "MICROSEG_AGG_MAX_FLOWS for the eviction check (default: 1000)") { |v| options[:max_flows] = v }
+  opts.on("--seconds N", Float, "Minimum time for the timing (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path, encoding: "UTF-8").select { |l| l.include?("AviatrixGwMicrosegPacket") }.map(&:chomp)
+end
+
+# The stages in front of the aggregator
+grok = Grok.load(MICROSEG_CONF, "microseg")
+enrich = FilterSnippet.load(MICROSEG_CONF, "microseg-session-enrichment")
+timestamp = FilterSnippet.load(TIMESTAMP_CONF, "date-to-timestamp")
+events = lines.filter_map do |line|
+  fields = grok.match(line) or next
+  event = BenchEvent.new(fields.merge("message" => line, "@timestamp" => BenchTimestamp.new, "tags" => %w[microseg ebpf]))
+  LEGACY_DEFAULTS.each { |k, v| event.set(k, v) } unless event.get("src_ip")
+  enrich.call(event) if event.get("session_event")
+  timestamp.call(event)
+end
+if events.empty?
+  warn "Error: corpus has no microseg lines"
+  exit 1
+end
+
+def aggregator(max_flows, state_path = "")
+  ENV["MICROSEG_AGG_WINDOW"] = "3600"
+  ENV["MICROSEG_AGG_MAX_FLOWS"] = max_flows.to_s
+  ENV["MICROSEG_AGG_STATE_PATH"] = state_path
+  FilterSnippet.load(AGGREGATE_CONF, "microseg-aggregate")
+end
+
+def copy(events)
+  events.map { |e| BenchEvent.new(Marshal.load(Marshal.dump(e.data))) }
+end
+
+# Records and forwarded events from feeding events and, with flush, a final tick
+def feed(filter, events, out = [], flush: true)
+  events.each do |event|
+    filter.call(event) { |record| out << record }
+    out << event unless event.cancelled?
+  end
+  if flush
+    filter.instance_variable_set(:@window, 0)
+    filter.call(BenchEvent.new(TICK.dup)) { |record| out << record }
+  end
+  out
+end
+
+def summary(event)
+  [event.get("gw_hostname"), event.get("session_id") || FLOW_KEY.map { |f| event.get(f) }.join("|"),
+   event.get("event_count"), event.get("session_pkt_cnt"), event.get("session_byte_cnt"),
+   event.get("session_dur"), event.get("first_seen"), event.get("last_seen")]
+end
+
+# Group by the same keys with unlimited memory; a session closes on its end event
+def reference(events)
+  iso = ->(t) { Time.at(t).utc.strftime("%Y-%m-%dT%H:%M:%S.%LZ") }
+  open = {}
+  done = []
+  close = lambda do |group|
+    last = group.reverse.find { |e| e.get("session_event").to_i != 0 } || group.first
+    times = group.map { |e| e.get("@timestamp").to_f }
+    span = ((times.max - times.min) * 1_000_000_000).round
+    done << [last.get("gw_hostname"), last.get("session_id") || FLOW_KEY.map { |f| last.get(f) }.join("|"),
+             group.size, [last.get("session_pkt_cnt").to_i, group.size].max,
+             [last.get("session_byte_cnt").to_i, group.sum { |e| e.get("ip_size").to_i }].max,
+             [last.get("session_dur").to_i, span].max, iso.call(times.min), iso.call(times.max)]
+  end
+  events.each do |e|
+    next if e.get("uuid") == "legacy-format"
+    sid = e.get("session_id")
+    key = sid ? "#{e.get("gw_hostname")}|#{sid}" : FLOW_KEY.map { |f| e.get(f) }.join("|")
+    (open[key] ||= []) << e
+    close.call(open.delete(key)) if sid && e.get("session_event").to_i != 0
+  end
+  open.each_value(&close)
+  done
+end
+
+puts "=" * 60
+puts "Microseg Aggregate Benchmark"
+puts "=" * 60
+puts "Corpus: #{events.size} microseg events (#{corpus.join(", ")})"
+puts
+
+failures = []
+
+# Records
+out = feed(aggregator(events.size + 1), copy(events))
+records = out.select { |e| e.get("tags").include?("microseg_aggregated") }
+passed = out.size - records.size
+expected = reference(events)
+unless records.map { |r| summary(r) }.sort_by(&:inspect) == expected.sort_by(&:inspect)
+  failures << "records differ from the reference (#{records.size} vs #{expected.size})"
+end
+
+# Eviction
+limited = aggregator(options[:max_flows])
+evicted_out = feed(limited, copy(events))
+folded = evicted_out.sum { |e| e.get("event_count") || 1 }
+failures << "eviction: #{folded} events in records, expected #{events.size}" unless folded == events.size
+evicted = limited.instance_variable_get(:@counts)[:evicted]
+
+# Restart
+Dir.mktmpdir do |dir|
+  state = File.join(dir, "microseg-aggregate.json")
+  half = events.size / 2
+  first = aggregator(events.size + 1, state)
+  restarted = feed(first, copy(events[0...half]), flush: false)
+  first.close
+  second = aggregator(events.size + 1, state)
+  feed(second, copy(events[half..]), restarted)
+  restored = restarted.select { |e| e.get("tags").include?("microseg_aggregated") }.map { |r| summary(r) }
+  failures << "restart: records differ from one uninterrupted run" unless restored.sort_by(&:inspect) == records.map { |r| summary(r) }.sort_by(&:inspect)
+end
+
+# Timing: the aggregator alone, flows opened and closed as in the corpus
+best = Float::INFINITY
+deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + options[:seconds]
+loop do
+  filter = aggregator(events.size + 1)
+  batch = copy(events)
+  GC.start
+  t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+  batch.each { |e| filter.call(e) { |_record| nil } }
+  elapsed = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0
+  best = [best, elapsed.to_f / batch.size].min
+  break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+end
+
+sessions = records.count { |r| r.get("session_id") }
+puts format("%-30s %10d", "events in", events.size)
+puts format("%-30s %10d", "session records", sessions)
+puts format("%-30s %10d", "first-packet flow records", records.size - sessions)
+puts format("%-30s %10d", "forwarded as is (legacy)", passed)
+puts format("%-30s %9.1f%%", "reduction", 100.0 * (1 - out.size.to_f / events.size))
+puts format("%-30s %10d", "evicted (--max-flows #{options[:max_flows]})", evicted)
+puts format("%-30s %10.0f", "ns/event", best)
+puts
+failures.each { |f| warn "FAIL #{f}" }
+puts "Failures: #{failures.size}"
+exit(failures.empty? ? 0 : 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env ruby
+# Net Stats Normalize Bench - the units 94-net-stats-normalize.conf reads from
+# AviatrixGwNetStats, and its cost per event.
+#
+# The gateway logs rates with a lowercase "b" and cumulative counters with an
+# uppercase "B" (every net stats line of test-samples.log does). The filter
+# reads "b" as bits with SI prefixes and "B" as bytes with binary prefixes; a
+# fixed table pins the values that gives. For every net stats line in the
+# corpus (after the shipped key=value parser):
+#
+# - a rate ends in "b" or has no unit, and a counter ends in "B", so no line
+#   falls outside the rule above
+# - total_*_rate keeps the integer before the decimal point, as the mutate
+#   convert it replaced set it ("54.07Kb" -> 54), and total_*_cum the string
+# - total_*_rate_bits is 8 x total_*_rate_bytes (to their rounding), and
+#   every typed field is set
+#
+# Any failure exits 1.
+#
+# Usage:
+#   ./net-stats-normalize-bench.rb                        # test-samples.log
+#   ../sample-logs/log_generator.py -n 50000 --type netstats > /tmp/stats.log
+#   ./net-stats-normalize-bench.rb /tmp/stats.log --seconds 3
+
+require "optparse"
+require_relative "filter_snippet"
+require_relative "grok"
+
+ROOT = File.expand_path("../..", __dir__)
+CONFIGS = File.join(ROOT, "logstash-configs")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+
+RATES = %w[total_rx_rate total_tx_rate total_rx_tx_rate].freeze
+COUNTERS = %w[total_rx_cum total_tx_cum total_rx_tx_cum].freeze
+
+# [field, logged value, typed field, expected value]
+FIXTURES = [
+  ["total_rx_rate", "54.07Kb", "total_rx_rate_bits", 54_070.0],
+  ["total_rx_rate", "54.07Kb", "total_rx_rate_bytes", 6_758.75],
+  ["total_tx_rate", "126.78Kb", "total_tx_rate_bytes", 15_847.5],
+  ["total_tx_rate", "1.5Mb", "total_tx_rate_bits", 1_500_000.0],
+  ["total_rx_tx_rate", "3.73", "total_rx_tx_rate_bits", 3.73],
+  ["total_rx_tx_rate", "8b", "total_rx_tx_rate_bytes", 1.0],
+  ["total_rx_cum", "2.49GB", "total_rx_cum_bytes", 2_673_617_142],
+  ["total_tx_cum", "510.30MB", "total_tx_cum_bytes", 535_088_333],
+  ["total_rx_tx_cum", "13.45KB", "total_rx_tx_cum_bytes", 13_773],
+  ["total_rx_tx_cum", "4096", "total_rx_tx_cum_bytes", 4_096]
+].freeze
+
+options = { seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: net-stats-normalize-bench.rb [corpus.log ...] [--seconds N]"
+  opts.on("--seconds N", Float, "Minimum time for the timing (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path, encoding: "UTF-8").grep(/AviatrixGwNetStats:/).map(&:chomp)
+end
+if lines.empty?
+  warn "Error: no AviatrixGwNetStats lines in #{corpus.join(", ")}"
+  exit 1
+end
+
+kv = FilterSnippet.load(File.join(CONFIGS, "filters/15-gateway-stats.conf"), "gw_net_stats-kv")
+grok = Grok.load(File.join(CONFIGS, "filters/15-gateway-stats.conf"), "gw_net_stats")
+normalize = FilterSnippet.load(File.join(CONFIGS, "filters/94-net-stats-normalize.conf"), "gw_net_stats-normalize")
+
+# Top-level fields are all the filter sets
+def copy(event)
+  BenchEvent.new(event.data.dup)
+end
+
+failures = []
+
+FIXTURES.each do |field, raw, typed, expected|
+  value = normalize.call(BenchEvent.new(field => raw)).get(typed)
+  failures << "fixture #{field}=#{raw}: #{typed} #{value.inspect}, expected #{expected}" unless value == expected
+end
+
+events = lines.map do |line|
+  event = BenchEvent.new("message" => line, "tags" => ["gw_net_stats"])
+  kv.call(event)
+  (grok.match(line) || {}).each { |k, v| event.set(k, v) } if event.get("[@metadata][grok_fallback]")
+  event
+end
+events.each do |event|
+  raw = (RATES + COUNTERS).to_h { |f| [f, event.get(f)] }
+  if raw.values.any?(nil)
+    failures << "not parsed: #{event.get("message")[0, 120]}"
+    next
+  end
+  RATES.each { |f| failures << "rate #{f}=#{raw[f]} is not in bits" unless raw[f].match?(/\d[KMGT]?b\z|\d\z/) }
+  COUNTERS.each { |f| failures << "counter #{f}=#{raw[f]} is not in bytes" unless raw[f].match?(/\d[KMGT]?B\z|\d\z/) }
+
+  out = normalize.call(copy(event))
+  RATES.each do |f|
+    legacy, bits, bytes = out.get(f), out.get("#{f}_bits"), out.get("#{f}_bytes")
+    failures << "#{f}=#{raw[f]}: legacy #{legacy.inspect}, expected #{raw[f].to_i}" unless legacy == raw[f].to_i
+    failures << "#{f}=#{raw[f]}: bits #{bits.inspect} vs bytes #{bytes.inspect}" unless bits && bytes && (bits / 8 - bytes).abs < 0.006
+  end
+  COUNTERS.each do |f|
+    failures << "#{f}=#{raw[f]}: changed to #{out.get(f).inspect}" unless out.get(f) == raw[f]
+    failures << "#{f}=#{raw[f]}: #{f}_bytes not set" unless out.get("#{f}_bytes").is_a?(Integer)
+  end
+end
+
+failures.first(10).each { |f| warn "FAIL #{f}" }
+
+iterations = 0
+started = Process.clock_gettime(Process::CLOCK_MONOTONIC)
+elapsed = 0.0
+while elapsed < options[:seconds]
+  events.each { |e| normalize.call(copy(e)) }
+  iterations += events.size
+  elapsed = Process.clock_gettime(Process::CLOCK_MONOTONIC) - started
+end
+
+puts "Net stats lines: #{events.size}, fixtures: #{FIXTURES.size}"
+puts format("gw_net_stats-normalize: %.0f ns/event", elapsed * 1e9 / iterations)
+puts "Failures: #{failures.size}"
+exit(failures.empty? ? 0 : 1)
@@ -0,0 +1,180 @@
+#!/usr/bin/env ruby
+# Sampling Bench - 06-sampling.conf under a flood from one gateway.
+#
+# The corpus is replayed at --eps events per second of simulated time with
+# --flood-share of the events replaced by one gateway's copies of a microseg
+# and an FQDN line, so that gateway goes far over SAMPLING_RATE while the
+# others stay under it. The filter reads a simulated clock (Time.now is
+# replaced in this script only). Checks, any failure exits 1:
+#
+# - Exempt tags (suricata, cmd) are all kept, without sample_weight.
+# - Gateways under the limit are all kept with sample_weight 1.
+# - Per gateway and log type, sum(sample_weight) is within SAMPLING_KEEP_ONE_IN
+#   of the events sent, so SIEM counts scale back.
+# - The summaries' events_shed add up to the events dropped.
+#
+# Usage:
+#   ../sample-logs/log_generator.py -n 200000 > /tmp/corpus.log
+#   ./sampling-bench.rb /tmp/corpus.log --eps 20000 --flood-share 0.5
+
+require "optparse"
+require_relative "filter_snippet"
+
+ROOT = File.expand_path("../..", __dir__)
+CLASSIFY_CONF = File.join(ROOT, "logstash-configs/filters/05-classify.conf")
+SAMPLING_CONF = File.join(ROOT, "logstash-configs/filters/06-sampling.conf")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+FLOOD_GATEWAY = "GW-flood-spoke-10.9.9.9"
+FLOOD_LINES = [
+  "<158>Oct 17 22:04:03 #{FLOOD_GATEWAY}-sink /usr/local/bin/avx-gw-state-sync 2026/10/17 22:04:03 " \
+  "AviatrixGwMicrosegPacket: POLICY=05786098-4ba2-4afc-afd9-0b40e79d1105 SRC_MAC=02:bc:62:30:f1:d8 " \
+  "DST_MAC=02:03:74:11:9b:23 IP_SZ=60 SRC_IP=10.9.1.1 DST_IP=10.9.2.2 PROTO=TCP SRC_PORT=40000 " \
+  "DST_PORT=443 DATA=0x ACT=DENY ENFORCED=true",
+  "<14>Oct 17 22:04:03 #{FLOOD_GATEWAY} avx-nfq: AviatrixFQDNRule2[CRIT]nfq_ssl_handle_client_hello() " \
+  "L#291 Gateway=flood-spoke SIP=10.9.1.1 FQDN=bad.example.com DIP=10.9.2.2 Rule=*.example.com;1 State=NO_MATCH drop_reason=NOT_WHITELISTED"
+].freeze
+
+# Simulated clock for the filter
+module SimulatedClock
+  @now = 1_700_000_000.0
+  class << self
+    attr_accessor :now
+  end
+
+  def now
+    Time.at(SimulatedClock.now)
+  end
+end
+Time.singleton_class.prepend(SimulatedClock)
+
+options = { eps: 5000.0, flood_share: 0.5, rate: 200, one_in: 10, seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: sampling-bench.rb [corpus.log ...] [--eps N] [--flood-share F] [--rate N] [--one-in N]"
+  opts.on("--eps N", Float, "Simulated events per second (default: 5000)") { |v| options[:eps] = v }
+  opts.on("--flood-share F", Float, "Share of events from the flooding gateway (default: 0.5)") { |v| options[:flood_share] = v }
+  opts.on("--rate N", Integer, "SAMPLING_RATE (default: 200)") { |v| options[:rate] = v }
+  opts.on("--one-in N", Integer, "SAMPLING_KEEP_ONE_IN (default: 10)") { |v| options[:one_in] = v }
+  opts.on("--seconds N", Float, "Minimum time for the timing (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+lines = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path, encoding: "UTF-8").reject { |l| l.start_with?("#") || l.strip.empty? }.map(&:chomp)
+end
+if lines.empty?
+  warn "Error: corpus is empty"
+  exit 1
+end
+
+# Interleave the flood; the same seed gives the same run
+rng = Random.new(1)
+stream = lines.flat_map do |line|
+  flood = []
+  flood << FLOOD_LINES[rng.rand(FLOOD_LINES.size)] while rng.rand < options[:flood_share]
+  flood << line
+end
+
+classify = FilterSnippet.load(CLASSIFY_CONF, "classify-log-type")
+events = stream.map { |line| classify.call(BenchEvent.new("type" => "syslog", "message" => line)) }
+
+ENV["SAMPLING_RATE"] = options[:rate].to_s
+ENV["SAMPLING_KEEP_ONE_IN"] = options[:one_in].to_s
+ENV["SAMPLING_REPORT_INTERVAL"] = "10"
+ENV.delete("SAMPLING_BURST")
+ENV.delete("SAMPLING_EXEMPT")
+
+# [events kept, summaries] after replaying the stream on the simulated clock
+def replay(filter, events, eps)
+  kept = []
+  summaries = []
+  tick = lambda do
+    filter.call(BenchEvent.new("type" => "sampling_tick")) { |s| summaries << s }
+  end
+  next_tick = SimulatedClock.now + 1
+  events.each do |event|
+    SimulatedClock.now += 1.0 / eps
+    if SimulatedClock.now >= next_tick
+      tick.call
+      next_tick += 1
+    end
+    filter.call(event)
+    kept << event unless event.cancelled?
+  end
+  SimulatedClock.now += 60
+  tick.call
+  [kept, summaries]
+end
+
+def copy(events)
+  events.map { |e| BenchEvent.new(Marshal.load(Marshal.dump(e.data))) }
+end
+
+filter = FilterSnippet.load(SAMPLING_CONF, "sampling")
+host_re = filter.instance_variable_get(:@host_re)
+key = ->(e) { [e.get("message")[host_re, 1] || "unknown", e.get("[@metadata][log_type]")] }
+sent = copy(events)
+kept, summaries = replay(filter, sent, options[:eps])
+
+puts "=" * 60
+puts "Sampling Benchmark"
+puts "=" * 60
+puts format("Corpus: %d events (%s), %.0f%% from %s, %.0f events/s simulated",
+            events.size, corpus.join(", "), 100.0 * (events.size - lines.size) / events.size, FLOOD_GATEWAY, options[:eps])
+puts format("SAMPLING_RATE=%d, SAMPLING_KEEP_ONE_IN=%d", options[:rate], options[:one_in])
+puts
+
+failures = []
+typed = sent.select { |e| e.get("[@metadata][log_type]") }
+exempt = typed.select { |e| %w[suricata cmd cmd_api].include?(e.get("[@metadata][log_type]")) }
+failures << "exempt events dropped or weighted" unless exempt.none? { |e| e.cancelled? || e.get("sample_weight") }
+
+by_key = typed.reject { |e| exempt.include?(e) }.group_by(&key)
+puts format("%-40s %-14s %9s %9s %11s", "gateway", "log_type", "sent", "kept", "sum(weight)")
+by_key.sort_by { |_k, es| -es.size }.first(8).each do |(gateway, log_type), es|
+  kept_es = es.reject(&:cancelled?)
+  weights = kept_es.sum { |e| e.get("sample_weight").to_i }
+  puts format("%-40s %-14s %9d %9d %11d", gateway, log_type, es.size, kept_es.size, weights)
+end
+by_key.each do |(gateway, log_type), es|
+  weights = es.reject(&:cancelled?).sum { |e| e.get("sample_weight").to_i }
+  failures << "#{gateway} #{log_type}: sum(weight) #{weights} for #{es.size} events" if (weights - es.size).abs >= options[:one_in]
+  if gateway != FLOOD_GATEWAY && es.any? { |e| e.cancelled? || e.get("sample_weight") != 1 }
+    failures << "#{gateway} #{log_type}: sampled although under the limit"
+  end
+end
+shed = sent.count(&:cancelled?)
+reported = summaries.sum { |s| s.get("events_shed") }
+failures << "summaries report #{reported} shed, #{shed} dropped" unless reported == shed
+
+# Timing: the filter on events of a gateway under its limit, and on the flood
+timing = lambda do |evs|
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + options[:seconds] / 2
+  loop do
+    f = FilterSnippet.load(SAMPLING_CONF, "sampling")
+    batch = copy(evs)
+    GC.start
+    t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+    batch.each { |e| f.call(e) }
+    best = [best, (Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0).to_f / batch.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  best
+end
+under = typed.reject { |e| key.call(e)[0] == FLOOD_GATEWAY }.first(20_000)
+flood = typed.select { |e| key.call(e)[0] == FLOOD_GATEWAY }.first(20_000)
+
+puts
+puts format("%-30s %10d", "events shed", shed)
+puts format("%-30s %10d", "summary events", summaries.size)
+puts format("%-30s %9.1f%%", "reduction", 100.0 * shed / events.size)
+puts format("%-30s %10.0f", "ns/event (under limit)", timing.call(under)) unless under.empty?
+puts format("%-30s %10.0f", "ns/event (flood)", timing.call(flood)) unless flood.empty?
+puts
+failures.first(10).each { |f| warn "FAIL #{f}" }
+puts "Failures: #{failures.size}"
+exit(failures.empty? ? 0 : 1)
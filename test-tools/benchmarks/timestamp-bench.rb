@@ -0,0 +1,166 @@
+#!/usr/bin/env ruby
+# Timestamp Bench - per-event cost of turning the grok's date field into
+# @timestamp and unix_time.
+#
+# Before: 90-timestamp.conf ran a date filter with four patterns in order
+# (ISO8601, "yyyy-MM-dd HH:mm:ss.SSSSSS", "MMM  d HH:mm:ss", "MMM dd
+# HH:mm:ss"), each failed pattern raising inside the parser, then a second
+# ruby filter for unix_time. The reference below does the same with
+# strict DateTime.strptime, taking the current year for syslog dates and the
+# previous year for a December date seen in January.
+# After: the single "date-to-timestamp" ruby filter picks the format from the
+# first byte and caches the result per date string.
+#
+# Every date in the corpus goes through both; @timestamp (to the
+# millisecond), unix_time and the _dateparsefailure tag must match. A fixed
+# table of dates around New Year checks the year the filter picks. "Cache
+# hits" counts the events whose date repeats the one before, which the cache
+# answers whatever its size.
+#
+# Usage:
+#   ./timestamp-bench.rb                                  # test-samples.log
+#   ../sample-logs/log_generator.py -n 200000 > /tmp/corpus.log
+#   ./timestamp-bench.rb /tmp/corpus.log --seconds 3
+
+require "optparse"
+require "date"
+require "time"
+require_relative "filter_snippet"
+
+ROOT = File.expand_path("../..", __dir__)
+TIMESTAMP_CONF = File.join(ROOT, "logstash-configs/filters/90-timestamp.conf")
+DEFAULT_CORPUS = File.join(ROOT, "test-tools/sample-logs/test-samples.log")
+
+# SYSLOG_TIMESTAMP after the <pri>, as the groks capture it into date
+DATE_RE = /\A<\d+>(\d{4}-\d\d-\d\d[T ][\d:.,]+(?:Z|[+-]\d\d:?\d\d)?|[A-Z][a-z]{2} +\d{1,2} \d\d:\d\d:\d\d)/
+
+# DateTime.strptime rejects out-of-range days, as the date filter does
+def strict(text, format)
+  DateTime.strptime(text, format).to_time.utc
+end
+
+LEGACY_FORMATS = [
+  ->(date, _now) { Time.iso8601(date) },
+  ->(date, _now) { strict(date, "%Y-%m-%d %H:%M:%S.%N") },
+  lambda do |date, now|
+    year = now.month == 1 && date.start_with?("Dec") ? now.year - 1 : now.year
+    strict("#{year} #{date}", "%Y %b %e %H:%M:%S")
+  end,
+  lambda do |date, now|
+    year = now.month == 1 && date.start_with?("Dec") ? now.year - 1 : now.year
+    strict("#{year} #{date}", "%Y %b %d %H:%M:%S")
+  end
+].freeze
+
+# date filter + add-unix-time, as before
+def legacy(event)
+  date = event.get("date")
+  if date
+    now = Time.now.utc
+    time = nil
+    LEGACY_FORMATS.each do |format|
+      time = format.call(date, now)
+      break
+    rescue ArgumentError
+      next
+    end
+    if time
+      event.set("@timestamp", BenchTimestamp.new(Time.at(time.to_r.floor(3)).utc))
+      event.remove("date")
+    else
+      event.tag("_dateparsefailure")
+    end
+  end
+  event.set("unix_time", event.get("@timestamp").to_i)
+  event
+end
+
+def new_event(date)
+  BenchEvent.new("date" => date, "@timestamp" => BenchTimestamp.new(Time.at(0)))
+end
+
+def measure(dates, seconds)
+  best = Float::INFINITY
+  deadline = Process.clock_gettime(Process::CLOCK_MONOTONIC) + seconds
+  loop do
+    events = dates.map { |d| new_event(d) }
+    t0 = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond)
+    events.each { |e| yield e }
+    elapsed = Process.clock_gettime(Process::CLOCK_MONOTONIC, :nanosecond) - t0
+    best = [best, elapsed.to_f / dates.size].min
+    break if Process.clock_gettime(Process::CLOCK_MONOTONIC) > deadline
+  end
+  best
+end
+
+options = { seconds: 2.0 }
+OptionParser.new do |opts|
+  opts.banner = "Usage: timestamp-bench.rb [corpus.log ...] [--seconds N]"
+  opts.on("--seconds N", Float, "Minimum time per variant (default: 2)") { |v| options[:seconds] = v }
+end.parse!
+
+corpus = ARGV.empty? ? [DEFAULT_CORPUS] : ARGV
+dates = corpus.flat_map do |path|
+  unless File.exist?(path)
+    warn "Error: corpus not found: #{path}"
+    exit 1
+  end
+  File.foreach(path, encoding: "UTF-8").filter_map { |l| l[DATE_RE, 1] }
+end
+if dates.empty?
+  warn "Error: corpus has no syslog headers"
+  exit 1
+end
+dates += ["Feb 30 10:00:00", "2026-13-01T00:00:00", "yesterday"]
+
+filter = FilterSnippet.load(TIMESTAMP_CONF, "date-to-timestamp")
+
+puts "=" * 60
+puts "Timestamp Benchmark"
+puts "=" * 60
+puts "Corpus: #{dates.size} dates (#{corpus.join(", ")})"
+puts
+
+# Differential check
+mismatches = 0
+dates.uniq.each do |date|
+  before = legacy(new_event(date))
+  after = filter.call(new_event(date))
+  same = before.get("unix_time") == after.get("unix_time") &&
+         before.get("@timestamp").to_f.round(3) == after.get("@timestamp").to_f.round(3) &&
+         before.get("tags") == after.get("tags") && before.get("date") == after.get("date")
+  next if same
+  mismatches += 1
+  warn "MISMATCH #{date.inspect}: date filter=#{before.get("@timestamp").to_iso8601} #{before.get("tags").inspect} " \
+       "ruby=#{after.get("@timestamp").to_iso8601} #{after.get("tags").inspect}" if mismatches <= 5
+end
+
+# Year for syslog dates: [date, now, expected year]
+parse = filter.instance_variable_get(:@parse)
+rollover = [
+  ["Dec 31 23:59:59", "2026-01-01T00:00:05Z", 2025],
+  ["Jan  1 00:00:02", "2025-12-31T23:59:58Z", 2026],
+  ["Jan 20 12:00:00", "2026-01-01T00:00:05Z", 2026],
+  ["Jul  1 12:00:00", "2026-01-01T00:00:05Z", 2025],
+  ["Mar  9 22:55:19", "2026-03-09T22:55:20Z", 2026],
+  ["Mar  4 22:55:19", "2026-10-17T08:00:00Z", 2026],
+  ["Feb 29 12:00:00", "2028-02-29T12:00:01Z", 2028]
+].reject do |date, now, year|
+  time = parse.call(date, Time.iso8601(now).to_i)
+  next true if time && time.year == year
+  warn "ROLLOVER #{date.inspect} at #{now}: expected #{year}, got #{time&.year.inspect}"
+  false
+end
+
+distinct = dates.each_with_index.count { |d, i| i.zero? || d != dates[i - 1] }
+legacy_ns = measure(dates, options[:seconds]) { |e| legacy(e) }
+fast_ns = measure(dates, options[:seconds]) { |e| filter.call(e) }
+
+puts format("%-26s %10s", "variant", "ns/event")
+puts format("%-26s %10.0f", "date filter + unix_time", legacy_ns)
+puts format("%-26s %10.0f", "date-to-timestamp", fast_ns)
+puts
+puts format("Speedup: %.2fx", legacy_ns / fast_ns)
+puts format("Cache hits: %.1f%%", 100.0 * (dates.size - distinct) / dates.size)
+puts "Mismatches: #{mismatches}, rollover failures: #{rollover.size}"
+exit(mismatches.zero? && rollover.empty? ? 0 : 1)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Pipeline Profiler - per-plugin cost of a running Logstash, from its node stats.
+
+Polls http://localhost:9600/_node/stats/pipelines during a load run and
+reports, for every filter and output id of the connector configs, the events
+in and out, the microseconds per event and its share of the pipeline workers'
+time, ranked from the most expensive. The counters are cumulative, so the
+report covers only the time between the first and the last poll.
+
+The report can be saved as a baseline and a later run compared against it:
+any plugin whose us/event rose by more than --threshold percent fails the
+run (exit 1), so the cost of a config change is reviewed before it ships.
+
+Usage:
+    ./pipeline-profiler.py --duration 60                    # poll for 60s, then report
+    ./pipeline-profiler.py --idle-stop 10                   # stop 10s after events stop
+    ./pipeline-profiler.py --idle-stop 10 --save-baseline baseline.json
+    ./pipeline-profiler.py --idle-stop 10 --baseline baseline.json --threshold 20
+    ./pipeline-profiler.py --from before.json after.json    # two saved API responses
+"""
+
+import argparse
+import json
+import re
+import signal
+import sys
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_URL = "http://localhost:9600"
+STATS_PATH = "/_node/stats/pipelines"
+BASELINE_VERSION = 1
+
+# Ids Logstash generates for plugins without an `id` (they change with the config)
+GENERATED_ID_RE = re.compile(r"^(?:[0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$")
+
+
+def fetch(url: str) -> dict:
+    try:
+        with urllib.request.urlopen(url + STATS_PATH, timeout=10) as resp:
+            return json.load(resp)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        sys.exit(f"Error: cannot read {url}{STATS_PATH}: {e}")
+
+
+def load_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: cannot read {path}: {e}")
+
+
+def counters(stats: dict) -> dict:
+    """{pipeline: {"ephemeral_id", "in", "out", "duration_ms", "plugins": {id: {...}}}} of one snapshot."""
+    out = {}
+    for name, pipeline in (stats.get("pipelines") or {}).items():
+        events = pipeline.get("events") or {}
+        plugins = {}
+        for kind in ("filters", "outputs"):
+            for plugin in (pipeline.get("plugins") or {}).get(kind) or []:
+                pe = plugin.get("events") or {}
+                plugins[plugin["id"]] = {
+                    "name": plugin.get("name", "?"),
+                    "kind": kind[:-1],
+                    "in": pe.get("in", 0),
+                    "out": pe.get("out", 0),
+                    "duration_ms": pe.get("duration_in_millis", 0),
+                }
+        out[name] = {
+            "ephemeral_id": pipeline.get("ephemeral_id"),
+            "in": events.get("in", 0),
+            "out": events.get("out", 0),
+            "duration_ms": events.get("duration_in_millis", 0),
+            "plugins": plugins,
+        }
+    return out
+
+
+def delta(first: dict, last: dict) -> tuple[dict, list[str]]:
+    """Counters of `last` minus `first`, and the pipelines reloaded in between.
+
+    A reloaded pipeline (new ephemeral_id) restarts its counters at zero, so
+    its last snapshot is taken whole.
+    """
+    reloaded = []
+    result = {}
+    for name, now in last.items():
+        before = first.get(name)
+        if before is None or before["ephemeral_id"] != now["ephemeral_id"]:
+            if before is not None:
+                reloaded.append(name)
+            before = {"in": 0, "out": 0, "duration_ms": 0, "plugins": {}}
+        plugins = {}
+        for pid, p in now["plugins"].items():
+            b = before["plugins"].get(pid, {})
+            plugins[pid] = dict(p, **{k: p[k] - b.get(k, 0) for k in ("in", "out", "duration_ms")})
+        result[name] = dict(now, **{k: now[k] - before[k] for k in ("in", "out", "duration_ms")}, plugins=plugins)
+    return result, reloaded
+
+
+def poll(url: str, interval: float, duration: float, idle_stop: float) -> tuple[dict, dict, float]:
+    """(first, last, seconds) snapshots of a polling run; Ctrl-C ends it early."""
+    stopping = []
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+    first = counters(fetch(url))
+    last = first
+    started = time.monotonic()
+    last_change = started
+    print(f"Polling {url}{STATS_PATH} every {interval:g}s"
+          + (f" for {duration:g}s" if duration else "")
+          + (f", stopping {idle_stop:g}s after events stop" if idle_stop else "")
+          + " (Ctrl-C to stop)", file=sys.stderr)
+    while not stopping:
+        time.sleep(interval)
+        if stopping:
+            break
+        now = counters(fetch(url))
+        events_in = sum(p["in"] for p in delta(last, now)[0].values())
+        if events_in:
+            last_change = time.monotonic()
+        elapsed = time.monotonic() - started
+        total = sum(p["in"] for p in delta(first, now)[0].values())
+        print(f"  {elapsed:7.0f}s  {events_in / interval:10.0f} events/s  {total:12d} events", file=sys.stderr)
+        last = now
+        if duration and elapsed >= duration:
+            break
+        if idle_stop and total and time.monotonic() - last_change >= idle_stop:
+            break
+    return first, last, time.monotonic() - started
+
+
+def profile(window: dict) -> tuple[list[dict], float]:
+    """Rows ranked by worker time, and the total worker time in ms.
+
+    Worker time is the pipelines' events.duration_in_millis: filters, outputs
+    and the conditionals between them. What the plugins do not account for is
+    reported as one "(conditionals, queue, other)" row per pipeline.
+    """
+    total = sum(p["duration_ms"] for p in window.values())
+    rows = []
+    for name, pipeline in window.items():
+        plugin_ms = 0
+        for pid, p in pipeline["plugins"].items():
+            plugin_ms += p["duration_ms"]
+            rows.append({
+                "pipeline": name,
+                "id": pid,
+                "name": p["name"],
+                "kind": p["kind"],
+                "in": p["in"],
+                "out": p["out"],
+                "duration_ms": p["duration_ms"],
+                "us_per_event": 1000.0 * p["duration_ms"] / p["in"] if p["in"] else 0.0,
+                "share": 100.0 * p["duration_ms"] / total if total else 0.0,
+                "generated_id": bool(GENERATED_ID_RE.match(pid)),
+            })
+        other = max(pipeline["duration_ms"] - plugin_ms, 0)
+        if pipeline["in"]:
+            rows.append({
+                "pipeline": name, "id": "(conditionals, queue, other)", "name": "", "kind": "",
+                "in": pipeline["in"], "out": pipeline["out"], "duration_ms": other,
+                "us_per_event": 1000.0 * other / pipeline["in"],
+                "share": 100.0 * other / total if total else 0.0,
+                "generated_id": False, "overhead": True,
+            })
+    rows.sort(key=lambda r: (-r["duration_ms"], r["pipeline"], r["id"]))
+    return rows, total
+
+
+def short(pid: str) -> str:
+    return pid[:12] + "..." if GENERATED_ID_RE.match(pid) else pid
+
+
+def print_report(rows: list[dict], window: dict, total_ms: float, seconds: float, top: int):
+    events = sum(p["in"] for p in window.values() if p["in"])
+    multi = len(window) > 1
+    print()
+    print("=" * 60)
+    print("Pipeline Profile")
+    print("=" * 60)
+    for name, p in sorted(window.items()):
+        rate = f", {p['in'] / seconds:.0f} events/s" if seconds else ""
+        print(f"{name}: {p['in']} events in, {p['out']} out{rate}, "
+              f"{1000.0 * p['duration_ms'] / p['in'] if p['in'] else 0:.1f} us/event of worker time")
+    print()
+    width = max([len(short(r["id"])) + (len(r["pipeline"]) + 1 if multi else 0) for r in rows[:top]] + [20])
+    print(f"{'plugin id':<{width}} {'plugin':<14} {'in':>11} {'out':>11} {'us/event':>9} {'share':>7}")
+    for r in rows[:top]:
+        pid = f"{r['pipeline']}/{short(r['id'])}" if multi else short(r["id"])
+        name = f"{r['kind']} {r['name']}".strip()
+        print(f"{pid:<{width}} {name:<14.14} {r['in']:>11d} {r['out']:>11d} {r['us_per_event']:>9.2f} {r['share']:>6.1f}%")
+    if len(rows) > top:
+        rest = rows[top:]
+        print(f"{'(' + str(len(rest)) + ' more)':<{width}} {'':<14} {'':>11} {'':>11} {'':>9} "
+              f"{sum(r['share'] for r in rest):>6.1f}%")
+    if not events:
+        print("\nNo events passed through the pipelines while polling.")
+    generated = sorted({r["id"] for r in rows if r["generated_id"]})
+    if generated:
+        print(f"\nNote: {len(generated)} plugin(s) have no `id`; their generated ids change with the "
+              f"config, so the baseline check skips them: {', '.join(short(g) for g in generated[:5])}")
+
+
+def baseline_of(rows: list[dict], window: dict, source: str) -> dict:
+    return {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source": source,
+        "events": sum(p["in"] for p in window.values()),
+        "plugins": {
+            f"{r['pipeline']}/{r['id']}": {k: r[k] for k in ("name", "kind", "in", "out", "us_per_event", "share")}
+            for r in rows if not r["generated_id"] and not r.get("overhead")
+        },
+    }
+
+
+def compare(rows: list[dict], baseline: dict, threshold: float, min_us: float, min_events: int) -> list[str]:
+    """Regression messages; prints the comparison."""
+    if baseline.get("version") != BASELINE_VERSION:
+        sys.exit(f"Error: baseline version {baseline.get('version')}, expected {BASELINE_VERSION}")
+    base = baseline.get("plugins") or {}
+    current = {f"{r['pipeline']}/{r['id']}": r for r in rows if not r["generated_id"] and not r.get("overhead")}
+    regressions = []
+    print()
+    print(f"Baseline: {baseline.get('created', '?')}, {baseline.get('events', 0)} events "
+          f"(threshold +{threshold:g}%, ignoring changes under {min_us:g} us or under {min_events} events)")
+    print(f"{'plugin id':<40} {'baseline':>9} {'now':>9} {'change':>8}")
+    for key in sorted(set(base) | set(current), key=lambda k: -(current.get(k) or {}).get("us_per_event", 0)):
+        b, r = base.get(key), current.get(key)
+        if b is None:
+            print(f"{key:<40} {'-':>9} {r['us_per_event']:>9.2f} {'new':>8}")
+            continue
+        if r is None:
+            print(f"{key:<40} {b['us_per_event']:>9.2f} {'-':>9} {'removed':>8}")
+            continue
+        if b["in"] < min_events or r["in"] < min_events:
+            continue
+        change = 100.0 * (r["us_per_event"] - b["us_per_event"]) / b["us_per_event"] if b["us_per_event"] else 0.0
+        regressed = change > threshold and r["us_per_event"] - b["us_per_event"] >= min_us
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<40} {b['us_per_event']:>9.2f} {r['us_per_event']:>9.2f} {change:>+7.1f}%{flag}")
+        if regressed:
+            regressions.append(f"{key}: {b['us_per_event']:.2f} -> {r['us_per_event']:.2f} us/event ({change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-plugin cost of a running Logstash from _node/stats/pipelines, with a baseline regression gate")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"Logstash API (default: {DEFAULT_URL})")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls (default: 5)")
+    parser.add_argument("--duration", type=float, default=0.0, help="Stop after N seconds (default: Ctrl-C)")
+    parser.add_argument("--idle-stop", type=float, default=0.0,
+                        help="Stop once no events have come in for N seconds, after the first events")
+    parser.add_argument("--from", dest="snapshots", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="Profile two saved _node/stats/pipelines responses instead of polling")
+    parser.add_argument("--pipeline", action="append", help="Only this pipeline (repeatable; default: all)")
+    parser.add_argument("--top", type=int, default=25, help="Rows in the report (default: 25)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the profile as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against a saved baseline; regressions exit 1")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Percent rise in us/event that counts as a regression (default: 20)")
+    parser.add_argument("--min-us", type=float, default=0.5,
+                        help="Ignore rises smaller than N us/event (default: 0.5)")
+    parser.add_argument("--min-events", type=int, default=1000,
+                        help="Only compare plugins with at least N events in both runs (default: 1000)")
+    args = parser.parse_args()
+
+    if args.snapshots:
+        first, last = (counters(load_json(path)) for path in args.snapshots)
+        seconds = 0.0
+        source = " ".join(args.snapshots)
+    else:
+        first, last, seconds = poll(args.url.rstrip("/"), args.interval, args.duration, args.idle_stop)
+        source = args.url
+    if args.pipeline:
+        missing = set(args.pipeline) - set(last)
+        if missing:
+            sys.exit(f"Error: no pipeline {', '.join(sorted(missing))} (have: {', '.join(sorted(last))})")
+        last = {k: v for k, v in last.items() if k in args.pipeline}
+
+    window, reloaded = delta(first, last)
+    rows, total_ms = profile(window)
+    print_report(rows, window, total_ms, seconds, args.top)
+    if reloaded:
+        print(f"\nNote: pipeline(s) {', '.join(reloaded)} reloaded during the run; "
+              "their numbers cover only the time since the reload.")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline_of(rows, window, source), f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(rows, load_json(args.baseline), args.threshold, args.min_us, args.min_events)
+        print()
+        sys.stdout.flush()
+        for r in regressions:
+            print(f"FAIL {r}", file=sys.stderr)
+        print(f"Regressions: {len(regressions)}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Capture replay - time-faithful replay of plain or gzip'd syslog captures.
+
+Lines are read lazily (mmap for plain files, streaming decompression for .gz),
+so multi-gigabyte captures replay in constant memory. Each line's original
+syslog timestamp sets its send time: the inter-arrival gaps of the capture are
+kept, divided by the speed factor, so a burst in the capture is a burst on the
+wire. speed=0 sends as fast as possible while keeping the capture order.
+
+Recognised timestamps (with or without a leading <PRI>):
+    RFC 3164   Mar  4 22:54:34               (year inferred, Dec -> Jan rolls over)
+    RFC 5424   2026-03-04T22:58:43.573005+00:00
+
+Lines without a recognisable timestamp are sent with the previous line's time.
+
+Used by stream-logs.py:
+    ./stream-logs.py --source replay --file capture.log.gz --speed 10
+"""
+
+import calendar
+import gzip
+import mmap
+import re
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+MONTHS = {m.encode(): i for i, m in enumerate(calendar.month_abbr) if m}
+
+TIMESTAMP_RE = re.compile(
+    rb"^(?:<\d{1,3}>)?(?:"
+    rb"(?P<iso>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?)"
+    rb"|(?P<mon>[A-Z][a-z]{2}) +(?P<day>\d{1,2}) (?P<hms>\d\d:\d\d:\d\d))"
+)
+
+# Sleep only when the next line is due this far in the future; nearer lines
+# are sent immediately so that bursts stay back-to-back.
+MIN_SLEEP = 0.0005
+
+# Timestamp parse cache (most consecutive lines share a second)
+TS_CACHE_SIZE = 4096
+
+
+def iter_capture_lines(path: Path):
+    """Yield each non-empty line of a plain or gzip'd capture as bytes, without the newline."""
+    path = Path(path)
+    with open(path, "rb") as fh:
+        gzipped = fh.read(2) == b"\x1f\x8b"
+    if gzipped:
+        with gzip.open(path, "rb") as fh:
+            for line in fh:
+                line = line.rstrip(b"\r\n")
+                if line:
+                    yield line
+        return
+
+    with open(path, "rb") as fh:
+        if path.stat().st_size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            pos, end = 0, len(mm)
+            while pos < end:
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    nl = end
+                line = mm[pos:nl].rstrip(b"\r")
+                pos = nl + 1
+                if line:
+                    yield line
+
+
+class TimestampParser:
+    """Parse capture timestamps to epoch seconds, inferring the year for RFC 3164."""
+
+    def __init__(self, year: int = None):
+        self.year = year or time.gmtime().tm_year
+        self.last_month = None
+        self.cache = {}
+
+    def parse(self, line: bytes):
+        m = TIMESTAMP_RE.match(line)
+        if not m:
+            return None
+        iso = m.group("iso")
+        if iso:
+            ts = self.cache.get(iso)
+            if ts is None:
+                text = iso.decode().replace("Z", "+00:00")
+                dt = datetime.fromisoformat(text)
+                ts = dt.timestamp() if dt.tzinfo else calendar.timegm(dt.timetuple()) + dt.microsecond / 1e6
+                self._remember(iso, ts)
+            return ts
+
+        month = MONTHS.get(m.group("mon"))
+        if month is None:
+            return None
+        if self.last_month == 12 and month == 1:
+            self.year += 1
+            self.cache.clear()
+        self.last_month = month
+        key = m.group(0)
+        ts = self.cache.get(key)
+        if ts is None:
+            hh, mm_, ss = (int(x) for x in m.group("hms").split(b":"))
+            ts = float(calendar.timegm((self.year, month, int(m.group("day")), hh, mm_, ss)))
+            self._remember(key, ts)
+        return ts
+
+    def _remember(self, key, ts):
+        if len(self.cache) >= TS_CACHE_SIZE:
+            self.cache.clear()
+        self.cache[key] = ts
+
+
+def timed_lines(lines, year: int = None):
+    """Yield (capture_offset_seconds, line) pairs; offsets are relative to the first timestamp."""
+    parser = TimestampParser(year)
+    first = None
+    offset = 0.0
+    for line in lines:
+        ts = parser.parse(line)
+        if ts is not None:
+            if first is None:
+                first = ts
+            # Never schedule backwards: out-of-order captures send immediately
+            offset = max(offset, ts - first)
+        yield offset, line
+
+
+def replay_capture(
+    path: Path,
+    host: str,
+    port: int,
+    speed: float = 1.0,
+    use_tcp: bool = False,
+    line_filter=None,
+    year: int = None,
+    transform=None,
+):
+    """Replay a capture to host:port, honouring original inter-arrival gaps / speed."""
+    if use_tcp:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.connect((host, port))
+        except ConnectionRefusedError:
+            print(f"Error: Connection refused to {host}:{port}", file=sys.stderr)
+            sys.exit(1)
+        send = lambda data: sock.sendall(data + b"\n")
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.connect((host, port))
+        send = sock.send
+
+    speed_desc = f"{speed:g}x" if speed > 0 else "as fast as possible"
+    print(f"Replaying {path} to {host}:{port} ({'TCP' if use_tcp else 'UDP'}, {speed_desc})")
+
+    lines = iter_capture_lines(path)
+    if line_filter is not None:
+        lines = (line for line in lines if line_filter.search(line))
+    if transform is not None:
+        lines = map(transform, lines)
+
+    sent = errors = nbytes = 0
+    max_lag = 0.0
+    span = 0.0
+    peak_second = peak_count = 0
+    current_second = None
+    start = time.perf_counter()
+    try:
+        for offset, line in timed_lines(lines, year):
+            if speed > 0:
+                due = start + offset / speed
+                now = time.perf_counter()
+                if due - now > MIN_SLEEP:
+                    time.sleep(due - now)
+                else:
+                    max_lag = max(max_lag, now - due)
+            try:
+                send(line)
+                sent += 1
+                nbytes += len(line)
+            except OSError:
+                errors += 1
+            span = offset
+            second = int(offset)
+            if second != current_second:
+                current_second, count = second, 0
+            count += 1
+            if count > peak_count:
+                peak_second, peak_count = second, count
+            if sent % 10000 == 0:
+                print(f"\rSent {sent:,} logs (capture +{offset:,.1f}s)", end="", flush=True)
+    except KeyboardInterrupt:
+        print("\nInterrupted by user")
+    finally:
+        sock.close()
+
+    elapsed = time.perf_counter() - start
+    print()
+    print("=" * 60)
+    print("Replay Summary")
+    print("=" * 60)
+    print(f"Capture span:     {span:,.1f}s")
+    print(f"Elapsed:          {elapsed:,.1f}s (effective speed {span / elapsed if elapsed else 0:,.1f}x)")
+    print(f"Sent:             {sent:,} ({sent / elapsed if elapsed else 0:,.0f} EPS average)")
+    print(f"Send errors:      {errors:,}")
+    print(f"Throughput:       {nbytes / elapsed / 1e6 if elapsed else 0:,.2f} MB/s")
+    print(f"Peak capture sec: +{peak_second}s with {peak_count:,} lines "
+          f"({peak_count * speed if speed > 0 else peak_count:,.0f} EPS on the wire at this speed)")
+    if speed > 0:
+        print(f"Max lag:          {max_lag * 1000:,.1f}ms behind schedule")
+        if max_lag > 0.1:
+            print("WARNING: sender fell behind the capture timeline; bursts were flattened. "
+                  "Lower --speed or split the capture.")
+    return sent
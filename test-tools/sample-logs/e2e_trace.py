@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+End-to-end trace stamping shared by stream-logs.py and trace-collector.py.
+
+Each traced message carries one token:
+
+    avxtrace=<run_id>:<log_type>:<stream>:<seq>:<send_us>
+
+run_id is random per run, log_type is the stream-logs.py type key, stream is
+the sender index (so concurrent senders keep their own contiguous sequences),
+seq counts from 0 per (log_type, stream) and send_us is the wall-clock send
+time in microseconds.
+
+The token is placed where the existing groks already skip text, so parsing
+and the fields extracted are unchanged and the token survives in [message]:
+    - JSON payloads (suricata, mitm): first key of the JSON object
+    - legacy microseg (SPT/DPT/ACTION): appended at the end
+    - everything else: just before the Aviatrix* keyword
+"""
+
+import json
+import os
+import re
+import time
+from collections import Counter
+
+TRACE_RE = re.compile(rb"avxtrace=([0-9a-f]+):([a-z_]+):(\d+):(\d+):(\d+)")
+
+JSON_TYPES = {"suricata", "mitm"}
+
+
+def new_run_id() -> str:
+    return os.urandom(4).hex()
+
+
+class TraceStamper:
+    """Stamps messages for one sender stream with per-type sequence numbers."""
+
+    def __init__(self, run_id: str, stream: int = 0):
+        self.prefix = f"avxtrace={run_id}:"
+        self.stream = stream
+        self.seq = Counter()
+
+    def token(self, log_type: str) -> bytes:
+        seq = self.seq[log_type]
+        self.seq[log_type] = seq + 1
+        return f"{self.prefix}{log_type}:{self.stream}:{seq}:{time.time_ns() // 1000}".encode()
+
+    def stamp(self, log_type: str, line: bytes) -> bytes:
+        token = self.token(log_type)
+        if log_type in JSON_TYPES:
+            i = line.find(b"]: {")
+            if i >= 0:
+                i += 4
+                return line[:i] + b'"avx_trace":"' + token + b'",' + line[i:]
+        elif not (log_type == "microseg" and b"Packet: SRC_MAC=" in line):
+            i = line.find(b" Aviatrix")
+            if i >= 0:
+                return line[:i + 1] + token + b" " + line[i + 1:]
+        return line + b" " + token
+
+
+class TracedStreamFactory:
+    """Wraps a load-mode stream factory so every event is stamped (picklable)."""
+
+    def __init__(self, inner, run_id: str):
+        self.inner = inner
+        self.run_id = run_id
+
+    def __call__(self, worker_id):
+        stamper = TraceStamper(self.run_id, worker_id)
+        return ((t, stamper.stamp(t, payload)) for t, payload in self.inner(worker_id))
+
+
+class TraceRun:
+    """One traced stream-logs.py run: stamps lines, wraps load factories, counts what was sent."""
+
+    def __init__(self, run_id: str, classify):
+        self.run_id = run_id
+        self.classify = classify
+        self.stamper = TraceStamper(run_id)
+        self.sent = Counter()
+
+    def stamp_line(self, line: str) -> str:
+        log_type = self.classify(line)
+        self.sent[log_type] += 1
+        return self.stamper.stamp(log_type, line.encode("utf-8")).decode("utf-8")
+
+    def stamp_bytes(self, line: bytes) -> bytes:
+        log_type = self.classify(line.decode("utf-8", "replace"))
+        self.sent[log_type] += 1
+        return self.stamper.stamp(log_type, line)
+
+    def lines(self, lines):
+        return map(self.stamp_line, lines)
+
+    def wrap_factory(self, stream_factory) -> TracedStreamFactory:
+        return TracedStreamFactory(stream_factory, self.run_id)
+
+
+def write_manifest(path, run_id: str, sent: Counter):
+    """Record what was sent so the collector can count loss at the tail of a run."""
+    with open(path, "w") as f:
+        json.dump({"run_id": run_id, "finished": time.time(), "sent": dict(sent)}, f, indent=2)
+        f.write("\n")
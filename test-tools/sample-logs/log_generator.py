@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Synthetic Aviatrix log generator - streams realistic, high-cardinality syslog lines.
+
+Every log type in stream-logs.py's LOG_TYPE_PATTERNS has a template that
+matches the formats in test-samples.log (and therefore the Logstash groks).
+Entities (gateways, interfaces, 5-tuples, sessions, signatures, users) are
+derived from the seed and an index with an integer hash rather than stored,
+so a generator configured for millions of unique flows still runs in
+constant memory. Events are yielded lazily; nothing is preloaded.
+
+Usage (standalone, prints to stdout):
+    ./log_generator.py --count 1000
+    ./log_generator.py --count 100000 --gateways 500 --flows 1000000 --seed 7
+    ./log_generator.py --type microseg --count 20
+
+Usage (as a stream-logs.py backend):
+    ./stream-logs.py --source synthetic --rate 100000 --duration 3600
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+from collections import deque
+
+# Realistic per-type ratios for a busy deployment (microseg dominates)
+DEFAULT_MIX = {
+    "microseg": 55,
+    "netstats": 12,
+    "mitm": 10,
+    "fqdn": 8,
+    "suricata": 5,
+    "sysstats": 4,
+    "cmd": 2,
+    "tunnel": 2,
+    "vpn": 2,
+}
+
+# Share of microseg events per format variant (must sum to 1.0)
+MICROSEG_SESSION_SHARE = 0.80   # 8.2+ start/end pairs with SESSION_* fields
+MICROSEG_FIRST_PKT_SHARE = 0.15  # 8.2+ first packet, no session fields
+# remainder: legacy 7.x SPT/DPT/ACTION format
+
+GATEWAY_ROLES = ["spoke", "transit", "egress", "firenet", "edge"]
+REGIONS = [
+    ("AWS", "us-east-1"), ("AWS", "us-east-2"), ("AWS", "us-west-2"), ("AWS", "eu-west-1"),
+    ("Azure", "eastus"), ("Azure", "westeurope"), ("GCP", "us-central1"), ("OCI", "us-ashburn-1"),
+]
+# Interfaces past this list are named eth4, eth5, ...
+INTERFACE_NAMES = ["eth0", "eth1", "eth-fn0", "eth-fn1", "eth2", "eth3", "tun0", "tun1"]
+DST_PORTS = [443, 443, 443, 80, 53, 8080, 22, 3306, 5432, 6379, 9200, 8443]
+PROTOS = ["TCP", "TCP", "TCP", "TCP", "UDP", "UDP", "ICMP"]
+SESSION_END_REASONS = [1, 1, 1, 2, 3, 4, 5]
+CORE_COUNTS = [2, 4, 8, 16, 32, 64, 96]
+
+SURICATA_CATEGORIES = [
+    "Potentially Bad Traffic", "Attempted Information Leak", "A Network Trojan was detected",
+    "Misc activity", "Web Application Attack", "Attempted Administrator Privilege Gain",
+    "Not Suspicious Traffic", "Detection of a Network Scan",
+]
+SURICATA_PREFIXES = [
+    "ET POLICY", "ET INFO", "ET SCAN", "ET MALWARE", "ET WEB_SERVER", "GPL ATTACK_RESPONSE",
+    "ET EXPLOIT", "ET DNS", "ET TROJAN", "ET HUNTING",
+]
+SURICATA_SUBJECTS = [
+    "curl User-Agent Outbound", "Observed DNS Query to .cloud TLD", "Suspicious inbound to mySQL port",
+    "id check returned root", "Possible SQL Injection Attempt", "Outdated Flash Version",
+    "Nmap Scripting Engine User-Agent", "Executable Download from dotted-quad Host",
+]
+APP_PROTOS = ["http", "tls", "dns", "ssh", "smtp"]
+
+MITM_REASONS = [
+    ("Permit", "POLICY", "start"), ("Permit", "POLICY", "end"), ("Permit", "TLS_PROFILE", "end"),
+    ("Deny", "IPS_POLICY_DENY", "end"), ("Permit", "IDS_POLICY_ALERT", "end"),
+    ("Permit", "IDS_POLICY_TIMEOUT", "end"), ("Deny", "CONNECTION_SYN_ONLY_TIMEOUT", "end"),
+]
+
+FQDN_STATES = [("MATCHED", None), ("MATCHED", None), ("NO_MATCH", "NOT_WHITELISTED"), ("MATCHED", "BLACKLISTED")]
+
+CMD_ACTIONS = [
+    "USER_LOGIN_MANAGEMENT", "ENABLE_RSYSLOG_FORWARDER", "DISABLE_RSYSLOG_FORWARDER", "LIST_VPC_BY_NAME",
+    "CREATE_GATEWAY", "DELETE_GATEWAY", "UPDATE_DCF_POLICY", "ATTACH_SPOKE_TO_TRANSIT", "GET_GATEWAY_INFO",
+]
+API_URLS = [
+    "/v2.5/api/gateways", "/v2.5/api/dcf/policies", "/v2.5/api/transit/attachments",
+    "/v2.5/api/settings/syslog", "/v2.5/api/vpn/users",
+]
+VPN_PLATFORMS = [("mac", "AVPNC-2.17.7"), ("Windows", "2.14.14"), ("linux", "AVPNC-2.16.42")]
+
+MASK64 = (1 << 64) - 1
+
+
+def mix64(x: int) -> int:
+    """splitmix64 finalizer: deterministic, well-distributed 64-bit hash of an int."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def fmt_ip(h: int, first_octet: int = None) -> str:
+    a = first_octet if first_octet is not None else 1 + (h >> 24) % 223
+    return f"{a}.{(h >> 16) & 255}.{(h >> 8) & 255}.{1 + (h & 255) % 254}"
+
+
+def fmt_mac(h: int) -> str:
+    return "02:" + ":".join(f"{(h >> s) & 255:02x}" for s in (32, 24, 16, 8, 0))
+
+
+def fmt_uuid(h1: int, h2: int) -> str:
+    s = f"{h1:016x}{h2:016x}"
+    return f"{s[0:8]}-{s[8:12]}-4{s[13:16]}-a{s[17:20]}-{s[20:32]}"
+
+
+class _Clock:
+    """Caches the formatted timestamp variants for the current wall-clock second."""
+
+    def __init__(self):
+        self.second = None
+
+    def tick(self) -> float:
+        now = time.time()
+        sec = int(now)
+        if sec != self.second:
+            self.second = sec
+            tm = time.gmtime(sec)
+            self.syslog = time.strftime("%b ", tm) + f"{tm.tm_mday:2d}" + time.strftime(" %H:%M:%S", tm)
+            self.slash = time.strftime("%Y/%m/%d %H:%M:%S", tm)
+            self.iso = time.strftime("%Y-%m-%dT%H:%M:%S", tm)
+            self.long = time.strftime("%Y-%m-%d %H:%M:%S", tm)
+        return now
+
+
+class SyntheticLogGenerator:
+    """Lazily generate Aviatrix syslog lines with configurable cardinality.
+
+    Args:
+        seed:       Base seed; the same seed and settings give the same entity space.
+        gateways:   Unique gateways (names, IPs, core counts).
+        interfaces: Interfaces per gateway reported in net stats.
+        flows:      Unique 5-tuples (src/dst IP, ports, protocol) for microseg, MITM and Suricata.
+        sessions:   Unique session IDs; 0 means every session gets a fresh ID (unbounded).
+        policies:   Unique DCF policy UUIDs.
+        signatures: Unique Suricata signatures.
+        hostnames:  Unique FQDN/SNI hostnames.
+        users:      Unique VPN/controller users.
+        suricata_stats: Fraction of Suricata lines emitted as event_type=stats.
+        worker:     Stream index for concurrent senders; shares the entity space of
+                    the seed but draws its own event sequence and session IDs.
+    """
+
+    TYPES = tuple(DEFAULT_MIX)
+
+    def __init__(
+        self,
+        seed: int = 0,
+        gateways: int = 50,
+        interfaces: int = 2,
+        flows: int = 100_000,
+        sessions: int = 0,
+        policies: int = 32,
+        signatures: int = 500,
+        hostnames: int = 10_000,
+        users: int = 200,
+        suricata_stats: float = 0.0,
+        worker: int = 0,
+    ):
+        if min(gateways, interfaces, flows, policies, signatures, hostnames, users) < 1:
+            raise ValueError("entity counts must be >= 1")
+        self.seed = seed
+        self.gateways = gateways
+        self.interfaces = interfaces
+        self.flows = flows
+        self.sessions = sessions
+        self.policies = policies
+        self.signatures = signatures
+        self.hostnames = hostnames
+        self.users = users
+        self.suricata_stats = suricata_stats
+        self.worker = worker
+        self.rng = random.Random(seed * 1_000_003 + worker)
+        self.clock = _Clock()
+
+    # --- entity derivation (pure functions of seed + index) ---
+
+    def _h(self, kind: int, index: int) -> int:
+        return mix64((self.seed << 40) ^ (kind << 32) ^ index)
+
+    @staticmethod
+    def interface(i: int) -> str:
+        """Name of a gateway's i-th interface."""
+        if i < len(INTERFACE_NAMES):
+            return INTERFACE_NAMES[i]
+        return f"eth{i - len(INTERFACE_NAMES) + 4}"
+
+    def gateway(self, i: int) -> dict:
+        h = self._h(1, i)
+        role = GATEWAY_ROLES[h % len(GATEWAY_ROLES)]
+        cloud, region = REGIONS[(h >> 8) % len(REGIONS)]
+        return {
+            "name": f"{role}-{region}-{i:04d}",
+            "public_ip": fmt_ip(h >> 16, first_octet=3 + (h >> 60) % 50),
+            "private_ip": f"10.{(i >> 8) & 255}.{i & 255}.10",
+            "cloud": cloud,
+            "region": region,
+            "cores": CORE_COUNTS[(h >> 12) % len(CORE_COUNTS)],
+        }
+
+    def flow(self, k: int) -> dict:
+        h = self._h(2, k)
+        h2 = mix64(h)
+        return {
+            "src_ip": fmt_ip(h, first_octet=10 if h & 1 else 100),
+            "dst_ip": fmt_ip(h2),
+            "src_port": 1024 + (h >> 40) % 64511,
+            "dst_port": DST_PORTS[(h2 >> 40) % len(DST_PORTS)],
+            "proto": PROTOS[(h >> 56) % len(PROTOS)],
+            "src_mac": fmt_mac(h >> 8),
+            "dst_mac": fmt_mac(h2 >> 8),
+            "policy": fmt_uuid(self._h(3, (h >> 20) % self.policies), self._h(4, (h >> 20) % self.policies)),
+            "gateway": (h2 >> 20) % self.gateways,
+        }
+
+    def session_id(self, s: int) -> int:
+        return mix64(self._h(5, s % self.sessions if self.sessions else s)) >> 1
+
+    def hostname(self, k: int) -> str:
+        h = self._h(6, k)
+        return f"svc{k}.{['example', 'cdn', 'api', 'internal'][h % 4]}{h % 97}.com"
+
+    def user(self, k: int) -> str:
+        return f"user{k:05d}"
+
+    # --- per-type streams ---
+
+    def stream(self, log_type: str):
+        """Return an infinite iterator of syslog lines for one log type."""
+        try:
+            return getattr(self, f"_gen_{log_type}")()
+        except AttributeError:
+            raise ValueError(f"unknown log type: {log_type}")
+
+    def events(self, mix: dict = None):
+        """Yield (log_type, line) forever, interleaving types by weight."""
+        weights = {t: w for t, w in (mix or DEFAULT_MIX).items() if w > 0}
+        streams = {t: self.stream(t) for t in weights}
+        types = list(weights)
+        schedule = self.rng.choices(types, weights=[weights[t] for t in types], k=4096)
+        for log_type in itertools.cycle(schedule):
+            yield log_type, next(streams[log_type])
+
+    def _gw_header(self, pri: int, gw: dict) -> str:
+        return f"<{pri}>{self.clock.syslog} GW-{gw['name']}-{gw['public_ip']}-sink"
+
+    def _gen_microseg(self):
+        rng = self.rng
+        pending = deque()
+        inflight = max(1, min(self.sessions or 1024, 1024))
+        next_session = self.worker << 40
+        while True:
+            self.clock.tick()
+            r = rng.random()
+            if r < MICROSEG_SESSION_SHARE:
+                # Close the oldest open session once enough are in flight, else open one
+                if len(pending) >= inflight or (pending and rng.random() < 0.5):
+                    s, k = pending.popleft()
+                    yield self._microseg_line(k, s, end=True)
+                else:
+                    s, next_session = next_session, next_session + 1
+                    k = self._h(7, s) % self.flows
+                    pending.append((s, k))
+                    yield self._microseg_line(k, s, end=False)
+            elif r < MICROSEG_SESSION_SHARE + MICROSEG_FIRST_PKT_SHARE:
+                yield self._microseg_line(rng.randrange(self.flows), None, end=False)
+            else:
+                f = self.flow(rng.randrange(self.flows))
+                gw = self.gateway(f["gateway"])
+                action = "PERMIT" if rng.random() < 0.85 else "DENY"
+                yield (
+                    f"<14>{self.clock.syslog} {gw['name']} AviatrixGwMicrosegPacket: "
+                    f"SRC_MAC={f['src_mac']} DST_MAC={f['dst_mac']} PROTO={f['proto']} "
+                    f"SPT={f['src_port']} DPT={f['dst_port']} ACTION={action}"
+                )
+
+    def _microseg_line(self, k: int, s, end: bool) -> str:
+        rng = self.rng
+        f = self.flow(k)
+        gw = self.gateway(f["gateway"])
+        action = "PERMIT" if (k & 7) else "DENY"
+        enforced = "true" if (k % 5) else "false"
+        line = (
+            f"{self._gw_header(158, gw)} /usr/local/bin/avx-gw-state-sync {self.clock.slash} "
+            f"AviatrixGwMicrosegPacket: POLICY={f['policy']} SRC_MAC={f['src_mac']} DST_MAC={f['dst_mac']} "
+            f"IP_SZ={rng.choice((52, 60, 60, 1500)) if not end else rng.randint(40, 1500)} "
+            f"SRC_IP={f['src_ip']} DST_IP={f['dst_ip']} PROTO={f['proto']} "
+            f"SRC_PORT={f['src_port']} DST_PORT={f['dst_port']} DATA=0x ACT={action} ENFORCED={enforced}"
+        )
+        if s is None:
+            return line
+        if not end:
+            return (
+                f"{line} SESSION_ID={self.session_id(s)} SESSION_EVENT=0 SESSION_END_REASON=0 "
+                f"SESSION_PKT_CNT=0 SESSION_BYTE_CNT=0 SESSION_DUR=0"
+            )
+        pkts = rng.randint(1, 5000)
+        return (
+            f"{line} SESSION_ID={self.session_id(s)} SESSION_EVENT=1 "
+            f"SESSION_END_REASON={rng.choice(SESSION_END_REASONS)} SESSION_PKT_CNT={pkts} "
+            f"SESSION_BYTE_CNT={pkts * rng.randint(60, 1400)} SESSION_DUR={rng.randint(1000, 600_000_000_000)}"
+        )
+
+    def _gen_netstats(self):
+        rng = self.rng
+        units = ["Kb", "Kb", "Mb", ""]
+        cum_units = ["KB", "MB", "MB", "GB"]
+        for n in itertools.count():
+            now = self.clock.tick()
+            gw_i, iface_i = divmod(n % (self.gateways * self.interfaces), self.interfaces)
+            gw = self.gateway(gw_i)
+            iface = self.interface(iface_i)
+            public = f" public_ip={gw['public_ip']}" if iface_i == 0 else " "
+            rx, tx = rng.uniform(1, 999), rng.uniform(1, 999)
+            u = rng.choice(units)
+            rxc, txc = rng.uniform(1, 999), rng.uniform(1, 999)
+            cu = rng.choice(cum_units)
+            ct_count = rng.randint(10, 50_000)
+            ct_avail = rng.randint(50_000, 250_000)
+            yield (
+                f"{self._gw_header(14, gw)} /usr/local/bin/avx-gw-state-sync {self.clock.slash} "
+                f"AviatrixGwNetStats: timestamp={self.clock.iso}.{int(now % 1 * 1e6):06d} "
+                f"name={gw['name']} alias={gw['name']}{public} "
+                f"private_ip=10.{(gw_i >> 8) & 255}.{gw_i & 255}.{10 + iface_i * 16} interface={iface} "
+                f"total_rx_rate={rx:.2f}{u} total_tx_rate={tx:.2f}{u} total_rx_tx_rate={rx + tx:.2f}{u} "
+                f"total_rx_cum={rxc:.2f}{cu} total_tx_cum={txc:.2f}{cu} total_rx_tx_cum={rxc + txc:.2f}{cu} "
+                f"conntrack_limit_exceeded=0 bw_in_limit_exceeded={rng.randint(0, 200)} "
+                f"bw_out_limit_exceeded={rng.randint(0, 2000)} pps_limit_exceeded={rng.randint(0, 3000)} "
+                f"linklocal_limit_exceeded=0 conntrack_count={ct_count} "
+                f"conntrack_allowance_available={ct_avail} conntrack_usage_rate={ct_count / (ct_count + ct_avail):.2f}"
+            )
+
+    def cpu_cores(self, cores: int, start: int, busy_first: bool = False) -> str:
+        """Build a protobuf-text cpu_cores value for N cores plus the -1 aggregate."""
+        rng = self.rng
+        parts = []
+        for name in list(range(cores)) + [-1]:
+            lo = rng.randint(0, 20)
+            hi = lo + rng.randint(0, 60)
+            avg = (lo + hi) // 2
+            busy = (
+                f"busy:{{start:{{seconds:{start}  nanos:{rng.randint(0, 999_999_999)}}}  "
+                f"end:{{seconds:{start + 40}  nanos:{rng.randint(0, 999_999_999)}}}  "
+                f"min:{lo}  max:{hi}  avg:{avg}}}"
+            )
+            parts.append(f"{busy} name:{name}" if busy_first else f"name:{name}  {busy}")
+        return "[" + " ".join(parts) + "]"
+
+    def _gen_sysstats(self):
+        rng = self.rng
+        for n in itertools.count():
+            now = self.clock.tick()
+            gw_i = n % self.gateways
+            gw = self.gateway(gw_i)
+            mem_total = gw["cores"] * 1_966_080
+            mem_avail = rng.randint(mem_total // 4, mem_total)
+            disk_free = rng.randint(20_000_000, 60_000_000)
+            cores = self.cpu_cores(gw["cores"], int(now) - 40, busy_first=bool(gw_i & 1))
+            yield (
+                f"{self._gw_header(14, gw)} /usr/local/bin/avx-gw-state-sync {self.clock.slash} "
+                f"AviatrixGwSysStats: timestamp={self.clock.iso}.{int(now % 1 * 1e6):06d} "
+                f"name={gw['name']} alias={gw['name']} cpu_idle={rng.randint(40, 100)} "
+                f"memory_free={mem_avail // 3} memory_available={mem_avail} memory_total={mem_total} "
+                f"disk_total=65842432 disk_free={disk_free} cpu_cores={cores}"
+            )
+
+    def _gen_suricata(self):
+        rng = self.rng
+        for n in itertools.count():
+            now = self.clock.tick()
+            k = rng.randrange(self.flows)
+            f = self.flow(k)
+            gw = self.gateway(f["gateway"])
+            ts = f"{self.clock.iso}.{int(now % 1 * 1e6):06d}+0000"
+            if rng.random() < self.suricata_stats:
+                body = {
+                    "timestamp": ts,
+                    "event_type": "stats",
+                    "stats": {
+                        "uptime": n,
+                        "capture": {"kernel_packets": n * 1000, "kernel_drops": n % 7},
+                        "decoder": {"pkts": n * 1000, "bytes": n * 800_000, "ipv4": n * 990, "tcp": n * 700,
+                                    "udp": n * 250, "avg_pkt_size": 800, "max_pkt_size": 1514},
+                        "flow": {"memcap": 0, "tcp": n * 30, "udp": n * 10, "spare": 10000,
+                                 "emerg_mode_entered": 0, "memuse": 7_000_000},
+                        "tcp": {"sessions": n * 30, "syn": n * 31, "synack": n * 30, "rst": n,
+                                "reassembly_gap": 0, "memuse": 5_000_000},
+                        "detect": {"alert": n // 10, "engines": [{"id": 0, "rules_loaded": 40000,
+                                                                 "rules_failed": 0}]},
+                        "app_layer": {"flow": {"http": n * 5, "tls": n * 20, "dns_udp": n * 8}},
+                    },
+                }
+            else:
+                sig = self._h(8, k) % self.signatures
+                sh = self._h(9, sig)
+                app = APP_PROTOS[k % len(APP_PROTOS)]
+                body = {
+                    "timestamp": ts,
+                    "flow_id": self._h(10, k) >> 16,
+                    "pcap_cnt": rng.randint(1, 10_000_000),
+                    "event_type": "alert",
+                    "src_ip": f["src_ip"],
+                    "src_port": f["src_port"],
+                    "dest_ip": f["dst_ip"],
+                    "dest_port": f["dst_port"],
+                    "proto": f["proto"],
+                    "pkt_src": "wire/pcap",
+                    "tx_id": 0,
+                    "alert": {
+                        "action": "allowed" if sh & 3 else "blocked",
+                        "gid": 1,
+                        "signature_id": 2_000_000 + sig,
+                        "rev": 1 + sh % 9,
+                        "signature": f"{SURICATA_PREFIXES[sh % len(SURICATA_PREFIXES)]} "
+                                     f"{SURICATA_SUBJECTS[(sh >> 8) % len(SURICATA_SUBJECTS)]} ({sig})",
+                        "category": SURICATA_CATEGORIES[(sh >> 16) % len(SURICATA_CATEGORIES)],
+                        "severity": 1 + (sh >> 24) % 3,
+                        "metadata": {"confidence": ["Medium"], "signature_severity": ["Informational"]},
+                    },
+                    "app_proto": app,
+                    "direction": "to_server",
+                    "flow": {
+                        "pkts_toserver": rng.randint(1, 50), "pkts_toclient": rng.randint(0, 50),
+                        "bytes_toserver": rng.randint(60, 60_000), "bytes_toclient": rng.randint(0, 600_000),
+                        "start": ts, "src_ip": f["src_ip"], "dest_ip": f["dst_ip"],
+                        "src_port": f["src_port"], "dest_port": f["dst_port"],
+                    },
+                }
+                if app == "http":
+                    body["http"] = {"hostname": self.hostname(k % self.hostnames), "url": "/index.html",
+                                    "http_user_agent": "curl/8.17.0", "http_method": "GET",
+                                    "protocol": "HTTP/1.1", "status": 200, "length": rng.randint(0, 10_000)}
+                elif app == "tls":
+                    body["tls"] = {"sni": self.hostname(k % self.hostnames), "version": "TLS 1.3",
+                                   "ja3": {"hash": f"{self._h(11, k):016x}{sh:016x}"}}
+                elif app == "dns":
+                    body["dns"] = {"type": "query", "rrname": self.hostname(k % self.hostnames), "rrtype": "A"}
+            yield (
+                f"<174>{self.clock.syslog} GW-{gw['name']}-{gw['public_ip']}-sink suricata[4]: "
+                + json.dumps(body, separators=(",", ":"))
+            )
+
+    def _gen_mitm(self):
+        rng = self.rng
+        next_session = self.worker << 40
+        while True:
+            now = self.clock.tick()
+            s, next_session = next_session, next_session + 1
+            k = self._h(12, s) % self.flows
+            f = self.flow(k)
+            gw = self.gateway(f["gateway"])
+            action, reason, stage = MITM_REASONS[rng.randrange(len(MITM_REASONS))]
+            sid = self.session_id(s)
+            body = {
+                "priority": "LOG_ALERT",
+                "action": action,
+                "reason": reason,
+                "src": f["src_ip"],
+                "src_port": f["src_port"],
+                "dest": f["dst_ip"],
+                "dest_port": 443,
+                "enforced": True,
+                "ids": True,
+                "stage": "SNI" if reason == "POLICY" else "txn",
+                "sni_hostname": self.hostname(k % self.hostnames),
+                "decided_by": f["policy"],
+                "proto": "TCP",
+                "session_start": int(now * 1e9),
+                "session_stage": stage,
+                "session_id": fmt_uuid(sid, mix64(sid)),
+                "timestamp": int(now),
+            }
+            if stage == "end":
+                body["session_time"] = rng.randint(1000, 200_000_000)
+                body["request_bytes"] = rng.randint(50, 10_000)
+                body["response_bytes"] = rng.randint(0, 1_000_000)
+            if reason in ("IPS_POLICY_DENY", "IDS_POLICY_ALERT"):
+                body["sid"] = str(2_000_000 + self._h(8, k) % self.signatures)
+                body["url"] = body["sni_hostname"] + "/"
+            yield (
+                f"<153>{self.clock.syslog} GW-{gw['name']}-{gw['public_ip']}-sink traffic_server[5141]: "
+                + json.dumps(body, separators=(",", ":"))
+            )
+
+    def _gen_fqdn(self):
+        rng = self.rng
+        while True:
+            self.clock.tick()
+            k = rng.randrange(self.flows)
+            f = self.flow(k)
+            gw = self.gateway(f["gateway"])
+            host = self.hostname(k % self.hostnames)
+            state, drop = FQDN_STATES[k % len(FQDN_STATES)]
+            drop_part = f" drop_reason={drop}" if drop else ""
+            yield (
+                f"<14>{self.clock.syslog} GW-{gw['name']}-{gw['public_ip']} avx-nfq: "
+                f"AviatrixFQDNRule2[CRIT]nfq_ssl_handle_client_hello() L#291  Gateway={gw['name']} "
+                f"S_IP={f['src_ip']} D_IP={f['dst_ip']} hostname={host} state={state}{drop_part} "
+                f"Rule=*.{host.split('.', 1)[1]},SourceIP:IGNORE;0;0;{f['dst_port']}"
+            )
+
+    def _gen_cmd(self):
+        rng = self.rng
+        while True:
+            self.clock.tick()
+            user = self.user(rng.randrange(self.users))
+            header = f"<14>{self.clock.syslog} 18.190.163.185 {self.clock.syslog} Controller-10.0.0.120"
+            if rng.random() < 0.7:
+                action = rng.choice(CMD_ACTIONS)
+                result = "Success" if rng.random() < 0.9 else "Failed"
+                reason = "" if result == "Success" else "gateway not found"
+                yield (
+                    f"{header} run_cloudxd.py[3085]: AviatrixCMD: action={action}, "
+                    f"argv=['--rtn_file', '/dev/null', '{action.lower()}', '--gw_name', "
+                    f"'{self.gateway(rng.randrange(self.gateways))['name']}'], "
+                    f"result={result}, reason={reason}, username={user}"
+                )
+            else:
+                status = rng.choice((200, 200, 200, 400, 403))
+                yield (
+                    f"{header} cloudxd[3085]: AviatrixAPI: url={rng.choice(API_URLS)} user={user} "
+                    f"req_data={{\"gw_name\": \"{self.gateway(rng.randrange(self.gateways))['name']}\"}} "
+                    f"resp_status={status} resp_data={{\"return\": {'true' if status == 200 else 'false'}}}"
+                )
+
+    def _gen_tunnel(self):
+        rng = self.rng
+        while True:
+            now = self.clock.tick()
+            a = self.gateway(rng.randrange(self.gateways))
+            b = self.gateway(rng.randrange(self.gateways))
+            old, new = ("Down", "Up") if rng.random() < 0.5 else ("Up", "Down")
+            yield (
+                f"<14>{self.clock.iso}.{int(now % 1 * 1e6):06d}+00:00 ip-{a['private_ip'].replace('.', '-')} "
+                f"cloudxd: AviatrixTunnelStatusChange: src_gw={a['name']}({a['cloud']} {a['region']}) "
+                f"dst_gw={b['name']}({b['cloud']} {b['region']}) old_state={old} new_state={new}"
+            )
+
+    def _gen_vpn(self):
+        rng = self.rng
+        while True:
+            self.clock.tick()
+            u = rng.randrange(self.users)
+            gw = self.gateway(u % self.gateways)
+            platform, version = VPN_PLATFORMS[u % len(VPN_PLATFORMS)]
+            virtual_ip = f"192.168.{(u >> 8) & 255}.{u & 255}"
+            public_ip = fmt_ip(self._h(13, u))
+            login = self.clock.long
+            if rng.random() < 0.5:
+                tail = (f"Status=active, Gateway={gw['name']}, GatewayIP={gw['public_ip']}, "
+                        f"VPNVirtualIP={virtual_ip}, PublicIP={public_ip}, Login={login}, Logout=N/A, "
+                        f"Duration=N/A, RXbytes=N/A, TXbytes=N/A")
+            else:
+                tail = (f"Status=disconnected, Gateway={gw['name']}, GatewayIP={gw['public_ip']}, "
+                        f"VPNVirtualIP={virtual_ip}, PublicIP={public_ip}, Login={login}, Logout={login}, "
+                        f"Duration=0:0:{rng.randint(0, 59)}:{rng.randint(0, 59)}, "
+                        f"RXbytes={rng.uniform(1, 999):.1f}KB, TXbytes={rng.uniform(1, 999):.1f}KB")
+            yield (
+                f"<14>{self.clock.syslog} 3.131.22.171 {self.clock.syslog} Controller-10.0.0.141 "
+                f"run_cloudxd.py[1272]: AviatrixVPNSession: User={self.user(u)}, {tail}, "
+                f"VPNClientPlatform={platform}, VPNClientVersion={version}"
+            )
+
+
+def positive_int(value: str) -> int:
+    """argparse type for entity counts, so a count below 1 is a usage error."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {n}")
+    return n
+
+
+def non_negative_int(value: str) -> int:
+    """argparse type for --sessions, where 0 means unbounded."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {n}")
+    return n
+
+
+def add_generator_args(parser: argparse.ArgumentParser):
+    """Register the cardinality options shared by this script and stream-logs.py."""
+    group = parser.add_argument_group("synthetic generator")
+    group.add_argument("--gateways", type=positive_int, default=50, help="Unique gateways (default: 50)")
+    group.add_argument("--interfaces", type=positive_int, default=2,
+                       help="Interfaces per gateway; names past eth0..tun1 are eth4, eth5, ... (default: 2)")
+    group.add_argument("--flows", type=positive_int, default=100_000, help="Unique 5-tuples (default: 100000)")
+    group.add_argument("--sessions", type=non_negative_int, default=0,
+                       help="Unique session IDs, 0 = unbounded (default: 0)")
+    group.add_argument("--signatures", type=positive_int, default=500,
+                       help="Unique Suricata signatures (default: 500)")
+    group.add_argument("--hostnames", type=positive_int, default=10_000,
+                       help="Unique FQDN/SNI hostnames (default: 10000)")
+    group.add_argument("--suricata-stats", type=float, default=0.0,
+                       help="Fraction of Suricata lines that are event_type=stats (default: 0)")
+    return group
+
+
+def generator_from_args(args, worker: int = 0) -> SyntheticLogGenerator:
+    return SyntheticLogGenerator(
+        seed=args.seed,
+        worker=worker,
+        gateways=args.gateways,
+        interfaces=args.interfaces,
+        flows=args.flows,
+        sessions=args.sessions,
+        signatures=args.signatures,
+        hostnames=args.hostnames,
+        suricata_stats=args.suricata_stats,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Aviatrix syslog lines")
+    parser.add_argument("-n", "--count", type=int, default=100, help="Lines to generate (default: 100)")
+    parser.add_argument("--type", choices=SyntheticLogGenerator.TYPES, help="Only generate this log type")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    add_generator_args(parser)
+    args = parser.parse_args()
+
+    gen = generator_from_args(args)
+    lines = gen.stream(args.type) if args.type else (line for _, line in gen.events())
+    out = sys.stdout
+    try:
+        for line in itertools.islice(lines, args.count):
+            out.write(line + "\n")
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
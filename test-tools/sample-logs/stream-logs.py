@@ -10,15 +10,41 @@ Usage:
     ./stream-logs.py --target 192.168.1.10    # Custom Logstash host
     ./stream-logs.py --port 514               # Custom port
     ./stream-logs.py --tcp                    # Use TCP instead of UDP
+
+Load mode (--rate) holds a target events/sec across several concurrent senders:
+    ./stream-logs.py --rate 200000 --senders 8 --duration 60
+    ./stream-logs.py --rate 50000 --tcp --mix microseg=70,netstats=20,suricata=10
+
+Synthetic source (--source synthetic) generates unbounded, high-cardinality logs
+lazily instead of replaying the sample file:
+    ./stream-logs.py --source synthetic --count 10000 --delay 0
+    ./stream-logs.py --source synthetic --rate 100000 --duration 3600 --gateways 2000 --flows 5000000
+
+Replay source (--source replay) sends a plain or gzip'd production capture with its
+original inter-arrival gaps, scaled by --speed (0 = as fast as possible):
+    ./stream-logs.py --source replay --file capture.log.gz --speed 10
+
+Tracing (--trace) stamps each message with a run ID and per-type sequence number
+for trace-collector.py to report loss, reordering and latency per log tag:
+    ./stream-logs.py --source synthetic --rate 20000 --duration 60 --trace --trace-manifest trace.json
 """
 
 import argparse
+import asyncio
+import itertools
+import multiprocessing
+import random
 import socket
 import sys
 import time
 import re
+from collections import Counter
 from pathlib import Path
 
+from capture_replay import replay_capture
+from e2e_trace import TraceRun, new_run_id, write_manifest
+from log_generator import DEFAULT_MIX, add_generator_args, generator_from_args
+
 # Log type patterns for filtering
 LOG_TYPE_PATTERNS = {
     "microseg": r"AviatrixGwMicrosegPacket",
@@ -34,6 +60,14 @@ LOG_TYPE_PATTERNS = {
 
 DEFAULT_LOG_FILE = Path(__file__).parent / "test-samples.log"
 
+COMPILED_PATTERNS = {name: re.compile(pattern) for name, pattern in LOG_TYPE_PATTERNS.items()}
+
+# Load mode defaults
+DEFAULT_SENDERS = 4
+DEFAULT_BATCH = 64
+DEFAULT_DURATION = 10.0
+UDP_SNDBUF = 4 * 1024 * 1024
+
 
 def load_logs(filepath: Path, filter_type: str = None) -> list[str]:
     """Load log lines from file, optionally filtering by type."""
@@ -60,6 +94,337 @@ def load_logs(filepath: Path, filter_type: str = None) -> list[str]:
     return logs
 
 
+def classify_log(line: str) -> str:
+    """Return the LOG_TYPE_PATTERNS key matching a log line, or 'other'."""
+    for name, pattern in COMPILED_PATTERNS.items():
+        if pattern.search(line):
+            return name
+    return "other"
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse a mix spec like 'microseg=70,netstats=20,suricata=10' into weights."""
+    mix = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in LOG_TYPE_PATTERNS:
+            raise argparse.ArgumentTypeError(
+                f"unknown log type '{name}' (choose from: {', '.join(LOG_TYPE_PATTERNS)})"
+            )
+        try:
+            value = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for '{name}': {weight}")
+        if value < 0:
+            raise argparse.ArgumentTypeError(f"weight for '{name}' must be >= 0")
+        mix[name] = value
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("mix must name at least one type with a positive weight")
+    return mix
+
+
+def build_pools(logs: list[str]) -> dict[str, list[bytes]]:
+    """Group log lines by type, pre-encoded so senders never re-encode."""
+    pools = {}
+    for line in logs:
+        pools.setdefault(classify_log(line), []).append(line.encode("utf-8"))
+    return pools
+
+
+def event_stream(pools: dict[str, list[bytes]], mix: dict[str, float] = None, seed: int = 0):
+    """Yield (log_type, payload) forever, following the weighted per-type mix.
+
+    Without a mix, every type in the pool is replayed in proportion to how
+    often it appears in the source file. Types are interleaved from a
+    precomputed weighted schedule so picking the next event stays cheap.
+    """
+    if mix:
+        missing = [name for name, weight in mix.items() if weight > 0 and name not in pools]
+        if missing:
+            raise ValueError(f"no logs of type {', '.join(missing)} in the source")
+        weights = {name: weight for name, weight in mix.items() if weight > 0}
+    else:
+        weights = {name: len(lines) for name, lines in pools.items()}
+
+    rng = random.Random(seed)
+    types = list(weights)
+    schedule = rng.choices(types, weights=[weights[t] for t in types], k=4096)
+    cursors = dict.fromkeys(types, 0)
+
+    while True:
+        for log_type in schedule:
+            lines = pools[log_type]
+            i = cursors[log_type]
+            cursors[log_type] = i + 1 if i + 1 < len(lines) else 0
+            yield log_type, lines[i]
+
+
+class TokenBucket:
+    """Token-bucket pacer. reserve(n) returns how long to wait before sending n events."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+
+    def reserve(self, n: int) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens -= n
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class LoadStats:
+    """Counters for one sender; merged across senders for the final report."""
+
+    def __init__(self):
+        self.sent = 0
+        self.errors = 0
+        self.bytes = 0
+        self.per_type = Counter()
+
+    def merge(self, other: "LoadStats"):
+        self.sent += other.sent
+        self.errors += other.errors
+        self.bytes += other.bytes
+        self.per_type.update(other.per_type)
+
+    def to_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "per_type": dict(self.per_type),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LoadStats":
+        stats = cls()
+        stats.sent = data["sent"]
+        stats.errors = data["errors"]
+        stats.bytes = data["bytes"]
+        stats.per_type.update(data["per_type"])
+        return stats
+
+
+def _next_batch(stream, batch: int) -> tuple[tuple[str, ...], tuple[bytes, ...]]:
+    types, payloads = zip(*itertools.islice(stream, batch))
+    return types, payloads
+
+
+def udp_sender(worker_id, host, port, rate, duration, batch, stream_factory, results):
+    """UDP sender process: paced bursts of datagrams from its own socket.
+
+    Each datagram is still one send() call: Python's socket module has no
+    sendmmsg(), and UDP GSO needs equal-sized segments, which log lines are
+    not. The burst is a tight loop over pre-encoded payloads on a connected
+    socket, with the counters updated once per burst.
+    """
+    stream = stream_factory(worker_id)
+    stats = LoadStats()
+    bucket = TokenBucket(rate, max(batch, rate * 0.01))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, UDP_SNDBUF)
+    except OSError:
+        pass
+    sock.connect((host, port))
+    send = sock.send
+
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            wait = bucket.reserve(batch)
+            if wait > 0:
+                time.sleep(wait)
+            types, payloads = _next_batch(stream, batch)
+            failed = []
+            for i, payload in enumerate(payloads):
+                try:
+                    send(payload)
+                except OSError:
+                    failed.append(i)
+            stats.per_type.update(types)
+            stats.bytes += sum(map(len, payloads))
+            stats.sent += batch - len(failed)
+            stats.errors += len(failed)
+            for i in failed:
+                stats.per_type[types[i]] -= 1
+                stats.bytes -= len(payloads[i])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        results.put(stats.to_dict())
+
+
+async def _tcp_sender(worker_id, host, port, rate, deadline, batch, stream_factory, stats):
+    """One asyncio TCP connection writing newline-framed batches."""
+    stream = stream_factory(worker_id)
+    bucket = TokenBucket(rate, max(batch, rate * 0.01))
+    writer = None
+
+    while time.monotonic() < deadline:
+        if writer is None:
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                stats.errors += batch
+                await asyncio.sleep(1)
+                continue
+
+        wait = bucket.reserve(batch)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        types, payloads = _next_batch(stream, batch)
+        data = b"\n".join(payloads) + b"\n"
+        try:
+            writer.write(data)
+            await writer.drain()
+        except OSError:
+            stats.errors += batch
+            writer.close()
+            writer = None
+            continue
+        stats.sent += batch
+        stats.bytes += len(data)
+        stats.per_type.update(types)
+
+    if writer is not None:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def _run_tcp_load(host, port, rate, duration, senders, batch, stream_factory) -> LoadStats:
+    deadline = time.monotonic() + duration
+    per_sender = [LoadStats() for _ in range(senders)]
+    await asyncio.gather(*(
+        _tcp_sender(i, host, port, rate / senders, deadline, batch, stream_factory, per_sender[i])
+        for i in range(senders)
+    ))
+    total = LoadStats()
+    for stats in per_sender:
+        total.merge(stats)
+    return total
+
+
+def _run_udp_load(host, port, rate, duration, senders, batch, stream_factory) -> LoadStats:
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(
+            target=udp_sender,
+            args=(i, host, port, rate / senders, duration, batch, stream_factory, results),
+        )
+        for i in range(senders)
+    ]
+    for proc in procs:
+        proc.start()
+
+    total = LoadStats()
+    try:
+        for _ in procs:
+            total.merge(LoadStats.from_dict(results.get()))
+    except KeyboardInterrupt:
+        print("\nInterrupted by user, collecting sender results...")
+        for _ in procs:
+            total.merge(LoadStats.from_dict(results.get()))
+    for proc in procs:
+        proc.join()
+    return total
+
+
+def run_load(
+    stream_factory,
+    host: str,
+    port: int,
+    rate: float,
+    duration: float,
+    senders: int,
+    batch: int,
+    use_tcp: bool,
+) -> LoadStats:
+    """Drive a fixed-EPS load across N senders and print the achieved rate.
+
+    stream_factory(worker_id) must return an iterator of (log_type, bytes);
+    it is called once inside each sender so UDP worker processes build their
+    own stream instead of sharing one through a pipe.
+    """
+    proto = "TCP" if use_tcp else "UDP"
+    print(f"Load mode: {rate:,.0f} EPS target to {host}:{port} ({proto}), "
+          f"{senders} sender(s), batch {batch}, {duration:g}s")
+
+    start = time.monotonic()
+    if use_tcp:
+        try:
+            stats = asyncio.run(_run_tcp_load(host, port, rate, duration, senders, batch, stream_factory))
+        except KeyboardInterrupt:
+            print("\nInterrupted by user")
+            sys.exit(1)
+    else:
+        stats = _run_udp_load(host, port, rate, duration, senders, batch, stream_factory)
+    elapsed = time.monotonic() - start
+
+    print_load_report(stats, rate, elapsed)
+    return stats
+
+
+def print_load_report(stats: LoadStats, rate: float, elapsed: float):
+    """Print achieved EPS, errors and per-type counts for a load run."""
+    achieved = stats.sent / elapsed if elapsed > 0 else 0.0
+    print()
+    print("=" * 60)
+    print("Load Summary")
+    print("=" * 60)
+    print(f"Elapsed:        {elapsed:.2f}s")
+    print(f"Target EPS:     {rate:,.0f}")
+    print(f"Achieved EPS:   {achieved:,.0f} ({achieved / rate * 100:.1f}% of target)")
+    print(f"Sent:           {stats.sent:,}")
+    print(f"Send errors:    {stats.errors:,}")
+    print(f"Throughput:     {stats.bytes / elapsed / 1e6:.2f} MB/s" if elapsed > 0 else "Throughput:     n/a")
+    print()
+    print("Per-type counts:")
+    for log_type, count in stats.per_type.most_common():
+        share = count / stats.sent * 100 if stats.sent else 0.0
+        print(f"  {log_type:12} {count:>12,}  ({share:5.1f}%)")
+
+
+class PoolStreamFactory:
+    """Picklable stream factory over pre-loaded sample pools (one seed per sender)."""
+
+    def __init__(self, pools, mix, seed):
+        self.pools = pools
+        self.mix = mix
+        self.seed = seed
+
+    def __call__(self, worker_id):
+        return event_stream(self.pools, self.mix, self.seed + worker_id)
+
+
+class SyntheticStreamFactory:
+    """Picklable stream factory over the synthetic generator (one stream per sender)."""
+
+    def __init__(self, args, mix):
+        self.args = args
+        self.mix = mix
+
+    def __call__(self, worker_id):
+        gen = generator_from_args(self.args, worker=worker_id)
+        return ((log_type, line.encode("utf-8")) for log_type, line in gen.events(self.mix))
+
+
 def send_udp(sock: socket.socket, host: str, port: int, message: str):
     """Send message via UDP."""
     sock.sendto(message.encode("utf-8"), (host, port))
@@ -71,7 +436,7 @@ def send_tcp(sock: socket.socket, message: str):
 
 
 def stream_logs(
-    logs: list[str],
+    logs,
     host: str,
     port: int,
     delay: float,
@@ -79,7 +444,11 @@ def stream_logs(
     loop: bool,
     verbose: bool,
 ):
-    """Stream logs to the target endpoint."""
+    """Stream logs to the target endpoint.
+
+    logs may be a list (replayed on --loop) or any iterable consumed lazily.
+    """
+    total = len(logs) if isinstance(logs, list) else None
     if use_tcp:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
@@ -101,20 +470,23 @@ def stream_logs(
             if loop:
                 print(f"\n--- Iteration {iteration} ---")
 
+            sent = 0
+            of_total = f"/{total}" if total is not None else ""
             for i, log in enumerate(logs, 1):
+                if delay > 0 and i > 1:
+                    time.sleep(delay)
+
                 if verbose:
                     # Truncate long lines for display
                     display = log[:100] + "..." if len(log) > 100 else log
-                    print(f"[{i}/{len(logs)}] {display}")
+                    print(f"[{i}{of_total}] {display}")
                 else:
-                    print(f"\rSent {i}/{len(logs)} logs", end="", flush=True)
+                    print(f"\rSent {i}{of_total} logs", end="", flush=True)
 
                 send_func(log)
+                sent = i
 
-                if delay > 0 and i < len(logs):
-                    time.sleep(delay)
-
-            print(f"\nSent {len(logs)} log(s) to {host}:{port}")
+            print(f"\nSent {sent} log(s) to {host}:{port}")
 
             if not loop:
                 break
@@ -129,6 +501,46 @@ def stream_logs(
         sock.close()
 
 
+def run_synthetic(parser: argparse.ArgumentParser, args, trace: TraceRun = None) -> Counter:
+    """Stream lazily generated logs, either paced (--rate) or one by one."""
+    mix = {args.filter: 1} if args.filter else (args.mix or DEFAULT_MIX)
+    try:
+        generator_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Synthetic source: seed={args.seed} gateways={args.gateways} flows={args.flows} "
+          f"sessions={args.sessions or 'unbounded'}")
+
+    if args.rate:
+        if args.rate <= 0 or args.senders < 1 or args.batch < 1:
+            parser.error("--rate, --senders and --batch must be positive")
+        stream_factory = SyntheticStreamFactory(args, mix)
+        stats = run_load(
+            stream_factory=trace.wrap_factory(stream_factory) if trace else stream_factory,
+            host=args.target,
+            port=args.port,
+            rate=args.rate,
+            duration=args.duration,
+            senders=args.senders,
+            batch=args.batch,
+            use_tcp=args.tcp,
+        )
+        return stats.per_type
+
+    lines = (line for _, line in generator_from_args(args).events(mix))
+    lines = itertools.islice(lines, None if args.loop else args.count)
+    stream_logs(
+        logs=trace.lines(lines) if trace else lines,
+        host=args.target,
+        port=args.port,
+        delay=args.delay,
+        use_tcp=args.tcp,
+        loop=False,
+        verbose=args.verbose,
+    )
+    return trace.sent if trace else None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Stream test logs to a syslog endpoint",
@@ -143,12 +555,31 @@ Log type filters:
   netstats   - AviatrixGwNetStats gateway network stats
   sysstats   - AviatrixGwSysStats gateway system stats
   tunnel     - AviatrixTunnelStatusChange tunnel state
+  vpn        - AviatrixVPNSession VPN connect/disconnect
 
 Examples:
   ./stream-logs.py                           # Stream all to localhost:5000 UDP
   ./stream-logs.py --filter microseg         # Only microseg logs
   ./stream-logs.py --target 10.0.0.5 --tcp   # TCP to custom host
   ./stream-logs.py --loop --delay 1          # Continuous with 1s delay
+
+Load mode:
+  ./stream-logs.py --rate 200000 --senders 8 --duration 60
+  ./stream-logs.py --rate 50000 --tcp --mix microseg=70,netstats=20,suricata=10
+
+Synthetic source:
+  ./stream-logs.py --source synthetic --count 5000 --delay 0
+  ./stream-logs.py --source synthetic --filter microseg --loop --delay 0.01
+  ./stream-logs.py --source synthetic --rate 100000 --duration 3600 --flows 5000000
+
+Replay source:
+  ./stream-logs.py --source replay --file capture.log.gz            # real time
+  ./stream-logs.py --source replay --file capture.log --speed 10    # 10x, bursts kept
+  ./stream-logs.py --source replay --file capture.log --speed 0     # as fast as possible
+
+Tracing:
+  ./trace-collector.py /tmp/logstash-output/logstash-output.jsonl --follow --manifest trace.json &
+  ./stream-logs.py --trace --trace-manifest trace.json --rate 20000 --duration 60
 """,
     )
 
@@ -195,12 +626,81 @@ Examples:
         action="store_true",
         help="Show each log line as it's sent",
     )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Load mode: target events/sec, paced with a token bucket",
+    )
+    parser.add_argument(
+        "--senders",
+        type=int,
+        default=DEFAULT_SENDERS,
+        help=f"Load mode: concurrent senders (processes for UDP, connections for TCP; default: {DEFAULT_SENDERS})",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=DEFAULT_DURATION,
+        help=f"Load mode: seconds to run (default: {DEFAULT_DURATION:g})",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=DEFAULT_BATCH,
+        help=f"Load mode: events per socket write/burst (default: {DEFAULT_BATCH})",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        help="Load mode: per-type weights, e.g. microseg=70,netstats=20,suricata=10",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for the load-mode schedule and synthetic generator (default: 0)",
+    )
+    parser.add_argument(
+        "--source",
+        choices=["file", "synthetic", "replay"],
+        default="file",
+        help="Send --file, generate logs with log_generator.py, or replay --file "
+             "(plain or .gz) on its original timeline (default: file)",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay source: timeline speed-up factor, 0 = as fast as possible (default: 1)",
+    )
+    parser.add_argument(
+        "-n", "--count",
+        type=int,
+        default=1000,
+        help="Synthetic source: logs to send outside load mode; --loop sends forever (default: 1000)",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Embed a run ID and per-type sequence number in each message (see trace-collector.py)",
+    )
+    parser.add_argument(
+        "--run-id",
+        help="Trace run ID, hex (default: random)",
+    )
+    parser.add_argument(
+        "--trace-manifest",
+        type=Path,
+        help="With --trace, write the run ID and per-type sent counts to this JSON file",
+    )
     parser.add_argument(
         "--list-types",
         action="store_true",
         help="List available log types and exit",
     )
 
+    add_generator_args(parser)
+
     args = parser.parse_args()
 
     if args.list_types:
@@ -209,6 +709,42 @@ Examples:
             print(f"  {name:12} - {pattern}")
         sys.exit(0)
 
+    if args.run_id and not re.fullmatch(r"[0-9a-f]+", args.run_id):
+        parser.error("--run-id must be lowercase hex")
+    trace = TraceRun(args.run_id or new_run_id(), classify_log) if args.trace else None
+    if trace:
+        print(f"Tracing run {trace.run_id}")
+
+    sent = send_from_source(parser, args, trace)
+
+    if trace and args.trace_manifest:
+        write_manifest(args.trace_manifest, trace.run_id, sent if sent is not None else trace.sent)
+        print(f"Trace manifest written to {args.trace_manifest}")
+
+
+def send_from_source(parser: argparse.ArgumentParser, args, trace: TraceRun = None) -> Counter:
+    """Send from the selected source; returns per-type counts actually sent when known."""
+    if args.source == "synthetic":
+        return run_synthetic(parser, args, trace)
+
+    if args.source == "replay":
+        if args.speed < 0:
+            parser.error("--speed must be >= 0")
+        if not args.file.exists():
+            print(f"Error: Log file not found: {args.file}", file=sys.stderr)
+            sys.exit(1)
+        line_filter = re.compile(LOG_TYPE_PATTERNS[args.filter].encode()) if args.filter else None
+        replay_capture(
+            path=args.file,
+            host=args.target,
+            port=args.port,
+            speed=args.speed,
+            use_tcp=args.tcp,
+            line_filter=line_filter,
+            transform=trace.stamp_bytes if trace else None,
+        )
+        return trace.sent if trace else None
+
     # Load and filter logs
     logs = load_logs(args.file, args.filter)
 
@@ -221,6 +757,35 @@ Examples:
     if args.filter:
         print(f"Filtered to: {args.filter}")
 
+    if args.rate:
+        if args.rate <= 0 or args.senders < 1 or args.batch < 1:
+            parser.error("--rate, --senders and --batch must be positive")
+        pools = build_pools(logs)
+        try:
+            next(event_stream(pools, args.mix))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        stream_factory = PoolStreamFactory(pools, args.mix, args.seed)
+        stats = run_load(
+            stream_factory=trace.wrap_factory(stream_factory) if trace else stream_factory,
+            host=args.target,
+            port=args.port,
+            rate=args.rate,
+            duration=args.duration,
+            senders=args.senders,
+            batch=args.batch,
+            use_tcp=args.tcp,
+        )
+        return stats.per_type
+
+    if trace:
+        # Stamping makes every pass unique, so --loop becomes one endless lazy stream
+        if args.loop:
+            logs = itertools.chain.from_iterable(itertools.repeat(logs))
+        logs = trace.lines(logs)
+        args.loop = False
+
     # Stream logs
     stream_logs(
         logs=logs,
@@ -231,6 +796,7 @@ Examples:
         loop=args.loop,
         verbose=args.verbose,
     )
+    return trace.sent if trace else None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Trace Collector - measure loss, reordering and latency of traced events end to end.
+
+Reads the JSON-lines events that reach the output (the ci-test output writes
+them to /tmp/logstash-output/logstash-output.jsonl) and matches the avxtrace
+tokens that stream-logs.py --trace embeds in each message.
+
+Reports, per sent log type: received, lost, duplicated and reordered events;
+per output tag (microseg, suricata, mitm, gw_net_stats, ...): p50/p95/p99/max
+latency from send to arrival at the collector.
+
+Usage:
+    # Terminal 1: follow the output, stop after 10s without new events
+    ./trace-collector.py /tmp/logstash-output/logstash-output.jsonl --follow --manifest trace.json
+
+    # Terminal 2: send traced load
+    ./stream-logs.py --source synthetic --rate 20000 --duration 60 --trace --trace-manifest trace.json
+
+    # Gate on loss in CI
+    ./trace-collector.py out.jsonl --manifest trace.json --max-loss 0.1
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from e2e_trace import TRACE_RE
+
+# Output tags reported for latency, in priority order when an event has several
+TRACKED_TAGS = [
+    "suricata", "mitm", "fqdn", "microseg", "cmd", "gw_net_stats", "gw_sys_stats",
+    "tunnel_status", "vpn_session",
+]
+
+POLL_INTERVAL = 0.01
+
+
+class SeqTracker:
+    """Unique/duplicate/reorder accounting for one (log_type, stream) sequence, as a bitmap."""
+
+    def __init__(self):
+        self.seen = bytearray()
+        self.unique = 0
+        self.dups = 0
+        self.reordered = 0
+        self.max_seq = -1
+
+    def add(self, seq: int):
+        byte, bit = divmod(seq, 8)
+        if byte >= len(self.seen):
+            self.seen.extend(bytes(max(byte + 1 - len(self.seen), len(self.seen))))
+        if self.seen[byte] & (1 << bit):
+            self.dups += 1
+            return
+        self.seen[byte] |= 1 << bit
+        self.unique += 1
+        if seq < self.max_seq:
+            self.reordered += 1
+        else:
+            self.max_seq = seq
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+class Collector:
+    def __init__(self, run_id: str = None):
+        self.run_id = run_id
+        self.sequences = defaultdict(SeqTracker)   # (log_type, stream) -> tracker
+        self.latency = defaultdict(lambda: array("d"))  # output tag -> ms
+        self.events = 0
+        self.untraced = 0
+        self.other_runs = 0
+
+    def feed(self, raw: bytes, arrival_us: int):
+        m = TRACE_RE.search(raw)
+        if not m:
+            self.untraced += 1
+            return
+        run_id = m.group(1).decode()
+        if self.run_id is None:
+            self.run_id = run_id
+            print(f"Tracking run {run_id}", file=sys.stderr)
+        elif run_id != self.run_id:
+            self.other_runs += 1
+            return
+
+        log_type = m.group(2).decode()
+        stream, seq, send_us = int(m.group(3)), int(m.group(4)), int(m.group(5))
+        self.events += 1
+        self.sequences[(log_type, stream)].add(seq)
+
+        try:
+            tags = json.loads(raw).get("tags") or []
+        except ValueError:
+            tags = []
+        tag = next((t for t in TRACKED_TAGS if t in tags), "untagged")
+        self.latency[tag].append((arrival_us - send_us) / 1000)
+
+    def per_type(self) -> dict:
+        totals = {}
+        for (log_type, _), tracker in self.sequences.items():
+            t = totals.setdefault(log_type, Counter())
+            t["received"] += tracker.unique
+            t["dups"] += tracker.dups
+            t["reordered"] += tracker.reordered
+            t["expected"] += tracker.max_seq + 1
+        return totals
+
+    def report(self, manifest: dict = None) -> dict:
+        sent = (manifest or {}).get("sent", {})
+        types = self.per_type()
+        summary = {"run_id": self.run_id, "events": self.events, "types": {}, "tags": {}}
+        for log_type in sorted(set(types) | set(sent)):
+            t = types.get(log_type, Counter())
+            expected = sent.get(log_type, t["expected"])
+            lost = max(0, expected - t["received"])
+            summary["types"][log_type] = {
+                "sent": expected,
+                "received": t["received"],
+                "lost": lost,
+                "loss_pct": lost / expected * 100 if expected else 0.0,
+                "dups": t["dups"],
+                "reordered": t["reordered"],
+            }
+        for tag, values in sorted(self.latency.items()):
+            ordered = sorted(values)
+            summary["tags"][tag] = {
+                "events": len(ordered),
+                "p50_ms": percentile(ordered, 50),
+                "p95_ms": percentile(ordered, 95),
+                "p99_ms": percentile(ordered, 99),
+                "max_ms": ordered[-1] if ordered else 0.0,
+            }
+        return summary
+
+
+def print_report(summary: dict, manifest_used: bool):
+    print("=" * 60)
+    print(f"Trace Summary (run {summary['run_id']})")
+    print("=" * 60)
+    basis = "manifest" if manifest_used else "max seq seen"
+    print(f"Loss per sent type (sent counts from {basis}):")
+    print(f"  {'type':12} {'sent':>10} {'received':>10} {'lost':>8} {'loss%':>7} {'dups':>8} {'reorder':>8}")
+    for log_type, t in summary["types"].items():
+        print(f"  {log_type:12} {t['sent']:>10,} {t['received']:>10,} {t['lost']:>8,} "
+              f"{t['loss_pct']:>6.2f}% {t['dups']:>8,} {t['reordered']:>8,}")
+    print()
+    print("Latency per output tag (send -> output, ms):")
+    print(f"  {'tag':14} {'events':>10} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for tag, t in summary["tags"].items():
+        print(f"  {tag:14} {t['events']:>10,} {t['p50_ms']:>9.1f} {t['p95_ms']:>9.1f} "
+              f"{t['p99_ms']:>9.1f} {t['max_ms']:>9.1f}")
+
+
+def read_lines(source: Path, follow: bool, idle: float, from_start: bool):
+    """Yield (line, arrival_us). In follow mode, stop after `idle` seconds without data."""
+    if str(source) == "-":
+        for line in sys.stdin.buffer:
+            yield line, time.time_ns() // 1000
+        return
+
+    while follow and not source.exists():
+        time.sleep(POLL_INTERVAL)
+    with open(source, "rb") as f:
+        if follow and not from_start:
+            f.seek(0, 2)
+        pending = b""
+        last_data = time.monotonic()
+        while True:
+            chunk = f.read(1 << 20)
+            if chunk:
+                arrival = time.time_ns() // 1000
+                last_data = time.monotonic()
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    yield line, arrival
+                continue
+            if not follow or time.monotonic() - last_data > idle:
+                break
+            time.sleep(POLL_INTERVAL)
+        if pending:
+            yield pending, time.time_ns() // 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report loss, reordering and latency of stream-logs.py --trace events",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  ./trace-collector.py /tmp/logstash-output/logstash-output.jsonl --follow
+  ./trace-collector.py out.jsonl --manifest trace.json --json summary.json
+  docker logs -f logstash | ./trace-collector.py -
+""",
+    )
+    parser.add_argument("output", type=Path, help="JSON-lines output file to read, or - for stdin")
+    parser.add_argument("--follow", action="store_true",
+                        help="Tail the file (starting at its current end) until --idle seconds pass without data")
+    parser.add_argument("--from-start", action="store_true", help="With --follow, read existing content too")
+    parser.add_argument("--idle", type=float, default=10.0, help="Follow mode idle timeout in seconds (default: 10)")
+    parser.add_argument("--run-id", help="Only count this run (default: first run seen)")
+    parser.add_argument("--manifest", type=Path,
+                        help="stream-logs.py --trace-manifest file; gives exact sent counts (read at the end)")
+    parser.add_argument("--json", type=Path, help="Also write the summary as JSON to this path")
+    parser.add_argument("--max-loss", type=float,
+                        help="Exit non-zero if any type loses more than this percentage")
+    args = parser.parse_args()
+
+    if str(args.output) != "-" and not args.follow and not args.output.exists():
+        print(f"Error: Output file not found: {args.output}", file=sys.stderr)
+        sys.exit(1)
+
+    collector = Collector(args.run_id)
+    try:
+        for line, arrival in read_lines(args.output, args.follow, args.idle, args.from_start):
+            collector.feed(line, arrival)
+    except KeyboardInterrupt:
+        print("\nInterrupted, reporting what was collected", file=sys.stderr)
+
+    if collector.events == 0:
+        print("No traced events found (was stream-logs.py run with --trace?)", file=sys.stderr)
+        sys.exit(1)
+
+    manifest = None
+    if args.manifest:
+        if args.manifest.exists():
+            manifest = json.loads(args.manifest.read_text())
+            if manifest.get("run_id") != collector.run_id:
+                print(f"Warning: manifest is for run {manifest.get('run_id')}, "
+                      f"collected run {collector.run_id}; ignoring manifest", file=sys.stderr)
+                manifest = None
+        else:
+            print(f"Warning: manifest not found: {args.manifest}", file=sys.stderr)
+
+    summary = collector.report(manifest)
+    print_report(summary, manifest is not None)
+    if collector.other_runs:
+        print(f"\nIgnored {collector.other_runs:,} event(s) from other runs")
+
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2) + "\n")
+
+    if args.max_loss is not None:
+        worst = max((t["loss_pct"] for t in summary["types"].values()), default=0.0)
+        if worst > args.max_loss:
+            print(f"\nFAIL: loss {worst:.2f}% exceeds --max-loss {args.max_loss}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
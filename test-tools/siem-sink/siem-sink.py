@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+SIEM Sink - lightweight stand-in for every output destination, for throughput benchmarking.
+
+Speaks just enough of each protocol for the Logstash outputs to be satisfied:
+    Splunk HEC           POST /services/collector[/event]      -> {"text":"Success","code":0}
+    Dynatrace metrics    POST /api/v2/metrics/ingest            -> 202 {"linesOk":N,...}
+    Dynatrace logs       POST /api/v2/logs/ingest               -> 204
+    Azure DCR ingestion  POST /dataCollectionRules/<id>/streams/<stream> -> 204
+    Azure AD token       POST /<tenant>/oauth2/v2.0/token       -> fake bearer token
+    Zabbix trapper       TCP "ZBXD" sender data (separate port) -> {"response":"success",...}
+
+Nothing is stored: requests, events, bytes, rejects and injected errors are
+counted per endpoint in constant memory. Latency and error rate can be
+injected globally or per endpoint to exercise backpressure and retries.
+With --trace, the stream-logs.py --trace tokens that reach the sink (in
+outputs that forward the raw message) give end-to-end latency percentiles.
+
+Usage:
+    ./siem-sink.py                                   # HTTP :8088, Zabbix :10051
+    ./siem-sink.py --latency-ms 50 --error-rate 0.01
+    ./siem-sink.py --latency-ms hec=200,default=5 --error-rate zabbix=0.1 --error-status 429
+    curl -s localhost:8088/sink/stats                # counters as JSON
+    curl -s -X POST localhost:8088/sink/reset        # zero the counters
+    ./siem-sink.py --trace                           # + latency of traced events
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import json
+import multiprocessing
+import random
+import re
+import socket
+import ssl
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict
+
+ENDPOINTS = ["hec", "dt-metrics", "dt-logs", "dcr", "aad-token", "zabbix"]
+
+HEC_PATH_RE = re.compile(r"^/services/collector(?:/event(?:/1\.0)?)?/?$")
+DCR_PATH_RE = re.compile(r"^/dataCollectionRules/[^/]+/streams/[^/]+/?$")
+TOKEN_PATH_RE = re.compile(r"^/[^/]+/oauth2(?:/v2\.0)?/token/?$")
+# metric.key[,dim=value|dim="quoted value"...] [gauge,|count,[delta=]]<numbers> [timestamp]
+MINT_LINE_RE = re.compile(
+    rb'^[A-Za-z_][\w.\-:]*(?:,(?:"[^"]*"|[^ "])*)? +(?:gauge,|count,(?:delta=)?)?[-+\d.eE,=a-z]*\d'
+)
+
+# stream-logs.py --trace token, as in sample-logs/e2e_trace.py; group 1 is the send time in us
+TRACE_RE = re.compile(rb"avxtrace=[0-9a-f]+:[a-z_]+:\d+:\d+:(\d+)")
+# Latency histogram bucket upper bounds: 0.1ms to ~160s in 10% steps
+LATENCY_BOUNDS_MS = [0.1 * 1.1 ** i for i in range(150)]
+
+ZBX_HEADER = b"ZBXD"
+ZBX_FLAG_COMPRESSED = 0x02
+ZBX_FLAG_LARGE = 0x04
+
+MAX_HEADER_BYTES = 64 * 1024
+
+# How often each worker publishes its counters to shared memory
+SYNC_INTERVAL = 0.2
+
+HTTP_REASONS = {
+    200: "OK", 202: "Accepted", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class EndpointStats:
+    """Counters for one endpoint (constant memory)."""
+
+    __slots__ = ("requests", "events", "bytes", "rejected", "injected")
+
+    def __init__(self):
+        self.requests = 0
+        self.events = 0
+        self.bytes = 0
+        self.rejected = 0
+        self.injected = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+COUNTERS = EndpointStats.__slots__
+
+
+class SharedCounters:
+    """Per-worker counter slots in shared memory; each worker writes only its own slot."""
+
+    def __init__(self, workers: int, trace: bool = False):
+        self.workers = workers
+        self.width = len(ENDPOINTS) * len(COUNTERS)
+        self.array = multiprocessing.Array("q", workers * self.width, lock=False)
+        self.buckets = len(LATENCY_BOUNDS_MS) if trace else 0
+        self.latency = multiprocessing.Array("q", workers * len(ENDPOINTS) * self.buckets, lock=False)
+        self.generation = multiprocessing.Value("q", 0)
+        self.started = multiprocessing.Value("d", time.time())
+
+    def publish(self, worker: int, stats: dict, latency: dict):
+        base = worker * self.width
+        for i, name in enumerate(ENDPOINTS):
+            s = stats[name]
+            for j, counter in enumerate(COUNTERS):
+                self.array[base + i * len(COUNTERS) + j] = getattr(s, counter)
+        if self.buckets:
+            base = worker * len(ENDPOINTS) * self.buckets
+            for i, name in enumerate(ENDPOINTS):
+                self.latency[base + i * self.buckets:base + (i + 1) * self.buckets] = latency[name]
+
+    def reset(self):
+        with self.generation.get_lock():
+            self.generation.value += 1
+        self.started.value = time.time()
+        for i in range(len(self.array)):
+            self.array[i] = 0
+        for i in range(len(self.latency)):
+            self.latency[i] = 0
+
+    def snapshot(self) -> dict:
+        values = self.array[:]
+        endpoints = {}
+        for i, name in enumerate(ENDPOINTS):
+            endpoints[name] = {
+                counter: sum(values[w * self.width + i * len(COUNTERS) + j] for w in range(self.workers))
+                for j, counter in enumerate(COUNTERS)
+            }
+            if self.buckets:
+                histogram = [0] * self.buckets
+                for w in range(self.workers):
+                    base = (w * len(ENDPOINTS) + i) * self.buckets
+                    for k, n in enumerate(self.latency[base:base + self.buckets]):
+                        histogram[k] += n
+                if any(histogram):
+                    endpoints[name]["latency_ms"] = latency_percentiles(histogram)
+        return {"uptime_s": round(time.time() - self.started.value, 3), "workers": self.workers,
+                "endpoints": endpoints}
+
+
+def latency_percentiles(histogram: list) -> dict:
+    """Samples, p50/p95/p99 and max of a LATENCY_BOUNDS_MS histogram (bucket upper bounds, so <= 10% high)."""
+    total = sum(histogram)
+    result = {"samples": total}
+    for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)):
+        rank, seen = max(1, -(-total * pct // 100)), 0
+        for k, n in enumerate(histogram):
+            seen += n
+            if seen >= rank:
+                result[name] = round(LATENCY_BOUNDS_MS[k], 1)
+                break
+    return result
+
+
+def parse_per_endpoint(spec: str) -> dict[str, float]:
+    """argparse type: '50' applies to all endpoints, 'hec=50,default=5' per endpoint."""
+    values = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, value = part.rpartition("=")
+        name = name.strip() if sep else "default"
+        if name != "default" and name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(
+                f"unknown endpoint '{name}' (valid: default, {', '.join(ENDPOINTS)})"
+            )
+        try:
+            values[name] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid number '{value}' for '{name}'")
+        if values[name] < 0:
+            raise argparse.ArgumentTypeError(f"value for '{name}' must be >= 0")
+    return values
+
+
+class Sink:
+    """One worker's protocol handlers; counters are published to its SharedCounters slot."""
+
+    def __init__(self, args, shared: SharedCounters, worker: int):
+        self.latency_ms = args.latency_ms
+        self.jitter_ms = args.jitter_ms
+        self.error_rate = args.error_rate
+        self.error_status = args.error_status
+        self.zabbix_hosts = args.zabbix_hosts
+        self.zabbix_close = args.zabbix_close
+        self.rng = random.Random(args.seed * 1_000_003 + worker)
+        self.shared = shared
+        self.worker = worker
+        self.generation = shared.generation.value
+        self.stats = OrderedDict((name, EndpointStats()) for name in ENDPOINTS)
+        self.latency = {name: [0] * shared.buckets for name in ENDPOINTS}
+
+    def sync(self):
+        """Pick up resets from other workers and publish this worker's counters."""
+        generation = self.shared.generation.value
+        if generation != self.generation:
+            self.generation = generation
+            self.stats = OrderedDict((name, EndpointStats()) for name in ENDPOINTS)
+            self.latency = {name: [0] * self.shared.buckets for name in ENDPOINTS}
+        self.shared.publish(self.worker, self.stats, self.latency)
+
+    def record_latency(self, endpoint: str, body: bytes):
+        """Count the send-to-sink latency of each traced event in the body."""
+        histogram = self.latency[endpoint]
+        now_us = time.time() * 1e6
+        last = len(histogram) - 1
+        for m in TRACE_RE.finditer(body):
+            ms = (now_us - int(m.group(1))) / 1000
+            histogram[min(bisect.bisect_left(LATENCY_BOUNDS_MS, ms), last)] += 1
+
+    async def sync_loop(self):
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            self.sync()
+
+    def _setting(self, table: dict, endpoint: str) -> float:
+        return table.get(endpoint, table.get("default", 0.0))
+
+    async def delay_and_inject(self, endpoint: str) -> bool:
+        """Apply configured latency; return True if this request should fail."""
+        latency = self._setting(self.latency_ms, endpoint)
+        if latency or self.jitter_ms:
+            await asyncio.sleep((latency + self.rng.uniform(0, self.jitter_ms)) / 1000)
+        rate = self._setting(self.error_rate, endpoint)
+        if rate and self.rng.random() < rate:
+            self.stats[endpoint].injected += 1
+            return True
+        return False
+
+    # --- HTTP ---
+
+    async def handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, b"", close=True)
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, b"", close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                if headers.get("transfer-encoding", "").lower() == "chunked":
+                    body = await self._read_chunked(reader)
+                else:
+                    body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+                encoding = headers.get("content-encoding", "").lower()
+                try:
+                    if encoding == "gzip":
+                        body = gzip.decompress(body)
+                    elif encoding == "deflate":
+                        body = zlib.decompress(body)
+                except (OSError, zlib.error):
+                    await self._respond(writer, 400, b'{"error":"bad content-encoding"}')
+                    continue
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version.upper() != "HTTP/1.0"
+                )
+                status, resp_headers, resp_body = await self.route(method.upper(), target, body)
+                await self._respond(writer, status, resp_body, resp_headers, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                await reader.readline()
+                return b"".join(parts)
+            parts.append(await reader.readexactly(size))
+            await reader.readline()
+
+    async def _respond(self, writer, status: int, body: bytes, headers: dict = None, close: bool = False):
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}", f"Content-Length: {len(body)}"]
+        if body:
+            head.append("Content-Type: application/json")
+        for name, value in (headers or {}).items():
+            head.append(f"{name}: {value}")
+        if close:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def route(self, method: str, target: str, body: bytes):
+        path = target.split("?", 1)[0]
+
+        if path == "/sink/stats" and method == "GET":
+            self.sync()
+            return 200, None, json.dumps(self.shared.snapshot()).encode()
+        if path == "/sink/reset" and method == "POST":
+            self.shared.reset()
+            self.sync()
+            return 200, None, b'{"reset":true}'
+        if path == "/services/collector/health" and method == "GET":
+            return 200, None, b'{"text":"HEC is healthy","code":17}'
+
+        if HEC_PATH_RE.match(path):
+            endpoint, handler = "hec", self.hec
+        elif path.rstrip("/") == "/api/v2/metrics/ingest":
+            endpoint, handler = "dt-metrics", self.dt_metrics
+        elif path.rstrip("/") == "/api/v2/logs/ingest":
+            endpoint, handler = "dt-logs", self.dt_logs
+        elif DCR_PATH_RE.match(path):
+            endpoint, handler = "dcr", self.dcr
+        elif TOKEN_PATH_RE.match(path):
+            endpoint, handler = "aad-token", self.aad_token
+        else:
+            return 404, None, b'{"error":"unknown endpoint"}'
+        if method != "POST":
+            return 405, None, b""
+
+        stats = self.stats[endpoint]
+        stats.requests += 1
+        stats.bytes += len(body)
+        if await self.delay_and_inject(endpoint):
+            return self.error_status, {"Retry-After": "1"}, b'{"error":"injected failure"}'
+        status, resp_body, events = handler(body)
+        if status >= 400:
+            stats.rejected += 1
+        else:
+            stats.events += events
+            if self.shared.buckets:
+                self.record_latency(endpoint, body)
+        return status, None, resp_body
+
+    # --- protocol handlers: return (status, body, events) ---
+
+    def hec(self, body: bytes):
+        decoder = json.JSONDecoder()
+        text = body.decode("utf-8", "replace")
+        pos, events = 0, 0
+        while True:
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos >= len(text):
+                break
+            try:
+                obj, pos = decoder.raw_decode(text, pos)
+            except ValueError:
+                return 400, b'{"text":"Invalid data format","code":6,"invalid-event-number":%d}' % events, 0
+            if not isinstance(obj, dict) or "event" not in obj:
+                return 400, b'{"text":"Event field is required","code":12,"invalid-event-number":%d}' % events, 0
+            events += 1
+        if events == 0:
+            return 400, b'{"text":"No data","code":5}', 0
+        return 200, b'{"text":"Success","code":0}', events
+
+    def dt_metrics(self, body: bytes):
+        ok = invalid = 0
+        for line in body.split(b"\n"):
+            line = line.strip()
+            if not line or line.startswith(b"#"):
+                continue
+            if MINT_LINE_RE.match(line):
+                ok += 1
+            else:
+                invalid += 1
+        if invalid:
+            resp = {"linesOk": ok, "linesInvalid": invalid,
+                    "error": {"code": 400, "message": f"{invalid} invalid lines"}}
+            return 400, json.dumps(resp).encode(), 0
+        return 202, json.dumps({"linesOk": ok, "linesInvalid": 0, "error": None}).encode(), ok
+
+    def dt_logs(self, body: bytes):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, b'{"error":{"code":400,"message":"Invalid JSON"}}', 0
+        events = len(payload) if isinstance(payload, list) else 1
+        return 204, b"", events
+
+    def dcr(self, body: bytes):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, b'{"error":{"code":"InvalidRequestBody","message":"Invalid JSON"}}', 0
+        if not isinstance(payload, list):
+            return 400, b'{"error":{"code":"InvalidRequestBody","message":"Expected a JSON array"}}', 0
+        return 204, b"", len(payload)
+
+    def aad_token(self, body: bytes):
+        token = {"token_type": "Bearer", "expires_in": 3599, "ext_expires_in": 3599, "access_token": "siem-sink"}
+        return 200, json.dumps(token).encode(), 0
+
+    # --- Zabbix trapper ---
+
+    async def handle_zabbix(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(5)
+                except asyncio.IncompleteReadError:
+                    break
+                if header[:4] != ZBX_HEADER:
+                    break
+                flags = header[4]
+                if flags & ZBX_FLAG_LARGE:
+                    datalen, reserved = struct.unpack("<QQ", await reader.readexactly(16))
+                else:
+                    datalen, reserved = struct.unpack("<II", await reader.readexactly(8))
+                data = await reader.readexactly(datalen)
+                # Looked up per request so /sink/reset takes effect on open connections
+                stats = self.stats["zabbix"]
+                stats.requests += 1
+                stats.bytes += 5 + (16 if flags & ZBX_FLAG_LARGE else 8) + datalen
+
+                if await self.delay_and_inject("zabbix"):
+                    response = {"response": "failed", "info": "injected failure"}
+                else:
+                    response = self.zabbix_data(data, flags, stats)
+                payload = json.dumps(response).encode()
+                writer.write(ZBX_HEADER + b"\x01" + struct.pack("<II", len(payload), 0) + payload)
+                await writer.drain()
+                if self.zabbix_close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def zabbix_data(self, data: bytes, flags: int, stats: EndpointStats) -> dict:
+        try:
+            if flags & ZBX_FLAG_COMPRESSED:
+                data = zlib.decompress(data)
+            request = json.loads(data)
+            items = request["data"] if request.get("request") == "sender data" else None
+        except (ValueError, KeyError, zlib.error, TypeError):
+            items = None
+        if not isinstance(items, list):
+            stats.rejected += 1
+            return {"response": "failed", "info": "invalid request"}
+        # Like Zabbix, items for hosts that do not exist fail individually
+        failed = 0
+        if self.zabbix_hosts is not None:
+            failed = sum(1 for item in items if not isinstance(item, dict) or item.get("host") not in self.zabbix_hosts)
+            stats.rejected += failed
+        stats.events += len(items) - failed
+        return {
+            "response": "success",
+            "info": f"processed: {len(items) - failed}; failed: {failed}; total: {len(items)}; seconds spent: 0.000050",
+        }
+
+
+def report_loop(shared: SharedCounters, interval: float, procs):
+    """Print per-endpoint rates from the shared counters until all workers exit."""
+    previous = {}
+    while any(proc.is_alive() for proc in procs):
+        time.sleep(interval)
+        active = []
+        for name, s in shared.snapshot()["endpoints"].items():
+            prev_req, prev_ev = previous.get(name, (0, 0))
+            if s["requests"] > prev_req:
+                active.append(
+                    f"{name}: {(s['requests'] - prev_req) / interval:,.0f} req/s "
+                    f"{(s['events'] - prev_ev) / interval:,.0f} ev/s"
+                )
+            previous[name] = (s["requests"], s["events"])
+        if active:
+            print(f"[{time.strftime('%H:%M:%S')}] " + " | ".join(active), flush=True)
+
+
+def print_summary(shared: SharedCounters):
+    snap = shared.snapshot()
+    uptime = snap["uptime_s"] or 1
+    print()
+    print("=" * 60)
+    print("Sink Summary")
+    print("=" * 60)
+    print(f"Uptime: {uptime:,.1f}s  Workers: {snap['workers']}")
+    print(f"  {'endpoint':11} {'requests':>10} {'events':>12} {'ev/s':>10} {'MB':>9} {'rejected':>9} {'injected':>9}"
+          + (f" {'p99 ms':>9}" if shared.buckets else ""))
+    for name, s in snap["endpoints"].items():
+        if not s["requests"]:
+            continue
+        p99 = f" {s['latency_ms']['p99']:>9,.1f}" if "latency_ms" in s else f" {'-':>9}" if shared.buckets else ""
+        print(f"  {name:11} {s['requests']:>10,} {s['events']:>12,} {s['events'] / uptime:>10,.0f} "
+              f"{s['bytes'] / 1e6:>9,.2f} {s['rejected']:>9,} {s['injected']:>9,}{p99}")
+
+
+def listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+async def serve(args, sink: Sink, http_sock: socket.socket, zabbix_sock: socket.socket):
+    ssl_ctx = None
+    if args.tls_cert:
+        ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_ctx.load_cert_chain(args.tls_cert, args.tls_key)
+
+    servers = [await asyncio.start_server(sink.handle_http, sock=http_sock, ssl=ssl_ctx, limit=MAX_HEADER_BYTES)]
+    if zabbix_sock is not None:
+        servers.append(await asyncio.start_server(sink.handle_zabbix, sock=zabbix_sock))
+    syncer = asyncio.create_task(sink.sync_loop())
+    try:
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+    finally:
+        syncer.cancel()
+        sink.sync()
+
+
+def worker_main(args, shared: SharedCounters, worker: int, http_sock, zabbix_sock):
+    sink = Sink(args, shared, worker)
+    try:
+        asyncio.run(serve(args, sink, http_sock, zabbix_sock))
+    except KeyboardInterrupt:
+        sink.sync()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lightweight SIEM stand-in (HEC, Dynatrace, Azure DCR, Zabbix) for benchmarking outputs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Endpoints:
+  hec         POST /services/collector/event    Splunk HEC (concatenated JSON events)
+  dt-metrics  POST /api/v2/metrics/ingest       Dynatrace MINT lines
+  dt-logs     POST /api/v2/logs/ingest          Dynatrace JSON object or array
+  dcr         POST /dataCollectionRules/<id>/streams/<stream>   Azure Logs Ingestion
+  aad-token   POST /<tenant>/oauth2/v2.0/token  Fake Azure AD token
+  zabbix      TCP  --zabbix-port                Zabbix trapper "sender data"
+
+Pointing the outputs at the sink:
+  SPLUNK_ADDRESS=http://localhost SPLUNK_PORT=8088
+  DT_METRICS_URL=http://localhost:8088/api/v2/metrics/ingest
+  DT_LOGS_URL=http://localhost:8088/api/v2/logs/ingest
+  ZABBIX_SERVER=localhost ZABBIX_PORT=10051
+  data_collection_endpoint=http://localhost:8088
+
+Examples:
+  ./siem-sink.py --latency-ms 50 --jitter-ms 20
+  ./siem-sink.py --error-rate hec=0.05 --error-status 429
+  ./siem-sink.py --zabbix-hosts gw-1,gw-2 --zabbix-close
+  ./siem-sink.py --trace          # with stream-logs.py --trace: latency per endpoint
+  curl -s localhost:8088/sink/stats | jq .
+""",
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Listen address (default: 0.0.0.0)")
+    parser.add_argument("--http-port", type=int, default=8088, help="HTTP port for all HTTP endpoints (default: 8088)")
+    parser.add_argument("--zabbix-port", type=int, default=10051, help="Zabbix trapper port, 0 to disable (default: 10051)")
+    parser.add_argument("--latency-ms", type=parse_per_endpoint, default={},
+                        help="Injected response latency: N, or per endpoint e.g. hec=100,default=5")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform random latency 0..N ms")
+    parser.add_argument("--error-rate", type=parse_per_endpoint, default={},
+                        help="Fraction of requests to fail: N, or per endpoint e.g. zabbix=0.1")
+    parser.add_argument("--error-status", type=int, default=503, choices=[429, 500, 503],
+                        help="HTTP status for injected failures (default: 503)")
+    parser.add_argument("--zabbix-hosts", type=lambda v: set(filter(None, v.split(","))),
+                        help="Comma-separated Zabbix host names that exist; items for other hosts fail")
+    parser.add_argument("--zabbix-close", action="store_true",
+                        help="Close each trapper connection after one response, as Zabbix server does")
+    parser.add_argument("--tls-cert", help="Serve HTTPS with this certificate (PEM)")
+    parser.add_argument("--tls-key", help="Private key for --tls-cert")
+    parser.add_argument("--report-interval", type=float, default=5.0,
+                        help="Seconds between rate lines, 0 to disable (default: 5)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes sharing the listening sockets (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for injected latency/errors (default: 0)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record send-to-sink latency of stream-logs.py --trace events (p50/p95/p99 in /sink/stats)")
+    args = parser.parse_args()
+
+    if bool(args.tls_cert) != bool(args.tls_key):
+        parser.error("--tls-cert and --tls-key must be given together")
+    if any(v > 1 for v in args.error_rate.values()):
+        parser.error("--error-rate values must be between 0 and 1")
+
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+
+    try:
+        http_sock = listen(args.host, args.http_port)
+        zabbix_sock = listen(args.host, args.zabbix_port) if args.zabbix_port else None
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    scheme = "https" if args.tls_cert else "http"
+    print(f"HTTP sink listening on {scheme}://{args.host}:{args.http_port}")
+    if zabbix_sock is not None:
+        print(f"Zabbix trapper listening on {args.host}:{args.zabbix_port}")
+    print(f"Workers: {args.workers}  latency ms: {args.latency_ms or 0}  jitter: {args.jitter_ms:g}  "
+          f"error rate: {args.error_rate or 0}  error status: {args.error_status}", flush=True)
+
+    # Workers are forked so they inherit the listening sockets
+    ctx = multiprocessing.get_context("fork")
+    shared = SharedCounters(args.workers, args.trace)
+    procs = [
+        ctx.Process(target=worker_main, args=(args, shared, i, http_sock, zabbix_sock), daemon=True)
+        for i in range(args.workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    try:
+        if args.report_interval > 0:
+            report_loop(shared, args.report_interval, procs)
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        # Workers get the same SIGINT; give them a moment to publish final counters
+        for proc in procs:
+            proc.join(timeout=2)
+    finally:
+        print_summary(shared)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+UDP Intake Benchmark - datagram loss against offered rate for UDP input settings.
+
+For each setting (SYSLOG_UDP_WORKERS, SYSLOG_UDP_QUEUE_SIZE,
+SYSLOG_UDP_RECEIVE_BUFFER_BYTES of inputs/00-syslog-input.conf) the bench
+starts a SIEM sink (../siem-sink) and Logstash in Docker with host networking,
+then sends stream-logs.py's synthetic corpus over UDP at each rate in turn.
+After each step it waits for the input to drain and reports:
+
+    sent          datagrams the sender handed to the kernel
+    received      events the syslog-udp input passed on (node stats)
+    loss_pct      (sent - received) / sent
+    socket_drops  drops the kernel counted on the port 5000 socket(s)
+                  (/proc/net/udp{,6}); the part of the loss that happened
+                  because the receive buffer was full
+    rcvbuf_errors Udp RcvbufErrors of the host (/proc/net/snmp{,6})
+
+Logstash, the sink and the sender share the host, so the numbers compare
+settings on one box; they are not a node's capacity.
+
+Usage:
+    ./udp-intake-bench.py --dry-run
+    ./udp-intake-bench.py --rates 20000,50000,80000 --duration 30
+    ./udp-intake-bench.py --setting workers=2 --setting workers=4,queue_size=8000,receive_buffer_bytes=33554432
+    ./udp-intake-bench.py --json results.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+ASSEMBLE = ROOT / "logstash-configs" / "scripts" / "assemble-config.sh"
+PATTERNS = ROOT / "logstash-configs" / "patterns"
+SINK = ROOT / "test-tools" / "siem-sink" / "siem-sink.py"
+STREAM = ROOT / "test-tools" / "sample-logs" / "stream-logs.py"
+
+sys.path.insert(0, str(ROOT / "metrics-exporter"))
+from exporter import snmp_udp, udp_sockets  # noqa: E402
+
+
+def load_matrix():
+    """The benchmark matrix's sink settings and Logstash helpers (its file name is not importable)."""
+    path = ROOT / "test-tools" / "benchmark-matrix" / "benchmark-matrix.py"
+    spec = importlib.util.spec_from_file_location("benchmark_matrix", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+matrix = load_matrix()
+
+SYSLOG_PORT = 5000  # inputs/00-syslog-input.conf
+INPUT_ID = "syslog-udp"
+# Setting name -> environment variable, with the input's defaults
+SETTINGS = {
+    "workers": ("SYSLOG_UDP_WORKERS", 2),
+    "queue_size": ("SYSLOG_UDP_QUEUE_SIZE", 2000),
+    "receive_buffer_bytes": ("SYSLOG_UDP_RECEIVE_BUFFER_BYTES", 212992),
+}
+DEFAULT_SETTINGS = [
+    "workers=2,queue_size=2000,receive_buffer_bytes=212992",
+    "workers=4,queue_size=2000,receive_buffer_bytes=212992",
+    "workers=4,queue_size=20000,receive_buffer_bytes=33554432",
+]
+DEFAULT_RATES = "10000,25000,50000,75000,100000"
+
+
+def parse_setting(spec: str) -> dict:
+    setting = {name: default for name, (_, default) in SETTINGS.items()}
+    for part in filter(None, spec.split(",")):
+        name, _, value = part.partition("=")
+        if name not in SETTINGS or not value.isdigit() or int(value) < 1:
+            raise ValueError(f"invalid setting '{part}' (expected {'|'.join(SETTINGS)}=<positive integer>)")
+        setting[name] = int(value)
+    return setting
+
+
+def setting_key(setting: dict) -> str:
+    return f"w={setting['workers']} q={setting['queue_size']} rb={setting['receive_buffer_bytes']}"
+
+
+def rmem_max() -> int:
+    try:
+        return int(Path("/proc/sys/net/core/rmem_max").read_text())
+    except (OSError, ValueError):
+        return 0
+
+
+def kernel_counters() -> tuple[int, int]:
+    """(drops on the syslog port's sockets, host Udp RcvbufErrors)."""
+    drops = sum(d for path in ("/proc/net/udp", "/proc/net/udp6")
+                for _, _, _, d in udp_sockets(path, {SYSLOG_PORT}))
+    errors = snmp_udp("/proc/net/snmp", "Udp").get("RcvbufErrors", 0) + \
+        snmp_udp("/proc/net/snmp6", "Udp6").get("RcvbufErrors", 0)
+    return drops, errors
+
+
+def input_events(api: str) -> int:
+    stats = matrix.http_json(f"{api}/_node/stats/pipelines")
+    return sum((p.get("events") or {}).get("out", 0) for pipeline in stats["pipelines"].values()
+               for p in pipeline["plugins"]["inputs"] if p["id"] == INPUT_ID)
+
+
+def wait_drained(api: str, timeout: float = 120.0) -> int:
+    """Input event count once it stopped changing for three polls."""
+    last, steady = input_events(api), 0
+    deadline = time.monotonic() + timeout
+    while steady < 3 and time.monotonic() < deadline:
+        time.sleep(1)
+        current = input_events(api)
+        steady = steady + 1 if current == last else 0
+        last = current
+    return last
+
+
+def run_setting(setting: dict, conf: Path, args, index: int) -> dict:
+    sink_cmd = [sys.executable, str(SINK), "--host", "127.0.0.1", "--http-port", str(args.sink_port),
+                "--zabbix-port", str(args.zabbix_port), "--report-interval", "0"]
+    env = matrix.output_env(args.type, "127.0.0.1", args.sink_port, args.zabbix_port, False)
+    env.update({
+        "XPACK_MONITORING_ENABLED": "false",
+        "API_HTTP_HOST": "127.0.0.1",
+        "API_HTTP_PORT": str(args.api_port),
+        "LS_JAVA_OPTS": f"-Xms{args.heap} -Xmx{args.heap}",
+    })
+    env.update({SETTINGS[name][0]: str(value) for name, value in setting.items()})
+    if args.pipeline_workers:
+        env["PIPELINE_WORKERS"] = str(args.pipeline_workers)
+    name = f"avx-intake-{os.getpid()}-{index}"
+    docker_cmd = ["docker", "run", "-d", "--rm", "--name", name, "--network", "host",
+                  "-v", f"{conf.parent}:/config:ro", "-v", f"{PATTERNS}:/usr/share/logstash/patterns:ro"]
+    for k, v in env.items():
+        docker_cmd += ["-e", f"{k}={v}"]
+    docker_cmd += [args.image, "logstash", "-f", f"/config/{conf.name}"]
+
+    def stream_cmd(rate: int, duration: int = args.duration) -> list[str]:
+        cmd = [sys.executable, str(STREAM), "--source", "synthetic", "--target", "127.0.0.1",
+               "--port", str(SYSLOG_PORT), "--rate", str(rate), "--duration", str(duration),
+               "--seed", str(args.seed)]
+        return cmd + (["--senders", str(args.senders)] if args.senders else [])
+
+    if args.dry_run:
+        for cmd in (sink_cmd, docker_cmd, stream_cmd(args.rates[0])):
+            print("  " + shlex.join(cmd))
+        return None
+
+    api = f"http://127.0.0.1:{args.api_port}"
+    sink = subprocess.Popen(sink_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    steps = {}
+    try:
+        subprocess.run(docker_cmd, check=True, capture_output=True)
+        matrix.wait_ready(api, name, args.startup_timeout)
+        # The first events go through JIT warm-up; keep them out of the first step
+        subprocess.run(stream_cmd(min(args.rates), 10), capture_output=True)
+        for rate in args.rates:
+            received_before = wait_drained(api)
+            drops_before, errors_before = kernel_counters()
+            result = subprocess.run(stream_cmd(rate), capture_output=True, text=True)
+            sent = re.search(r"^Sent:\s+([\d,]+)", result.stdout, re.M)
+            if result.returncode != 0 or not sent:
+                raise RuntimeError(f"stream-logs.py failed:\n{result.stdout}{result.stderr}")
+            sent = int(sent.group(1).replace(",", ""))
+            send_errors = re.search(r"^Send errors:\s+([\d,]+)", result.stdout, re.M)
+            received = wait_drained(api) - received_before
+            drops, errors = kernel_counters()
+            steps[str(rate)] = {
+                "offered_eps": rate,
+                "sent_eps": round(sent / args.duration),
+                "sent": sent,
+                "send_errors": int(send_errors.group(1).replace(",", "")) if send_errors else 0,
+                "received": received,
+                "loss_pct": round(100.0 * max(sent - received, 0) / sent, 3) if sent else None,
+                "socket_drops": drops - drops_before,
+                "rcvbuf_errors": errors - errors_before,
+            }
+            print(f"  {rate:>8} events/s: loss {steps[str(rate)]['loss_pct']}%", flush=True)
+    finally:
+        subprocess.run(["docker", "rm", "-f", name], capture_output=True)
+        sink.terminate()
+        sink.wait()
+    return steps
+
+
+def print_results(results: dict):
+    print()
+    print("=" * 60)
+    print("UDP Intake Loss")
+    print("=" * 60)
+    print(f"{'setting':<32} {'offered/s':>10} {'sent/s':>9} {'received':>10} {'loss %':>8} {'sock drops':>11}")
+    for key, steps in results.items():
+        for s in steps.values():
+            print(f"{key:<32} {s['offered_eps']:>10d} {s['sent_eps']:>9d} {s['received']:>10d} "
+                  f"{s['loss_pct']:>8.3f} {s['socket_drops']:>11d}")
+    print("\nsent/s below offered/s: the sender was the limit for that step, not Logstash.")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Datagram loss against offered rate for UDP input settings",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--setting", action="append", metavar="SPEC",
+                        help="workers=N,queue_size=N,receive_buffer_bytes=N; missing keys take the input's "
+                             "defaults (repeat for several; default: three settings from default to large)")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help=f"Comma-separated offered events/s (default: {DEFAULT_RATES})")
+    parser.add_argument("--duration", type=int, default=30, help="Seconds of load per rate (default: 30)")
+    parser.add_argument("--senders", type=int, help="stream-logs.py --senders (default: its own)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic corpus seed (default: 0)")
+    parser.add_argument("--type", default="splunk-hec", help="Output type, pointed at the sink (default: splunk-hec)")
+    parser.add_argument("--image", default=matrix.DEFAULT_IMAGE, help=f"Logstash image (default: {matrix.DEFAULT_IMAGE})")
+    parser.add_argument("--heap", default="1g", help="JVM heap, -Xms and -Xmx (default: 1g)")
+    parser.add_argument("--pipeline-workers", type=int, help="PIPELINE_WORKERS (default: Logstash's, one per CPU)")
+    parser.add_argument("--api-port", type=int, default=9600, help="Logstash API port (default: 9600)")
+    parser.add_argument("--sink-port", type=int, default=8088, help="Sink HTTP port (default: 8088)")
+    parser.add_argument("--zabbix-port", type=int, default=10051, help="Sink Zabbix trapper port (default: 10051)")
+    parser.add_argument("--startup-timeout", type=float, default=300.0, help="Seconds to wait for Logstash (default: 300)")
+    parser.add_argument("--json", type=Path, metavar="FILE", help="Also write the results and the host as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Print the commands of each setting and exit")
+    args = parser.parse_args()
+
+    try:
+        settings = [parse_setting(s) for s in (args.setting or DEFAULT_SETTINGS)]
+        args.rates = [int(r) for r in args.rates.split(",") if r]
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.rates or min(args.rates) < 1:
+        parser.error("--rates needs positive events/s")
+    if args.type == "azure-log-ingestion":
+        parser.error("azure-log-ingestion needs a TLS sink; use benchmark-matrix.py for it")
+
+    limit = rmem_max()
+    capped = [s for s in settings if limit and s["receive_buffer_bytes"] > limit]
+    if capped:
+        print(f"Warning: net.core.rmem_max is {limit}; the kernel caps the receive buffer of "
+              f"{', '.join(setting_key(s) for s in capped)} at it (sysctl -w net.core.rmem_max=<bytes> to raise)")
+    print(f"{len(settings)} settings x {len(args.rates)} rates, about "
+          f"{len(settings) * (len(args.rates) * (args.duration + 10) + 90) / 60:.0f} minutes", flush=True)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="avx-intake-") as tmp:
+        os.chmod(tmp, 0o755)  # Logstash runs as uid 1000 in the container
+        conf = Path(tmp) / f"{args.type}-full.conf"
+        subprocess.run([str(ASSEMBLE), args.type, str(conf)], capture_output=True, check=True)
+        for index, setting in enumerate(settings):
+            key = setting_key(setting)
+            print(f"[{index + 1}/{len(settings)}] {key}", flush=True)
+            try:
+                results[key] = run_setting(setting, conf, args, index)
+            except (RuntimeError, subprocess.CalledProcessError, urllib.error.URLError, OSError) as e:
+                detail = e.stderr.decode(errors="replace") if isinstance(e, subprocess.CalledProcessError) and e.stderr else ""
+                sys.exit(f"Error: setting {key}: {e}\n{detail}")
+    if args.dry_run:
+        return
+
+    print_results(results)
+
+    if args.json:
+        document = {
+            "connector_version": matrix.git_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "host": {"cpus": os.cpu_count(), "kernel": platform.release(), "rmem_max": limit, "image": args.image,
+                     "heap": args.heap, "pipeline_workers": args.pipeline_workers},
+            "load": {"type": args.type, "duration_s": args.duration, "seed": args.seed, "senders": args.senders},
+            "settings": results,
+        }
+        args.json.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()